@@ -0,0 +1,524 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import main
+from generate_best_track import OUTPUT_TEMPLATE, generate_best_track
+from name_mapping import load_mapping_index
+
+# --- CONFIGURATION ---
+BENCH_DIR = 'bench_data'
+RESULTS_FILE = 'benchmark_results.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+BENCH_SEED = 0
+
+DEFAULT_SCALES = [1, 10]
+
+# What the previous version (main.py before the columnar parser, with the
+# committed pagasa_mapping_all.csv) wrote for the synthetic archive at
+# REFERENCE_SCALE. The export, streaming and --legacy, must reproduce it
+# byte for byte apart from the REFERENCE_CHANGES cells.
+REFERENCE_FILE = 'benchmark_reference.csv'
+REFERENCE_SCALE = 0.05
+# Intended output changes since then: (column, reference cell, new cell)
+REFERENCE_CHANGES = [
+    ('PAGASA_Name', 'nan', ''),     # OUTPUT_FORMAT_VERSION 3 (blank mapped name)
+]
+
+# A result regresses if it is this much slower (or bigger) than the baseline,
+# and by more than the noise floor
+TIME_TOLERANCE = 0.20
+TIME_NOISE_SECONDS = 0.05
+MEMORY_TOLERANCE = 0.10
+MEMORY_NOISE_MB = 1.0
+
+# Per-fix Python loops (dict rows, scalar is_in_par / get_classification)
+# are skipped above this size: at 100x they need minutes and gigabytes
+LEGACY_MAX_FIXES = 1_000_000
+
+# Start-up benchmark (--stage startup): wall time of a fresh interpreter
+# running each command (best of --repeat), plus its import time from
+# -X importtime and whether it loaded one of HEAVY_MODULES
+STARTUP_STAGE = 'startup'
+STARTUP_COMMANDS = {
+    'cli_help': ['typhoon.py', '--help'],
+    'cli_par': ['typhoon.py', 'par', '14.6', '121.0'],
+    'import_main': ['-c', 'import main'],
+}
+HEAVY_MODULES = ['pandas']
+
+def _copy_storms(storms):
+    # process_and_export rewrites the rows' In_PAR in place
+    return {sid: dict(data, rows=[dict(row) for row in data['rows']]) for sid, data in storms.items()}
+
+def _fix_strings(cols):
+    def text(values):
+        return ['' if np.isnan(v) else str(int(v)) for v in values]
+    return text(cols['grade'].astype(float)), text(cols['wind']), text(cols['pressure'])
+
+# Stage name -> (setup, run, legacy). setup(ctx) builds the arguments
+# (not timed, called before every run), run(*args) is what is measured.
+STAGES = {
+    'parse_jma_data': (
+        lambda ctx: (ctx['input_file'],),
+        main.parse_jma_data,
+        True),
+    'parse_jma_columns': (
+        lambda ctx: (ctx['input_file'],),
+        main.parse_jma_columns,
+        False),
+    'is_in_par': (
+        lambda ctx: (ctx['cols']['lat'].tolist(), ctx['cols']['lon'].tolist()),
+        lambda lat, lon: [main.is_in_par(a, b) for a, b in zip(lat, lon)],
+        True),
+    'is_in_par_batch': (
+        lambda ctx: (ctx['cols']['lat'], ctx['cols']['lon']),
+        main.is_in_par_batch,
+        False),
+    'get_classification': (
+        lambda ctx: ctx['fix_strings'],
+        lambda grade, wind, pressure: [main.get_classification(g, w, p) for g, w, p in zip(grade, wind, pressure)],
+        True),
+    'classify_columns': (
+        lambda ctx: (ctx['cols']['grade'], ctx['cols']['wind'], ctx['cols']['pressure']),
+        main.classify_columns,
+        False),
+    'process_and_export': (
+        lambda ctx: (_copy_storms(ctx['storms']), ctx['mappings']),
+        main.process_and_export,
+        True),
+    'to_csv': (
+        lambda ctx: (ctx['frame'],),
+        lambda frame: frame.to_csv(index=False, header=False, lineterminator='\n').encode('utf-8'),
+        False),
+    'render_csv': (
+        lambda ctx: (ctx['frame'],),
+        main.render_csv,
+        False),
+    'export_incremental': (
+        lambda ctx: (ctx['input_file'], ctx['mappings']),
+        lambda input_file, mappings: main.export_incremental(input_file, mappings, full_rebuild=True),
+        False),
+}
+
+class BenchContext(dict):
+    """
+    Per-scale inputs, built on first use (parsed columns, legacy storms,
+    per-fix strings, the enriched table, the REFERENCE_SCALE archive) so
+    only the selected stages pay for them.
+    """
+    def __missing__(self, key):
+        if key == 'cols':
+            value = main.parse_jma_columns(self['input_file'])
+        elif key == 'frame':
+            value = main.build_output_frame(self['cols'], self['mappings'])
+        elif key == 'storms':
+            value = main.parse_jma_data(self['input_file'])
+        elif key == 'fix_strings':
+            value = _fix_strings(self['cols'])
+        elif key == 'reference_input':
+            value = synthetic_file(REFERENCE_SCALE, self['bench_dir'])
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+def synthetic_file(scale, bench_dir=BENCH_DIR, seed=BENCH_SEED):
+    """
+    Path of the synthetic archive for `scale`, generated on first use.
+    """
+    os.makedirs(bench_dir, exist_ok=True)
+    path = os.path.join(bench_dir, OUTPUT_TEMPLATE.format(scale=f"{scale:g}"))
+    if not os.path.exists(path):
+        generate_best_track(path, scale, seed)
+    return path
+
+def csv_round_trip(frame):
+    """
+    Whether main.render_csv writes exactly what to_csv does for the typed
+    table (CSV_ZERO_PAD columns zero-filled), and reading that CSV back
+    (as_output_types) gives the same types and, rendered again, the same bytes.
+    """
+    import pandas as pd
+    text = main.csv_header(frame.columns) + main.render_csv(frame)[0]
+    padded = frame.assign(**{col: frame[col].astype('string').str.zfill(width)
+                             for col, width in main.CSV_ZERO_PAD.items() if col in frame.columns})
+    if text != padded.to_csv(index=False, lineterminator='\n').encode('utf-8'):
+        return False
+    back = main.as_output_types(pd.read_csv(io.BytesIO(text), dtype=str, keep_default_na=False))
+    if list(back.dtypes.astype(str)) != list(frame.dtypes.astype(str)):
+        return False
+    return main.csv_header(back.columns) + main.render_csv(back)[0] == text
+
+def reference_parity(ctx, legacy=False):
+    """
+    Whether the export of the archive at REFERENCE_SCALE (render_csv of
+    build_output_frame, or with legacy the file process_and_export writes)
+    is REFERENCE_FILE, line for line; a line may only differ in
+    REFERENCE_CHANGES cells.
+    """
+    input_file = ctx['reference_input']
+    if legacy:
+        main.process_and_export(main.parse_jma_data(input_file), ctx['mappings'])
+        with open(main.OUTPUT_FILE, 'rb') as f:
+            text = f.read()
+    else:
+        frame = main.build_output_frame(main.parse_jma_columns(input_file), ctx['mappings'])
+        text = main.csv_header(frame.columns) + main.render_csv(frame)[0]
+    with open(ctx['reference_file'], 'rb') as f:
+        expected = f.read()
+
+    lines, reference = text.decode('utf-8').split('\n'), expected.decode('utf-8').split('\n')
+    if len(lines) != len(reference):
+        print(f"{len(lines)} lines, {REFERENCE_FILE} has {len(reference)}")
+        return False
+    header = next(csv.reader(reference[:1]))
+    allowed = {(header.index(col), old, new) for col, old, new in REFERENCE_CHANGES if col in header}
+    mismatches = []
+    for n, (line, ref_line) in enumerate(zip(lines, reference)):
+        if line == ref_line:
+            continue
+        cells, ref_cells = next(csv.reader([line]), []), next(csv.reader([ref_line]), [])
+        if len(cells) != len(ref_cells) or any(
+                cell != ref_cell and (i, ref_cell, cell) not in allowed
+                for i, (cell, ref_cell) in enumerate(zip(cells, ref_cells))):
+            mismatches.append(n + 1)
+    for n in mismatches[:10]:
+        print(f"line {n}: {lines[n - 1]!r}, {REFERENCE_FILE} has {reference[n - 1]!r}")
+    return not mismatches
+
+def parse_parity(ctx):
+    """
+    Whether parse_jma_columns (as jma_columns_to_frame) gives the rows of
+    parse_jma_data, row for row: the same IDs, names and In_PAR, and the same
+    numbers where the legacy rows hold text (blank = missing).
+    """
+    import pandas as pd
+    frame = main.jma_columns_to_frame(ctx['cols'])
+    legacy = pd.DataFrame([row for data in ctx['storms'].values() for row in data['rows']],
+                          columns=frame.columns)
+    if len(legacy) != len(frame):
+        return False
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            same = np.array_equal(legacy[col].to_numpy(dtype=object), frame[col].to_numpy(dtype=object))
+        else:
+            old = pd.to_numeric(legacy[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            same = np.array_equal(old, frame[col].to_numpy(dtype=float, na_value=np.nan), equal_nan=True)
+        if not same:
+            print(f"parse_jma_columns differs from parse_jma_data in {col}")
+            return False
+    return True
+
+def par_lattice():
+    """
+    Points for the geofence check: a 0.05 degree lattice over the polygon's
+    surroundings (it holds every 0.1 degree best-track position, computed
+    like the parser does), the vertices, points along every edge and just
+    either side of it, and NaN.
+    """
+    lat, lon = np.meshgrid(np.arange(-100, 701) / 20.0, np.arange(2100, 2901) / 20.0)
+    points = [(lat.ravel(), lon.ravel())]
+    vertices = np.array(main.PAR_VERTICES)
+    for (xi, yi), (xj, yj) in zip(vertices, np.roll(vertices, 1, axis=0)):
+        t = np.linspace(0.0, 1.0, 1001)
+        edge_lat, edge_lon = yi + (yj - yi) * t, xi + (xj - xi) * t
+        for delta in (0.0, 1e-9, -1e-9, 1e-6, -1e-6):
+            points.append((edge_lat + delta, edge_lon))
+            points.append((edge_lat, edge_lon + delta))
+    points.append((vertices[:, 1], vertices[:, 0]))
+    points.append((np.array([np.nan, 10.0, np.nan]), np.array([125.0, np.nan, np.nan])))
+    return np.concatenate([p[0] for p in points]), np.concatenate([p[1] for p in points])
+
+def par_parity(ctx):
+    """
+    Whether is_in_par_batch matches the scalar is_in_par on par_lattice().
+    """
+    lat, lon = par_lattice()
+    expected = np.array([main.is_in_par(a, b) for a, b in zip(lat.tolist(), lon.tolist())])
+    mismatches = np.flatnonzero(main.is_in_par_batch(lat, lon) != expected)
+    for i in mismatches[:10].tolist():
+        print(f"is_in_par_batch({float(lat[i])!r}, {float(lon[i])!r}) != {bool(expected[i])}")
+    return len(mismatches) == 0
+
+def classification_inputs(ctx):
+    """
+    Grade, wind and pressure strings for the classification check: every
+    combination of the grade codes, winds on and between the band limits,
+    and pressures on a 0.5 hPa grid (so the estimated wind crosses every
+    band), blanks and junk included; then the archive's own fixes.
+    """
+    import itertools
+    grades = ['', '1', '2', '3', '4', '5', '6', '7', '9', 'x']
+    winds = ['', '0', '33', '33.5', '34', '47', '47.5', '48', '63', '63.5', '64', '99', '99.5', '100', '140', 'n/a']
+    pressures = ['', 'n/a'] + [f"{p:g}" for p in np.arange(850.0, 1020.5, 0.5)]
+    combos = list(zip(*itertools.product(grades, winds, pressures)))
+    return [list(c) + list(f) for c, f in zip(combos, ctx['fix_strings'])]
+
+def classification_parity(ctx):
+    """
+    Whether classify_columns (given the strings as numbers, NaN when they do
+    not parse) agrees row for row with the reference get_classification.
+    """
+    import pandas as pd
+    grade, wind, pressure = classification_inputs(ctx)
+    expected = np.array([main.get_classification(g, w, p) for g, w, p in zip(grade, wind, pressure)], dtype=object)
+    numeric = [pd.to_numeric(pd.Series(values), errors='coerce') for values in (grade, wind, pressure)]
+    result = np.asarray(main.classify_columns(*numeric), dtype=object)
+    mismatches = np.flatnonzero(result != expected)
+    for i in mismatches[:10].tolist():
+        print(f"classify_columns({grade[i]!r}, {wind[i]!r}, {pressure[i]!r}) = {result[i]!r}, "
+              f"get_classification = {expected[i]!r}")
+    return len(mismatches) == 0
+
+# Stage name -> (check, legacy). check(ctx) is True when the stage's output
+# matches its reference implementation; it runs after the stage's timings
+# (or alone with --check) and any False fails the run.
+CHECKS = {
+    'parse_jma_columns': (parse_parity, True),
+    'is_in_par_batch': (par_parity, False),
+    'classify_columns': (classification_parity, True),
+    'process_and_export': (lambda ctx: reference_parity(ctx, legacy=True), True),
+    'render_csv': (lambda ctx: csv_round_trip(ctx['frame']) and reference_parity(ctx), False),
+}
+
+def measure(setup, run, ctx, repeat):
+    """
+    Best wall time of `repeat` runs, then one more run under tracemalloc for
+    the peak (tracing slows the code down, so it is not timed).
+    """
+    best = float('inf')
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            args = setup(ctx)
+            start = time.perf_counter()
+            run(*args)
+            best = min(best, time.perf_counter() - start)
+        args = setup(ctx)
+        tracemalloc.start()
+        run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak
+
+def run_checks(name, key, ctx, fixes):
+    """
+    Runs the CHECKS of a stage, prints the outcome and returns it (None when
+    the stage has none or it is skipped at this size).
+    """
+    if name not in CHECKS:
+        return None
+    check, legacy = CHECKS[name]
+    if legacy and fixes > LEGACY_MAX_FIXES:
+        print(f"{key:32s} check skipped ({fixes} fixes > LEGACY_MAX_FIXES)")
+        return None
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ok = bool(check(ctx))
+    print(f"{key:32s} check {'ok' if ok else 'FAILED'}")
+    if not ok:
+        print(out.getvalue(), end='')
+    return ok
+
+def run_benchmarks(scales=DEFAULT_SCALES, stages=None, repeat=3, bench_dir=BENCH_DIR, check_only=False):
+    """
+    Runs the stages on the synthetic archive at every scale. Returns
+    {'<stage>@<scale>x': {'seconds', 'fixes', 'fixes_per_s', 'peak_mb', 'check'}}
+    ('check' only for stages in CHECKS; with check_only just the checks).
+    Outputs of the export stages go to a temporary directory.
+    """
+    stages = stages or list(STAGES)
+    mappings = load_mapping_index(os.path.abspath(main.MAPPING_FILE))
+    reference_file = os.path.abspath(REFERENCE_FILE)
+    results = {}
+    cwd = os.getcwd()
+    for scale in scales:
+        input_file = os.path.abspath(synthetic_file(scale, bench_dir))
+        ctx = BenchContext(input_file=input_file, mappings=mappings, bench_dir=os.path.abspath(bench_dir),
+                           reference_file=reference_file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fixes = len(ctx['cols']['timestamp'])
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                for name in stages:
+                    setup, run, legacy = STAGES[name]
+                    key = f"{name}@{scale:g}x"
+                    if check_only:
+                        ok = run_checks(name, key, ctx, fixes)
+                        if ok is not None:
+                            results[key] = {'check': ok}
+                        continue
+                    if legacy and fixes > LEGACY_MAX_FIXES:
+                        print(f"{key:32s} skipped ({fixes} fixes > LEGACY_MAX_FIXES)")
+                        continue
+                    seconds, peak = measure(setup, run, ctx, repeat)
+                    results[key] = {
+                        'seconds': round(seconds, 4),
+                        'fixes': fixes,
+                        'fixes_per_s': round(fixes / seconds) if seconds else None,
+                        'peak_mb': round(peak / 2**20, 2),
+                    }
+                    print(f"{key:32s} {seconds:9.3f} s {fixes / seconds:14,.0f} fixes/s "
+                          f"{peak / 2**20:10.1f} MB peak")
+                    ok = run_checks(name, key, ctx, fixes)
+                    if ok is not None:
+                        results[key]['check'] = ok
+            finally:
+                os.chdir(cwd)
+    return results
+
+def import_times(args):
+    """
+    -X importtime of a fresh interpreter running `args`: {module: cumulative
+    seconds} for every module it imported, and the total import time.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *args], capture_output=True, text=True)
+    times, total = {}, 0.0
+    for line in proc.stderr.splitlines():
+        parts = line.split('|')
+        if not line.startswith('import time:') or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        seconds = int(parts[1]) / 1e6
+        name = parts[2].rstrip()
+        times[name.strip()] = seconds
+        # Top-level imports are indented by one space
+        if not name.startswith('  '):
+            total += seconds
+    return times, total
+
+def run_startup(repeat=3, commands=STARTUP_COMMANDS):
+    """
+    Start-up time of the commands in STARTUP_COMMANDS. Returns
+    {'startup:<name>': {'seconds', 'import_seconds', 'heavy_imports', ...}}
+    in the layout of run_benchmarks (no fixes, no memory peak).
+    """
+    results = {}
+    for name, args in commands.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, check=True)
+            best = min(best, time.perf_counter() - start)
+        times, total = import_times(args)
+        heavy = [module for module in HEAVY_MODULES if module in times]
+        key = f"{STARTUP_STAGE}:{name}"
+        results[key] = {
+            'seconds': round(best, 4),
+            'fixes': 0,
+            'fixes_per_s': None,
+            'peak_mb': None,
+            'import_seconds': round(total, 4),
+            'heavy_imports': heavy,
+        }
+        print(f"{key:32s} {best:9.3f} s   imports {total:.3f} s"
+              + (f"   loads {', '.join(heavy)}" if heavy else ''))
+    return results
+
+def compare(results, baseline):
+    """
+    Regressions against the baseline, as printable lines. Entries measured on
+    a different number of fixes (other generator settings) are not compared.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or base['fixes'] != result['fixes']:
+            continue
+        if (result['seconds'] > base['seconds'] * (1 + TIME_TOLERANCE)
+                and result['seconds'] - base['seconds'] > TIME_NOISE_SECONDS):
+            regressions.append(f"{key}: {result['seconds']:.3f} s vs {base['seconds']:.3f} s baseline")
+        if result['peak_mb'] is None or base['peak_mb'] is None:
+            continue
+        if (result['peak_mb'] > base['peak_mb'] * (1 + MEMORY_TOLERANCE)
+                and result['peak_mb'] - base['peak_mb'] > MEMORY_NOISE_MB):
+            regressions.append(f"{key}: {result['peak_mb']:.1f} MB vs {base['peak_mb']:.1f} MB baseline")
+    return regressions
+
+def environment():
+    import pandas as pd
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic best-track files.")
+    parser.add_argument('--scale', type=float, nargs='+', default=DEFAULT_SCALES,
+                        help="Archive sizes to run (1 = the real archive, e.g. 1 10 100).")
+    parser.add_argument('--stage', nargs='+', choices=list(STAGES) + [STARTUP_STAGE],
+                        help=f"Stages to run (default: all; '{STARTUP_STAGE}' times the CLI start-up).")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (best is kept).")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline results to compare against.")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store these results as the new baseline (merged into the existing one).")
+    parser.add_argument('--check', action='store_true',
+                        help="Only run the output checks of the stages (no timings); exit 1 on a mismatch.")
+    args = parser.parse_args()
+
+    # Setup paths relative to script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    if args.check:
+        results = run_benchmarks(args.scale, args.stage or list(CHECKS), check_only=True)
+        failed = [key for key, result in results.items() if not result['check']]
+        if failed:
+            print(f"Error: output checks failed ({', '.join(failed)}).")
+            sys.exit(1)
+        print(f"{len(results)} output checks passed.")
+        return
+
+    stages = args.stage or list(STAGES) + [STARTUP_STAGE]
+    results = {}
+    if any(name in STAGES for name in stages):
+        results.update(run_benchmarks(args.scale, [name for name in stages if name in STAGES], args.repeat))
+    if STARTUP_STAGE in stages:
+        results.update(run_startup(args.repeat))
+    report = {'environment': environment(), 'results': results}
+    with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Results saved to {RESULTS_FILE}")
+    failed = [key for key, result in results.items() if result.get('check') is False]
+    if failed:
+        print(f"Error: output checks failed ({', '.join(failed)}).")
+        sys.exit(1)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        merged = dict(baseline.get('results', {}), **results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environment': report['environment'], 'results': merged}, f, indent=1)
+        print(f"Baseline saved to {args.baseline} ({len(merged)} entries)")
+        return
+
+    if not baseline:
+        print(f"No baseline ({args.baseline}); run with --save-baseline to create one.")
+        return
+    regressions = compare(results, baseline.get('results', {}))
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions against {args.baseline}.")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,454 @@
+import argparse
+import io
+import os
+import re
+import sys
+
+import numpy as np
+
+from instrumentation import count, reject
+
+# --- CONFIGURATION ---
+# Enriched table of each ingested archive, named after its format (and
+# IBTrACS agency), and the storm matches between archives
+OUTPUT_TEMPLATE = 'ph_typhoon_data_{source}.csv'
+MATCHES_FILE = 'ph_typhoon_agency_matches.csv'
+
+# Winds are kept as each agency gives them (sustained over wind_minutes);
+# classification and comparisons use 10-minute equivalents, the JMA /
+# PAGASA convention (WMO guidance: 1-min at-sea wind x 0.93)
+WIND_TO_10MIN = {10: 1.0, 1: 0.93}
+
+# JTWC b-deck (ATCF) text: comma separated, one row per storm, time and
+# wind-radii threshold (RAD 0/34 = the fix, RAD 50 = its 50 kt radii)
+BDECK_MAX_FIELDS = 64
+BDECK_CHUNK_ROWS = 250_000
+BDECK_FIELDS = {'basin': 0, 'number': 1, 'time': 2, 'lat': 6, 'lon': 7, 'wind': 8, 'pressure': 9,
+                'type': 10, 'rad': 11, 'ne': 13, 'se': 14, 'sw': 15, 'nw': 16, 'name': 27}
+# Storm types that map to a JMA grade (others are classified by wind)
+BDECK_GRADES = {'EX': 6}
+# Quadrant of the longest radius -> JMA direction code (format.txt)
+QUADRANT_DIRECTIONS = {'ne': 1, 'se': 3, 'sw': 5, 'nw': 7}
+
+# IBTrACS-style CSV: one row per storm and time, one column set per agency
+# (a second header line holds units). agency -> (lat, lon, wind, pressure,
+# grade, 50 kt radii prefix or None, wind_minutes)
+IBTRACS_AGENCIES = {
+    'wmo': ('LAT', 'LON', 'WMO_WIND', 'WMO_PRES', None, None, 10),
+    'tokyo': ('TOKYO_LAT', 'TOKYO_LON', 'TOKYO_WIND', 'TOKYO_PRES', 'TOKYO_GRADE', 'TOKYO_R50', 10),
+    'usa': ('USA_LAT', 'USA_LON', 'USA_WIND', 'USA_PRES', None, None, 1),
+    'hko': ('HKO_LAT', 'HKO_LON', 'HKO_WIND', 'HKO_PRES', None, None, 10),
+}
+IBTRACS_AGENCY = 'wmo'
+
+# Storm names that mean "no name yet"
+UNNAMED = ['', 'NONAME', 'NOT_NAMED', 'UNNAMED', 'INVEST']
+
+# Cross-agency matching: fixes at the same time within MATCH_MAX_KM, found
+# through a (time, MATCH_CELL_DEG grid cell) join index; two storms are the
+# same if they share at least MATCH_MIN_FIXES such fixes
+MATCH_MAX_KM = 150.0
+MATCH_CELL_DEG = 3.0
+MATCH_MIN_FIXES = 3
+
+MATCH_COLUMNS = ['StormID_A', 'StormName_A', 'StormID_B', 'StormName_B', 'Shared_Fixes', 'Mean_Distance_km',
+                 'First_Shared', 'Last_Shared', 'Peak_Wind_A_kt', 'Peak_Wind_B_kt',
+                 'Peak_Wind_A_10min_kt', 'Peak_Wind_B_10min_kt', 'Min_Pressure_A_hPa', 'Min_Pressure_B_hPa']
+
+def build_columns(storm_key, storm_name, timestamp, lat, lon, wind, pressure, grade=None, r50=None,
+                  wind_minutes=10):
+    """
+    The parse_jma_columns arrays (main.py) from per-fix arrays of any
+    format: storms numbered in order of first appearance, fixes sorted by
+    storm and time (the first of two fixes at the same time is kept), the
+    storm's name is its last real one. r50 is (dir, long, short) or None.
+    Also sets 'wind_minutes', the averaging period of 'wind'.
+    """
+    import pandas as pd
+    from main import is_in_par_batch
+
+    # storm_key may be a Categorical (factorized without hashing strings)
+    codes, storm_ids = pd.factorize(storm_key)
+    timestamp = np.asarray(timestamp, dtype=np.int64)
+    valid = (codes >= 0) & (timestamp > 0)
+    order = np.flatnonzero(valid)[np.lexsort((timestamp[valid], codes[valid]))]
+    same = (codes[order][1:] == codes[order][:-1]) & (timestamp[order][1:] == timestamp[order][:-1])
+    reject('duplicate_fix', np.count_nonzero(same))
+    order = order[np.r_[True, ~same]] if len(order) else order
+    count('fixes_parsed', len(order))
+
+    n = len(order)
+    storm_index = codes[order].astype(np.int32)
+    # Names are cleaned once per distinct name, not per fix
+    name_codes, names = pd.factorize(np.asarray(storm_name, dtype=object)[order])
+    names = pd.Series(names, dtype=object).astype(str).str.strip().str.upper()
+    real = np.flatnonzero((name_codes >= 0) & ~np.isin(name_codes, np.flatnonzero(names.isin(UNNAMED))))
+    last_name = pd.Series(names.to_numpy()[name_codes[real]]).groupby(storm_index[real]).last()
+    last_name = last_name.reindex(range(len(storm_ids)))
+    lat = np.asarray(lat, dtype=float)[order]
+    lon = np.asarray(lon, dtype=float)[order]
+    in_par = is_in_par_batch(lat, lon)
+    entered_par = np.zeros(len(storm_ids), dtype=bool)
+    entered_par[storm_index[in_par]] = True
+
+    def code(values):
+        return (np.full(n, -1, dtype=np.int8) if values is None
+                else np.nan_to_num(np.asarray(values, dtype=float)[order], nan=-1).astype(np.int8))
+
+    def number(values):
+        return np.full(n, np.nan) if values is None else np.asarray(values, dtype=float)[order]
+
+    r50 = r50 or (None, None, None)
+    timestamp = timestamp[order]
+    return {
+        'storm_id': np.asarray(storm_ids, dtype=object).astype(str).astype(object),
+        'storm_name': last_name.fillna('UNNAMED').to_numpy(dtype=object),
+        'storm_revision': np.full(len(storm_ids), '', dtype=object),
+        'storm_entered_par': entered_par,
+        'storm_index': storm_index,
+        'timestamp': timestamp,
+        'year': (timestamp // 1000000).astype(np.int32),
+        'grade': code(grade),
+        'lat': lat,
+        'lon': lon,
+        'pressure': number(pressure),
+        'wind': number(wind),
+        'dir50': code(r50[0]),
+        'r50_long': number(r50[1]),
+        'r50_short': number(r50[2]),
+        'dir30': code(None),
+        'r30_long': number(None),
+        'r30_short': number(None),
+        'in_par': in_par,
+        'wind_minutes': wind_minutes,
+    }
+
+def parse_jma(data):
+    from main import parse_jma_bytes
+    return dict(parse_jma_bytes(data), wind_minutes=10)
+
+def _ascii_matrix(values, width):
+    """
+    Strings as an (n, width) matrix of their ASCII codes, zero padded, so
+    fixed-position text can be decoded with array operations.
+    """
+    return np.asarray(values, dtype=f'S{width}').view(np.uint8).reshape(-1, width)
+
+def _digits_value(matrix, columns):
+    """
+    Integer written by the digits at the given columns of an _ascii_matrix
+    (non-digits are skipped), NaN where there is no digit.
+    """
+    value = np.zeros(len(matrix))
+    found = np.zeros(len(matrix), dtype=bool)
+    for column in columns:
+        digit = (matrix[:, column] >= 48) & (matrix[:, column] <= 57)
+        value = np.where(digit, value * 10 + (matrix[:, column] - 48.0), value)
+        found |= digit
+    return np.where(found, value, np.nan)
+
+def _coordinate(values, negative):
+    """
+    ATCF coordinates in tenths of a degree ('123N', '1305E') -> degrees.
+    """
+    matrix = _ascii_matrix(values, 8)
+    length = np.count_nonzero(matrix, axis=1)
+    hemisphere = matrix[np.arange(len(matrix)), np.maximum(length - 1, 0)]
+    value = _digits_value(matrix, range(matrix.shape[1])) / 10.0
+    return np.where(hemisphere == ord(negative), -value, value)
+
+def parse_jtwc_bdeck(data):
+    """
+    JTWC best tracks in ATCF b-deck format (one or many storms, e.g. the
+    bwp*.dat files of a season concatenated). StormID is basin + number +
+    year (WP312013). Winds are 1-minute; 50 kt radii come from the RAD 50
+    rows (longest quadrant and shortest), 34 kt radii are not kept (the
+    schema has 30 kt ones).
+    """
+    import pandas as pd
+
+    # Rows have as many fields as the tech filled in, so they are read
+    # BDECK_MAX_FIELDS wide (usecols cannot pad short rows), in chunks that
+    # keep only BDECK_FIELDS; numbers are parsed by the reader
+    numeric = ['number', 'time', 'wind', 'pressure', 'rad', *QUADRANT_DIRECTIONS]
+    reader = pd.read_csv(io.BytesIO(data), header=None, names=range(BDECK_MAX_FIELDS), skipinitialspace=True,
+                         dtype={BDECK_FIELDS[name]: float if name in numeric else str for name in BDECK_FIELDS},
+                         on_bad_lines='skip', engine='c', chunksize=BDECK_CHUNK_ROWS)
+    frame = pd.concat([chunk[list(BDECK_FIELDS.values())] for chunk in reader], ignore_index=True)
+    frame = frame.set_axis(list(BDECK_FIELDS), axis=1)
+    frame = frame[frame['basin'].notna() & frame['number'].notna() & (frame['time'] > 0)]
+    time = frame['time'].to_numpy().astype(np.int64)
+
+    # A storm is a run of rows with the same basin and number; its year is
+    # that of its first row (a December storm keeps it into January)
+    basin, basins = pd.factorize(frame['basin'].to_numpy())
+    number = frame['number'].to_numpy().astype(np.int64)
+    start = np.r_[True, (basin[1:] != basin[:-1]) | (number[1:] != number[:-1])]
+    run = np.cumsum(start) - 1
+    first = np.flatnonzero(start)
+    run_ids = [f"{basins[b]}{n:02d}{t // 1000000}" for b, n, t in zip(basin[first], number[first], time[first])]
+    run_codes, storm_ids = pd.factorize(np.array(run_ids, dtype=object))
+    storm = run_codes[run]
+
+    # Fix rows (RAD 0 / 34), and the RAD 50 row of the same storm and time
+    rad = frame['rad'].fillna(0).to_numpy()
+    fix = np.flatnonzero(rad != 50)
+    radii = np.flatnonzero(rad == 50)
+    fix_key = storm[fix] * 10**10 + time[fix]
+    radii_key = storm[radii] * 10**10 + time[radii]
+    sorter = np.argsort(fix_key, kind='stable')
+    target = sorter[np.minimum(np.searchsorted(fix_key, radii_key, sorter=sorter), len(fix) - 1)] if len(fix) else radii
+    quadrants = frame[list(QUADRANT_DIRECTIONS)].to_numpy()[radii]
+    matched = np.flatnonzero((fix_key[target] == radii_key) & (np.nan_to_num(quadrants, nan=0).max(axis=1) > 0)
+                             if len(fix) else [])
+    target, quadrants = target[matched], quadrants[matched]
+    r50_dir, r50_long, r50_short = (np.full(len(fix), np.nan) for _ in range(3))
+    if len(matched):
+        longest = np.nan_to_num(quadrants, nan=-1).argmax(axis=1)
+        r50_dir[target] = np.array(list(QUADRANT_DIRECTIONS.values()))[longest]
+        r50_long[target] = np.nanmax(quadrants, axis=1)
+        r50_short[target] = np.nanmin(quadrants, axis=1)
+
+    fixes = frame.iloc[fix]
+    wind = fixes['wind'].to_numpy()
+    pressure = fixes['pressure'].to_numpy()
+    grade = fixes['type'].map(BDECK_GRADES).to_numpy(dtype=float)
+    return build_columns(
+        pd.Categorical.from_codes(storm[fix], storm_ids), fixes['name'].to_numpy(), time[fix],
+        _coordinate(fixes['lat'].to_numpy(), 'S'), _coordinate(fixes['lon'].to_numpy(), 'W') % 360,
+        np.where(wind > 0, wind, np.nan), np.where(pressure > 0, pressure, np.nan), grade,
+        (r50_dir, r50_long, r50_short), wind_minutes=1)
+
+def parse_ibtracs_csv(data, agency=IBTRACS_AGENCY):
+    """
+    IBTrACS-style CSV, the columns of one agency (IBTRACS_AGENCIES). Rows
+    where that agency has no position (or, for 'wmo', neither wind nor
+    pressure, i.e. the interpolated 3-hourly rows) are skipped. StormID is
+    the IBTrACS SID.
+    """
+    import pandas as pd
+
+    lat_col, lon_col, wind_col, pres_col, grade_col, radii, minutes = IBTRACS_AGENCIES[agency]
+    radii_cols = [f"{radii}_{part}" for part in ('DIR', 'LONG', 'SHORT')] if radii else []
+    numeric = [col for col in (lat_col, lon_col, wind_col, pres_col, grade_col, *radii_cols) if col]
+    # Blank cells are ' ' (empty after skipinitialspace); 'NA' is a name.
+    # The units line under the header is skipped.
+    frame = pd.read_csv(io.BytesIO(data), usecols=['SID', 'NAME', 'ISO_TIME', *numeric], skiprows=[1],
+                        skipinitialspace=True, keep_default_na=False, na_values={col: [''] for col in numeric},
+                        dtype=dict({'SID': str, 'NAME': str, 'ISO_TIME': str}, **{col: float for col in numeric}),
+                        engine='c')
+    frame = frame[frame['SID'] != '']
+    values = {col: frame[col].to_numpy() for col in numeric}
+
+    lat, lon, wind, pressure = (values[col] for col in (lat_col, lon_col, wind_col, pres_col))
+    keep = ~np.isnan(lat) & ~np.isnan(lon)
+    if agency == 'wmo':
+        keep &= ~np.isnan(wind) | ~np.isnan(pressure)
+    # 'YYYY-MM-DD HH:MM:SS' -> YYYYMMDDHH
+    iso = _ascii_matrix(frame['ISO_TIME'].to_numpy()[keep], 13)
+    time = np.nan_to_num(_digits_value(iso, (0, 1, 2, 3, 5, 6, 8, 9, 11, 12))).astype(np.int64)
+
+    return build_columns(
+        frame['SID'].to_numpy()[keep], frame['NAME'].to_numpy()[keep], time, lat[keep],
+        lon[keep] % 360, wind[keep], pressure[keep], values[grade_col][keep] if grade_col else None,
+        tuple(values[col][keep] for col in radii_cols) if radii else None,
+        wind_minutes=minutes)
+
+def _is_jma(head):
+    return head.lstrip().startswith(b'66666')
+
+def _is_bdeck(head):
+    return re.match(rb'\s*[A-Z]{2},\s*\d+,\s*\d{10},', head) is not None
+
+def _is_ibtracs(head):
+    return head.lstrip().startswith(b'SID,')
+
+# Format name -> parse(bytes, **options) into the parse_jma_columns arrays,
+# and detect(first bytes of the file). Detection tries them in this order.
+FORMATS = {
+    'jma': {'parse': parse_jma, 'detect': _is_jma, 'description': "RSMC Tokyo best track (format.txt)"},
+    'jtwc': {'parse': parse_jtwc_bdeck, 'detect': _is_bdeck, 'description': "JTWC / ATCF b-deck text"},
+    'ibtracs': {'parse': parse_ibtracs_csv, 'detect': _is_ibtracs, 'description': "IBTrACS-style CSV"},
+}
+
+def detect_format(data):
+    """
+    Name of the format of a best-track file's content (its first bytes are
+    enough), or None.
+    """
+    head = data[:4096]
+    for name, spec in FORMATS.items():
+        if spec['detect'](head):
+            return name
+    return None
+
+def parse_best_track(file_path, fmt=None, **options):
+    """
+    Any registered format into the parse_jma_columns arrays (format
+    detected from the content unless given). Returns None if the file is
+    missing or its format unknown.
+    """
+    if not os.path.exists(file_path):
+        print(f"Error: {file_path} not found.")
+        return None
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    fmt = fmt or detect_format(data)
+    if fmt not in FORMATS:
+        print(f"Error: unknown best-track format in {file_path}.")
+        return None
+    print(f"Parsing {file_path} ({FORMATS[fmt]['description']})...")
+    return FORMATS[fmt]['parse'](data, **options)
+
+def wind_10min(cols):
+    """
+    Winds of a parsed archive as 10-minute equivalents (kt, rounded).
+    """
+    return np.round(cols['wind'] * WIND_TO_10MIN[cols.get('wind_minutes', 10)])
+
+def enrich(cols, mappings):
+    """
+    The final table (main.OUTPUT_COLUMNS) of any parsed archive: PAGASA
+    names, PAR state and classification as for the JMA data, with
+    WindSpeed_kt as 10-minute equivalents.
+    """
+    from main import build_output_frame
+    return build_output_frame(dict(cols, wind=wind_10min(cols)), mappings)
+
+def _storm_peaks(cols):
+    import pandas as pd
+    per_fix = pd.DataFrame({'storm': cols['storm_index'], 'wind': cols['wind'], 'wind10': wind_10min(cols),
+                            'pressure': cols['pressure']})
+    return per_fix.groupby('storm').agg(wind=('wind', 'max'), wind10=('wind10', 'max'),
+                                        pressure=('pressure', 'min')).reindex(range(len(cols['storm_id'])))
+
+def _join_keys(cols, cell_deg):
+    from rapid_intensification import stamp_to_hours
+    hours = stamp_to_hours(cols['timestamp'])
+    valid = np.flatnonzero(~np.isnan(cols['lat']) & ~np.isnan(cols['lon']) & ~np.isnan(hours))
+    row = np.floor((cols['lat'][valid] + 90) / cell_deg).astype(np.int64)
+    col = np.floor((cols['lon'][valid] % 360) / cell_deg).astype(np.int64)
+    return valid, hours[valid].astype(np.int64), row, col
+
+def match_storms(cols_a, cols_b, max_km=MATCH_MAX_KM, cell_deg=MATCH_CELL_DEG, min_fixes=MATCH_MIN_FIXES):
+    """
+    Storms of archive A matched to storms of archive B (one agency each).
+    B's fixes go into a join index sorted on (hour, grid row, grid column);
+    every fix of A looks up the fixes of B at the same hour in its cell
+    and the eight around it, keeping those within max_km. The best match
+    of a storm of A is the storm of B sharing the most such fixes (at
+    least min_fixes; then the closest on average). Returns a DataFrame
+    (MATCH_COLUMNS), one row per matched storm of A.
+    """
+    import pandas as pd
+    from track_index import _expand, haversine_km
+
+    width = int(np.ceil(360 / cell_deg)) + 2
+    height = int(np.ceil(180 / cell_deg)) + 2
+    fix_a, hours_a, row_a, col_a = _join_keys(cols_a, cell_deg)
+    fix_b, hours_b, row_b, col_b = _join_keys(cols_b, cell_deg)
+    key_b = (hours_b * height + row_b) * width + col_b
+    order = np.argsort(key_b, kind='stable')
+    key_b, fix_b = key_b[order], fix_b[order]
+
+    pairs_a, pairs_b = [], []
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            # Longitude cells wrap around the dateline
+            key = (hours_a * height + row_a + dr) * width + (col_a + dc) % (width - 2)
+            lo = np.searchsorted(key_b, key, side='left')
+            hi = np.searchsorted(key_b, key, side='right')
+            group, offset = _expand(hi - lo)
+            pairs_a.append(fix_a[group])
+            pairs_b.append(fix_b[lo[group] + offset])
+    pairs_a = np.concatenate(pairs_a)
+    pairs_b = np.concatenate(pairs_b)
+    distance = haversine_km(cols_a['lat'][pairs_a], cols_a['lon'][pairs_a],
+                            cols_b['lat'][pairs_b], cols_b['lon'][pairs_b])
+    near = distance <= max_km
+
+    pairs = pd.DataFrame({
+        'a': cols_a['storm_index'][pairs_a[near]], 'b': cols_b['storm_index'][pairs_b[near]],
+        'distance': distance[near], 'time': cols_a['timestamp'][pairs_a[near]],
+    })
+    shared = pairs.groupby(['a', 'b']).agg(Shared_Fixes=('distance', 'size'), Mean_Distance_km=('distance', 'mean'),
+                                           First_Shared=('time', 'min'), Last_Shared=('time', 'max')).reset_index()
+    shared = shared[shared['Shared_Fixes'] >= min_fixes]
+    shared = shared.sort_values(['a', 'Shared_Fixes', 'Mean_Distance_km'], ascending=[True, False, True])
+    best = shared.drop_duplicates('a').reset_index(drop=True)
+
+    peaks_a = _storm_peaks(cols_a).iloc[best['a']]
+    peaks_b = _storm_peaks(cols_b).iloc[best['b']]
+    matches = pd.DataFrame({
+        'StormID_A': cols_a['storm_id'][best['a']],
+        'StormName_A': cols_a['storm_name'][best['a']],
+        'StormID_B': cols_b['storm_id'][best['b']],
+        'StormName_B': cols_b['storm_name'][best['b']],
+        'Shared_Fixes': best['Shared_Fixes'].to_numpy(),
+        'Mean_Distance_km': best['Mean_Distance_km'].round(1).to_numpy(),
+        'First_Shared': best['First_Shared'].to_numpy(),
+        'Last_Shared': best['Last_Shared'].to_numpy(),
+        'Peak_Wind_A_kt': pd.array(peaks_a['wind'].to_numpy(), dtype='Int64'),
+        'Peak_Wind_B_kt': pd.array(peaks_b['wind'].to_numpy(), dtype='Int64'),
+        'Peak_Wind_A_10min_kt': pd.array(peaks_a['wind10'].to_numpy(), dtype='Int64'),
+        'Peak_Wind_B_10min_kt': pd.array(peaks_b['wind10'].to_numpy(), dtype='Int64'),
+        'Min_Pressure_A_hPa': pd.array(peaks_a['pressure'].to_numpy(), dtype='Int64'),
+        'Min_Pressure_B_hPa': pd.array(peaks_b['pressure'].to_numpy(), dtype='Int64'),
+    })
+    return matches[MATCH_COLUMNS]
+
+def sniff_format(file_path):
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'rb') as f:
+        return detect_format(f.read(4096))
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest best tracks of any agency and match storms across them.")
+    parser.add_argument('files', nargs='+', help="Best-track files (JMA, JTWC b-deck, IBTrACS CSV).")
+    parser.add_argument('--format', choices=list(FORMATS), help="Format of the files (default: detected).")
+    parser.add_argument('--ibtracs-agency', choices=list(IBTRACS_AGENCIES), default=IBTRACS_AGENCY,
+                        help="Agency columns read from IBTrACS CSV files.")
+    parser.add_argument('--no-output', action='store_true',
+                        help=f"Skip the enriched tables ({OUTPUT_TEMPLATE.format(source='<format>')}).")
+    parser.add_argument('--matches', default=MATCHES_FILE,
+                        help="With two or more files: storms of the first matched in each other file.")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from name_mapping import MAPPING_FILE, load_mapping_index
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    archives = []
+    for path in args.files:
+        fmt = args.format or sniff_format(path)
+        options = {'agency': args.ibtracs_agency} if fmt == 'ibtracs' else {}
+        cols = parse_best_track(path, fmt, **options)
+        if cols is None:
+            sys.exit(1)
+        source = f"{fmt}_{options['agency']}" if options else fmt
+        # Two files of the same source get numbered tables
+        taken = sum(name == source or name.startswith(f"{source}_") for name, _ in archives)
+        archives.append((f"{source}_{taken + 1}" if taken else source, cols))
+        print(f"{path}: {len(cols['storm_id'])} storms, {len(cols['timestamp'])} fixes")
+
+    # Outputs go next to the scripts, like every other stage
+    os.chdir(script_dir)
+    if not args.no_output:
+        mappings = load_mapping_index(MAPPING_FILE)
+        for source, cols in archives:
+            output_file = OUTPUT_TEMPLATE.format(source=source)
+            enrich(cols, mappings).to_csv(output_file, index=False)
+            print(f"Saved {len(cols['timestamp'])} rows to {output_file}")
+
+    if len(archives) > 1:
+        parts = []
+        for source, cols in archives[1:]:
+            matches = match_storms(archives[0][1], cols)
+            parts.append(matches.assign(Source_A=archives[0][0], Source_B=source))
+            print(f"{archives[0][0]} vs {source}: {len(matches)} of {len(archives[0][1]['storm_id'])} storms matched")
+        pd.concat(parts, ignore_index=True).to_csv(args.matches, index=False)
+        print(f"Matches saved to {args.matches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import STORE_DIR, STORE_META, STORE_COLUMNS, load_frame
+from storm_summary import build_storm_summary, fix_ace
+from track_index import KM_PER_DEGREE
+
+# --- CONFIGURATION ---
+# Tables for the Power BI model (typhoon_visuals.pbix): simplified tracks
+# for the map visuals and pre-aggregated facts for the charts
+SIMPLIFIED_FILE = 'ph_typhoon_track_simplified.csv'
+FIX_FACTS_FILE = 'ph_typhoon_fix_facts.csv'
+STORM_FACTS_FILE = 'ph_typhoon_storm_facts.csv'
+
+# Douglas-Peucker tolerance: a dropped fix is at most this far (km) from
+# the simplified line
+SIMPLIFY_TOLERANCE_KM = 10.0
+
+# Why a fix is in the simplified table, strongest reason first: first /
+# last fix of the storm, inside fix next to a PAR entry or exit, peak
+# wind or lowest pressure, first fix of a new classification, or kept by
+# Douglas-Peucker for the shape of the track
+KEEP_REASONS = ['endpoint', 'par', 'peak', 'classification', 'shape']
+
+SIMPLIFIED_COLUMNS = STORE_COLUMNS + ['Kept_For']
+
+# Grain: one row per (Year, Month, Classification, In_PAR) of the fixes,
+# and per (Year, Month of the first fix, Peak_Classification) of the storms
+FIX_FACT_COLUMNS = ['Year', 'Month', 'Classification', 'In_PAR', 'Fixes', 'Storms', 'ACE',
+                    'Max_WindSpeed_kt', 'Min_Pressure_hPa']
+STORM_FACT_COLUMNS = ['Year', 'Month', 'Peak_Classification', 'Storms', 'Storms_In_PAR', 'RI_Storms',
+                      'ACE', 'Hours_Inside_PAR', 'Max_WindSpeed_kt', 'Min_Pressure_hPa']
+
+def _segment_distance_km(lat, lon, lat_a, lon_a, lat_b, lon_b):
+    """
+    Distance (km) from points to the segments a-b, on a flat-earth
+    approximation around each segment.
+    """
+    scale = np.cos(np.radians((lat_a + lat_b) / 2))
+    px, py = (lon - lon_a) * scale, lat - lat_a
+    dx, dy = (lon_b - lon_a) * scale, lat_b - lat_a
+    length2 = dx * dx + dy * dy
+    t = np.clip((px * dx + py * dy) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+    return np.hypot(px - t * dx, py - t * dy) * KM_PER_DEGREE
+
+def douglas_peucker(group, lat, lon, tolerance_km=SIMPLIFY_TOLERANCE_KM, anchors=None):
+    """
+    Douglas-Peucker keep mask for tracks sorted by group (storm) and time,
+    all groups at once. The first and last fix of each group, fixes without
+    coordinates and the `anchors` are always kept; they split a track into
+    spans that are simplified independently. Each round measures every
+    dropped fix against the span around it and keeps the farthest fix of
+    every span that is off by more than tolerance_km, until none is.
+    """
+    group = np.asarray(group)
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    n = len(lat)
+    keep = np.zeros(n, dtype=bool) if anchors is None else np.array(anchors, dtype=bool)
+    if n == 0:
+        return keep
+    first = np.r_[True, group[1:] != group[:-1]]
+    keep |= first | np.r_[first[1:], True] | np.isnan(lat) | np.isnan(lon)
+
+    idx = np.arange(n)
+    while True:
+        dropped = np.flatnonzero(~keep)
+        if not len(dropped):
+            break
+        # The kept fixes on either side of each dropped one bound its span
+        a = np.maximum.accumulate(np.where(keep, idx, 0))[dropped]
+        b = np.minimum.accumulate(np.where(keep, idx, n - 1)[::-1])[::-1][dropped]
+        distance = _segment_distance_km(lat[dropped], lon[dropped], lat[a], lon[a], lat[b], lon[b])
+        far = distance > tolerance_km
+        if not far.any():
+            break
+        dropped, a, distance = dropped[far], a[far], distance[far]
+        order = np.lexsort((-distance, a))
+        _, farthest = np.unique(a[order], return_index=True)
+        keep[dropped[order[farthest]]] = True
+    return keep
+
+def keep_reasons(frame):
+    """
+    KEEP_REASONS index of the anchor reason of every fix of a frame sorted
+    by storm and time (len(KEEP_REASONS) - 1, 'shape', for a fix that is no
+    anchor).
+    """
+    sid = frame['StormID'].astype(str).to_numpy()
+    n = len(sid)
+    first = np.r_[True, sid[1:] != sid[:-1]] if n else np.zeros(0, dtype=bool)
+    last = np.r_[first[1:], True] if n else first
+
+    # The inside fix next to each change of In_PAR, so a map filtered to
+    # "Inside PAR" starts and ends where the full track does
+    inside = (frame['In_PAR'].astype(str) == 'Inside PAR').to_numpy()
+    changed = np.r_[False, inside[1:] != inside[:-1]] & ~first
+    par = inside & (changed | np.r_[changed[1:], False])
+
+    # First fix of the peak wind and of the lowest pressure of each storm
+    peak = np.zeros(n, dtype=bool)
+    for column, pick in (('WindSpeed_kt', 'idxmax'), ('Pressure_hPa', 'idxmin')):
+        values = pd.Series(frame[column].to_numpy(dtype=float, na_value=np.nan))
+        rows = getattr(values.groupby(sid, sort=False), pick)(skipna=True).dropna()
+        peak[rows.to_numpy(dtype=np.int64)] = True
+
+    classification = frame['Classification'].astype(str).to_numpy()
+    new_class = np.r_[False, classification[1:] != classification[:-1]] & ~first
+
+    return np.select([first | last, par, peak, new_class], [0, 1, 2, 3], default=len(KEEP_REASONS) - 1)
+
+def simplify_tracks(frame, tolerance_km=SIMPLIFY_TOLERANCE_KM):
+    """
+    The fixes of a track frame (store columns) that the simplified tracks
+    keep, sorted by storm and time, with a Kept_For column (KEEP_REASONS).
+    """
+    # A storm that runs into the next year sits in two year partitions
+    codes = pd.factorize(frame['StormID'].astype(str).to_numpy())[0]
+    order = np.lexsort((frame['Timestamp'].to_numpy(), codes))
+    frame = frame.iloc[order].reset_index(drop=True)
+
+    reason = keep_reasons(frame)
+    keep = douglas_peucker(codes[order], frame['Latitude'].to_numpy(dtype=float),
+                           frame['Longitude'].to_numpy(dtype=float), tolerance_km,
+                           anchors=reason < len(KEEP_REASONS) - 1)
+    simplified = frame[keep].copy()
+    simplified['Kept_For'] = np.array(KEEP_REASONS, dtype=object)[reason[keep]]
+    return simplified[SIMPLIFIED_COLUMNS]
+
+def fix_facts(frame):
+    """
+    Fixes per (Year, Month, Classification, In_PAR): fix count, distinct
+    storms, ACE, peak wind and lowest pressure.
+    """
+    stamp = frame['Timestamp'].to_numpy(dtype=np.int64)
+    wind = frame['WindSpeed_kt'].to_numpy(dtype=float, na_value=np.nan)
+    work = pd.DataFrame({
+        'Year': stamp // 1000000,
+        'Month': stamp // 10000 % 100,
+        'Classification': frame['Classification'].astype(str).to_numpy(),
+        'In_PAR': frame['In_PAR'].astype(str).to_numpy(),
+        'StormID': frame['StormID'].astype(str).to_numpy(),
+        'ACE': fix_ace(stamp % 100, wind, frame['Grade'].to_numpy(dtype=float, na_value=np.nan)),
+        'Wind': wind,
+        'Pressure': frame['Pressure_hPa'].to_numpy(dtype=float, na_value=np.nan),
+    })
+    facts = work.groupby(['Year', 'Month', 'Classification', 'In_PAR']).agg(
+        Fixes=('StormID', 'size'),
+        Storms=('StormID', 'nunique'),
+        ACE=('ACE', 'sum'),
+        Max_WindSpeed_kt=('Wind', 'max'),
+        Min_Pressure_hPa=('Pressure', 'min'),
+    ).reset_index()
+    facts['ACE'] = facts['ACE'].round(4)
+    for col in ['Max_WindSpeed_kt', 'Min_Pressure_hPa']:
+        facts[col] = facts[col].astype('Int64')
+    return facts[FIX_FACT_COLUMNS]
+
+def storm_facts(summary):
+    """
+    Storms per (Year, Month of the first fix, Peak_Classification) from the
+    storm summary: counts (all, inside PAR at some point, with rapid
+    intensification), ACE, hours inside PAR, peak wind and lowest pressure.
+    """
+    work = summary.assign(
+        Month=pd.to_numeric(summary['First_Timestamp'], errors='coerce') // 10000 % 100,
+        In_PAR=summary['PAR_Entry'].notna(),
+        Wind=pd.to_numeric(summary['Peak_WindSpeed_kt'], errors='coerce').astype(float),
+        Pressure=pd.to_numeric(summary['Min_Pressure_hPa'], errors='coerce').astype(float),
+    )
+    facts = work.groupby(['Year', 'Month', 'Peak_Classification']).agg(
+        Storms=('StormID', 'size'),
+        Storms_In_PAR=('In_PAR', 'sum'),
+        RI_Storms=('Rapid_Intensification', 'sum'),
+        ACE=('ACE', 'sum'),
+        Hours_Inside_PAR=('Hours_Inside_PAR', 'sum'),
+        Max_WindSpeed_kt=('Wind', 'max'),
+        Min_Pressure_hPa=('Pressure', 'min'),
+    ).reset_index()
+    facts['Month'] = facts['Month'].astype('Int64')
+    facts['ACE'] = facts['ACE'].round(4)
+    facts['Hours_Inside_PAR'] = facts['Hours_Inside_PAR'].round(2)
+    for col in ['Max_WindSpeed_kt', 'Min_Pressure_hPa']:
+        facts[col] = facts[col].astype('Int64')
+    return facts[STORM_FACT_COLUMNS]
+
+def export_bi_extracts(store_dir=STORE_DIR, simplified_file=SIMPLIFIED_FILE, fix_facts_file=FIX_FACTS_FILE,
+                       storm_facts_file=STORM_FACTS_FILE, tolerance_km=SIMPLIFY_TOLERANCE_KM):
+    """
+    From the columnar store: the simplified tracks and the two fact tables.
+    Returns the simplified tracks.
+    """
+    frame = load_frame(store_dir)
+    simplified = simplify_tracks(frame, tolerance_km)
+    simplified.to_csv(simplified_file, index=False)
+    counts = simplified['Kept_For'].value_counts()
+    print(f"Simplified tracks: {len(simplified)} of {len(frame)} fixes "
+          f"({len(frame) / max(len(simplified), 1):.1f}x fewer, tolerance {tolerance_km:g} km; "
+          + ', '.join(f"{reason} {counts.get(reason, 0)}" for reason in KEEP_REASONS)
+          + f") saved to {simplified_file}")
+
+    facts = fix_facts(frame)
+    facts.to_csv(fix_facts_file, index=False)
+    print(f"Fix facts: {len(facts)} rows saved to {fix_facts_file}")
+    facts = storm_facts(build_storm_summary(frame))
+    facts.to_csv(storm_facts_file, index=False)
+    print(f"Storm facts: {len(facts)} rows saved to {storm_facts_file}")
+    return simplified
+
+def main():
+    parser = argparse.ArgumentParser(description="Simplified tracks and fact tables for the Power BI model.")
+    parser.add_argument('--tolerance', type=float, default=SIMPLIFY_TOLERANCE_KM,
+                        help="Douglas-Peucker tolerance in km.")
+    args = parser.parse_args()
+    if args.tolerance < 0:
+        parser.error("--tolerance must not be negative")
+
+    # Setup paths relative to script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    if not os.path.exists(os.path.join(STORE_DIR, STORE_META)):
+        print(f"Error: no columnar store in {STORE_DIR}. Run main.py first.")
+        sys.exit(1)
+    export_bi_extracts(tolerance_km=args.tolerance)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+STORE_DIR = 'ph_typhoon_store'
+STORE_META = 'store.json'
+
+# Typed numeric columns (missing values are stored as NULL_INT)
+NUMERIC_COLUMNS = {
+    'Timestamp': 'int64',      # YYYYMMDDHH
+    'Latitude': 'float32',
+    'Longitude': 'float32',
+    'Pressure_hPa': 'int16',
+    'WindSpeed_kt': 'int16',
+    'Grade': 'int8',
+}
+NULL_INT = -1
+
+# Dictionary-encoded string columns: one shared dictionary per column,
+# integer codes per partition (int16 while the dictionary fits, else int32;
+# the store records which in 'code_dtypes')
+DICTIONARY_COLUMNS = ['StormID', 'StormName', 'PAGASA_Name', 'Classification', 'In_PAR']
+CODE_DTYPES = ['int16', 'int32']
+
+# Column order of the table (Year comes from the partition)
+STORE_COLUMNS = ['StormID', 'StormName', 'PAGASA_Name', 'Classification', 'Timestamp', 'In_PAR',
+                 'Latitude', 'Longitude', 'Pressure_hPa', 'WindSpeed_kt', 'Grade', 'Year']
+
+# Layout on disk:
+#   ph_typhoon_store/store.json               schema, dictionaries, rows per year
+#   ph_typhoon_store/year=1951/Latitude.npy   one typed .npy file per column
+#   ph_typhoon_store/year=1951/StormName.npy  dictionary codes
+#   ...
+# Every .npy is opened with mmap_mode='r', so a load only touches the pages of
+# the columns and years asked for.
+
+def _partition_dir(store_dir, year):
+    return os.path.join(store_dir, f"year={int(year)}")
+
+def _read_meta(store_dir):
+    meta_file = os.path.join(store_dir, STORE_META)
+    if not os.path.exists(meta_file):
+        return None
+    with open(meta_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_meta(store_dir, meta):
+    tmp_file = os.path.join(store_dir, STORE_META + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_file, os.path.join(store_dir, STORE_META))
+
+def _code_dtype(size):
+    """
+    Smallest of CODE_DTYPES that holds the codes of a dictionary of `size`.
+    """
+    for dtype in CODE_DTYPES:
+        if size - 1 <= np.iinfo(dtype).max:
+            return dtype
+    raise ValueError(f"Dictionary of {size} values does not fit {CODE_DTYPES[-1]} codes")
+
+def _code_dtypes(meta):
+    # Stores written before 'code_dtypes' existed have int16 codes
+    return meta.get('code_dtypes') or {col: 'int16' for col in DICTIONARY_COLUMNS}
+
+def _as_text(values):
+    values = pd.Series(values).astype(object)
+    return values.where(values.notna(), '').astype(str).to_numpy()
+
+def _extend(values, dictionary):
+    """
+    Appends the unseen values of a column to `dictionary` (in sorted order).
+    Returns the column's distinct values, the row -> distinct value index and
+    the value -> code lookup.
+    """
+    values = _as_text(values)
+    lookup = {value: code for code, value in enumerate(dictionary)}
+    uniques, inverse = np.unique(values, return_inverse=True)
+    for value in uniques:
+        if value not in lookup:
+            lookup[value] = len(dictionary)
+            dictionary.append(value)
+    return uniques, inverse, lookup
+
+def _encode(values, dictionary, dtype):
+    """
+    Dictionary-encodes a column as `dtype` codes, appending unseen values to
+    `dictionary`.
+    """
+    uniques, inverse, lookup = _extend(values, dictionary)
+    codes = np.array([lookup[value] for value in uniques], dtype=dtype)
+    return codes[inverse]
+
+def _to_typed(values, dtype):
+    """
+    Numeric column (strings, floats or nullable ints) -> fixed NumPy dtype.
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    if np.dtype(dtype).kind == 'f':
+        return values.astype(dtype)
+    return np.where(np.isnan(values), NULL_INT, values).astype(dtype)
+
+def _write_partition(store_dir, year, frame, dictionaries, code_dtypes):
+    part_dir = _partition_dir(store_dir, year)
+    os.makedirs(part_dir, exist_ok=True)
+    for col in DICTIONARY_COLUMNS:
+        np.save(os.path.join(part_dir, f"{col}.npy"), _encode(frame[col], dictionaries[col], code_dtypes[col]))
+    for col, dtype in NUMERIC_COLUMNS.items():
+        np.save(os.path.join(part_dir, f"{col}.npy"), _to_typed(frame[col], dtype))
+    return len(frame)
+
+def write_store(df, store_dir=STORE_DIR):
+    """
+    Writes the full enriched track table as a year-partitioned columnar store,
+    replacing any previous store in store_dir.
+    """
+    if os.path.exists(store_dir):
+        shutil.rmtree(store_dir)
+    os.makedirs(store_dir)
+
+    # Dictionaries first (in partition order, as the codes are assigned), so
+    # every partition gets codes of the type the full dictionary needs
+    dictionaries = {col: [] for col in DICTIONARY_COLUMNS}
+    years = pd.to_numeric(df['Year']).to_numpy()
+    for year in np.unique(years):
+        for col in DICTIONARY_COLUMNS:
+            _extend(df[col][years == year], dictionaries[col])
+    code_dtypes = {col: _code_dtype(len(dictionaries[col])) for col in DICTIONARY_COLUMNS}
+
+    partitions = {}
+    for year in np.unique(years):
+        partitions[str(int(year))] = _write_partition(store_dir, year, df[years == year], dictionaries, code_dtypes)
+
+    _write_meta(store_dir, {
+        'columns': STORE_COLUMNS,
+        'numeric': NUMERIC_COLUMNS,
+        'null_int': NULL_INT,
+        'code_dtypes': code_dtypes,
+        'dictionaries': dictionaries,
+        'partitions': partitions,
+    })
+    print(f"Columnar store written to {store_dir} ({len(partitions)} year partitions).")
+
+def update_store(df_new, replaced_ids, storm_order, store_dir=STORE_DIR):
+    """
+    Splices re-processed storms into an existing store: rows of the storms in
+    `replaced_ids` are dropped, the rows of `df_new` inserted, and only the
+    year partitions touched by either are rewritten.
+    `storm_order` maps StormID -> position in the input file (row order).
+    Returns False if there is no store to update.
+    """
+    meta = _read_meta(store_dir)
+    if meta is None:
+        return False
+
+    dictionaries = meta['dictionaries']
+    code_dtypes = _code_dtypes(meta)
+    replaced_ids = set(replaced_ids)
+    replaced_codes = np.array([code for code, sid in enumerate(dictionaries['StormID'])
+                               if sid in replaced_ids], dtype=np.int64)
+
+    new_years = pd.to_numeric(df_new['Year']).to_numpy()
+    affected = set(int(y) for y in np.unique(new_years))
+    for year in meta['partitions']:
+        codes = np.load(os.path.join(_partition_dir(store_dir, year), 'StormID.npy'), mmap_mode='r')
+        if np.isin(codes, replaced_codes).any():
+            affected.add(int(year))
+
+    # A dictionary that outgrows its code type gets every partition rewritten
+    # with the wider one
+    widened = {col: _code_dtype(len(dictionaries[col]) + len(set(_as_text(df_new[col])) - set(dictionaries[col])))
+               for col in DICTIONARY_COLUMNS}
+    if widened != code_dtypes:
+        affected.update(int(year) for year in meta['partitions'])
+        code_dtypes = widened
+    meta['code_dtypes'] = code_dtypes
+
+    for year in sorted(affected):
+        parts = [df_new[new_years == year]]
+        if str(year) in meta['partitions']:
+            old = load_frame(store_dir, years=[year], meta=meta)
+            parts.insert(0, old[~old['StormID'].isin(replaced_ids)])
+        frame = pd.concat([p for p in parts if len(p)] or parts[:1], ignore_index=True)
+
+        # Keep the input file's storm order (stable within a storm)
+        position = frame['StormID'].map(storm_order).to_numpy()
+        frame = frame.iloc[np.argsort(position, kind='stable')]
+
+        shutil.rmtree(_partition_dir(store_dir, year), ignore_errors=True)
+        if len(frame):
+            meta['partitions'][str(year)] = _write_partition(store_dir, year, frame, dictionaries, code_dtypes)
+        else:
+            meta['partitions'].pop(str(year), None)
+
+    meta['partitions'] = dict(sorted(meta['partitions'].items(), key=lambda kv: int(kv[0])))
+    _write_meta(store_dir, meta)
+    print(f"Columnar store updated: {len(affected)} year partitions rewritten.")
+    return True
+
+def load_columns(store_dir=STORE_DIR, columns=None, years=None, meta=None):
+    """
+    Memory-maps the requested columns of the requested years.
+    Returns (arrays, meta): raw arrays per column (dictionary codes of the
+    store's code_dtypes for the string columns, NULL_INT for missing ints)
+    plus 'Year'. A single
+    partition is returned as read-only memmaps; several are concatenated,
+    which only copies the selected columns/years.
+    """
+    meta = meta or _read_meta(store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No columnar store in {store_dir}")
+
+    columns = [c for c in (columns or STORE_COLUMNS)]
+    wanted = sorted(int(y) for y in meta['partitions']) if years is None else sorted(
+        int(y) for y in years if str(int(y)) in meta['partitions'])
+
+    pieces = {col: [] for col in columns}
+    for year in wanted:
+        part_dir = _partition_dir(store_dir, year)
+        for col in columns:
+            if col == 'Year':
+                pieces[col].append(np.full(meta['partitions'][str(year)], year, dtype=np.int16))
+            else:
+                pieces[col].append(np.load(os.path.join(part_dir, f"{col}.npy"), mmap_mode='r'))
+
+    arrays = {}
+    for col in columns:
+        if len(pieces[col]) == 1:
+            arrays[col] = pieces[col][0]
+        elif pieces[col]:
+            arrays[col] = np.concatenate(pieces[col])
+        else:
+            if col in DICTIONARY_COLUMNS:
+                dtype = _code_dtypes(meta)[col]
+            else:
+                dtype = np.int16 if col == 'Year' else NUMERIC_COLUMNS[col]
+            arrays[col] = np.empty(0, dtype=dtype)
+    return arrays, meta
+
+def load_frame(store_dir=STORE_DIR, columns=None, years=None, meta=None):
+    """
+    Loads the requested columns/years as a DataFrame: dictionary columns become
+    categoricals, missing ints become <NA> (nullable Int dtypes).
+    """
+    arrays, meta = load_columns(store_dir, columns, years, meta)
+    code_dtypes = _code_dtypes(meta)
+    data = {}
+    for col, values in arrays.items():
+        if col in DICTIONARY_COLUMNS:
+            codes = np.asarray(values, dtype=code_dtypes[col])
+            data[col] = pd.Categorical.from_codes(codes, categories=meta['dictionaries'][col])
+        elif col in NUMERIC_COLUMNS and np.dtype(NUMERIC_COLUMNS[col]).kind == 'i' and col != 'Timestamp':
+            values = np.asarray(values)
+            data[col] = pd.arrays.IntegerArray(values, values == NULL_INT)
+        else:
+            data[col] = np.asarray(values)
+    return pd.DataFrame(data)
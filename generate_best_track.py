@@ -0,0 +1,210 @@
+import argparse
+import os
+
+import numpy as np
+
+# --- CONFIGURATION ---
+OUTPUT_TEMPLATE = 'bst_synthetic_{scale}x.txt'
+
+# Same span as the real archive (two-digit years: 51-99 -> 19yy, 00-50 -> 20yy)
+FIRST_YEAR = 1951
+LAST_YEAR = 2025
+
+# Calibrated on bst_all.txt: ~26 storms a year, ~36 fixes per storm
+STORMS_PER_YEAR = 26
+LIFETIME_SHAPE = 4.0        # gamma-distributed lifetime (hours)
+LIFETIME_SCALE = 62.0
+MIN_LIFETIME_HOURS = 36
+MAX_LIFETIME_HOURS = 480
+
+# Genesis month weights (storms per month in the real archive, Jan-Dec)
+GENESIS_MONTH_WEIGHTS = [30, 18, 29, 49, 79, 131, 298, 421, 366, 279, 163, 85]
+
+# Before 1977 JMA gives no wind, no wind radii and only grades 2 / 9 / 6, and
+# some fixes are missing (12-hour gaps)
+WIND_ERA_YEAR = 1977
+PRE_WIND_ERA_GAP_PROB = 0.03
+
+# From 1977 on, 3-hourly fixes are added while a storm is in this latitude
+# band (near Okinawa / Japan), as in the real archive
+SUBSYNOPTIC_LAT = (25.0, 35.0)
+SUBSYNOPTIC_PROB = 0.5
+
+# Track model: west-northwest drift, recurvature to the northeast for most
+# storms, extra-tropical transition at higher latitudes (degrees / 3 hours)
+STEP_HOURS = 3
+SPEED_DEG = 0.5
+RECURVE_PROB = 0.6
+
+# Storms leave the data set outside this box
+LAT_LIMIT = 55.0
+LON_LIMITS = (100.0, 180.0)
+
+NAMES = ['AGNES', 'BESS', 'CARMEN', 'DELLA', 'ELAINE', 'FAYE', 'GLORIA', 'HESTER', 'IRMA', 'JUDY',
+         'KIT', 'LOLA', 'MAMIE', 'NINA', 'ORA', 'PHYLLIS', 'RITA', 'SUSAN', 'TESS', 'VIOLA',
+         'WINNIE', 'ALICE', 'BETTY', 'CORA', 'DORIS', 'ELSIE', 'FLOSSIE', 'GRACE', 'HELEN', 'IDA']
+UNNAMED_PROB = 0.05
+
+ID_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+ID_DIGITS = '0123456789' + ID_LETTERS
+
+def storm_id(year, serial, overflow):
+    """
+    yyNN as in the real archive. Beyond 99 storms a year (10x / 100x scales)
+    the ID is a letter and three base-62 digits from a file-wide counter, so
+    IDs stay unique and never look like a real yyNN.
+    """
+    if serial <= 99:
+        return f"{year % 100:02d}{serial:02d}"
+    digits = ''
+    for _ in range(3):
+        overflow, rest = divmod(overflow, 62)
+        digits = ID_DIGITS[rest] + digits
+    return ID_LETTERS[overflow % len(ID_LETTERS)] + digits
+
+def simulate_track(rng, start_lat, start_lon, lifetime):
+    """
+    Lat / lon / central pressure every STEP_HOURS for one storm, ending early
+    if it leaves the data area. Also returns whether it went extra-tropical
+    at each step and whether it left the area.
+    """
+    n = int(lifetime // STEP_HOURS) + 1
+    heading = np.radians(rng.normal(292, 12))
+    turn = np.radians(rng.normal(4.0, 1.5)) if rng.random() < RECURVE_PROB else 0.0
+    recurve_lat = rng.normal(24, 4)
+    et_lat = rng.normal(32, 4)
+    speed = SPEED_DEG * rng.uniform(0.7, 1.3)
+
+    lat = np.empty(n)
+    lon = np.empty(n)
+    lat[0], lon[0] = start_lat, start_lon
+    wobble = np.radians(rng.normal(0, 4, n))
+    left = False
+    for i in range(1, n):
+        if lat[i - 1] > recurve_lat - 3 and turn:
+            # Turn clockwise towards the northeast and speed up
+            heading = min(heading + turn, np.radians(405))
+            step = speed * 1.4
+        else:
+            step = speed
+        h = heading + wobble[i]
+        lat[i] = lat[i - 1] + step * np.cos(h)
+        lon[i] = lon[i - 1] + step * np.sin(h) / np.cos(np.radians(lat[i - 1]))
+        if not 0 < lat[i] < LAT_LIMIT or not LON_LIMITS[0] < lon[i] < LON_LIMITS[1]:
+            n, left = i, True
+            break
+    lat, lon = lat[:n], lon[:n]
+
+    # Intensity: deepen to the peak, then fill (faster once extra-tropical)
+    depth = np.clip(10 + rng.gamma(2.0, 17.0), 14, 110)
+    t = np.arange(n) * STEP_HOURS
+    t_peak = max(rng.uniform(0.3, 0.7) * lifetime, STEP_HOURS)
+    extratropical = np.maximum.accumulate((lat > et_lat) & (t > t_peak))
+    decay = np.where(extratropical, 30.0, 72.0)
+    shape = np.where(t <= t_peak, (t / t_peak) ** 1.3, np.exp(-(t - t_peak) / decay))
+    pressure = np.round(1008 - depth * shape + rng.normal(0, 0.7, n)).astype(int)
+    return lat, lon, np.minimum(pressure, 1010), extratropical, left
+
+def storm_lines(rng, sid, number, name, start_hours, lat, lon, pressure, extratropical, left):
+    """
+    Header and data lines of one storm in the format.txt layout.
+    start_hours: genesis time as numpy datetime64[h].
+    """
+    n = len(lat)
+    times = start_hours + np.arange(n) * STEP_HOURS
+    stamps = times.astype(str)
+    years = np.array([int(s[:4]) for s in stamps])
+    wind_era = years[0] >= WIND_ERA_YEAR
+
+    # Fixes kept: synoptic hours, plus 3-hourly ones near Japan in the
+    # wind era; some synoptic fixes dropped before it
+    hours = np.array([int(s[11:13]) for s in stamps])
+    keep = hours % 6 == 0
+    if wind_era:
+        band = (lat >= SUBSYNOPTIC_LAT[0]) & (lat <= SUBSYNOPTIC_LAT[1])
+        keep |= band & (rng.random(n) < SUBSYNOPTIC_PROB)
+    else:
+        keep &= (rng.random(n) >= PRE_WIND_ERA_GAP_PROB) | (np.arange(n) == 0)
+    idx = np.flatnonzero(keep)
+
+    wind = 6.7 * np.maximum(1010 - pressure, 0) ** 0.644
+    wind = (np.round(wind / 5) * 5).astype(int)
+    lines = []
+    for i in idx:
+        s = stamps[i]
+        yymmddhh = s[2:4] + s[5:7] + s[8:10] + s[11:13]
+        w = wind[i]
+        if extratropical[i]:
+            grade = 6
+        elif w < 34:
+            grade = 2
+        elif not wind_era:
+            grade = 9
+        else:
+            grade = 3 if w < 48 else 4 if w < 64 else 5
+        line = f"{yymmddhh} 002 {grade} {round(lat[i] * 10):03d} {round(lon[i] * 10):4d} {pressure[i]:4d}"
+        if wind_era:
+            shown = 0 if grade in (2, 6) else w
+            r50 = r30 = '00000 0000'
+            if grade in (3, 4, 5):
+                long30 = int(round((90 + (w - 34) * 3 + rng.normal(0, 20)) / 10) * 10)
+                r30 = f"{rng.integers(1, 10)}{max(long30, 30):04d} {int(max(long30, 30) * rng.uniform(0.6, 1.0)):04d}"
+                if w >= 50:
+                    long50 = int(round((30 + (w - 50) * 1.5 + rng.normal(0, 10)) / 10) * 10)
+                    r50 = f"{rng.integers(1, 10)}{max(long50, 10):04d} {int(max(long50, 10) * rng.uniform(0.6, 1.0)):04d}"
+            line += f"     {shown:03d}     {r50} {r30}"
+            if 30 <= lat[i] <= 40 and 128 <= lon[i] <= 142 and rng.random() < 0.05:
+                line += "         #"
+        lines.append(line)
+
+    revision = f"20{rng.integers(10, 26):02d}{rng.integers(1, 13):02d}{rng.integers(1, 29):02d}"
+    header = (f"66666 {sid:>4}  {len(lines):3d} {number % 10000:04d} {sid:>4} {int(left)} 6 "
+              f"{name:<20}              {revision}")
+    return [header] + lines
+
+def generate_best_track(output_file, scale=1.0, seed=0, first_year=FIRST_YEAR, last_year=LAST_YEAR):
+    """
+    Writes a synthetic JMA best-track file with about `scale` times the
+    storms of the real archive per year. Same seed and scale, same file.
+    Returns (storms, fixes).
+    """
+    rng = np.random.default_rng(seed)
+    month_p = np.array(GENESIS_MONTH_WEIGHTS, dtype=float) / sum(GENESIS_MONTH_WEIGHTS)
+    n_storms = n_fixes = overflow = 0
+
+    with open(output_file, 'w', newline='\n') as f:
+        for year in range(first_year, last_year + 1):
+            count = rng.poisson(STORMS_PER_YEAR * scale)
+            months = np.sort(rng.choice(12, size=count, p=month_p)) + 1
+            for serial, month in enumerate(months, 1):
+                sid = storm_id(year, serial, overflow)
+                overflow += serial > 99
+                name = '' if rng.random() < UNNAMED_PROB else NAMES[(n_storms + year) % len(NAMES)]
+                start = np.datetime64(f"{year}-{month:02d}-{rng.integers(1, 29):02d}T00", 'h') \
+                    + int(rng.integers(0, 4)) * 6
+                lifetime = np.clip(rng.gamma(LIFETIME_SHAPE, LIFETIME_SCALE), MIN_LIFETIME_HOURS, MAX_LIFETIME_HOURS)
+                track = simulate_track(rng, np.clip(rng.normal(14, 4), 5, 25),
+                                       np.clip(rng.normal(140, 10), 112, 172), lifetime)
+                lines = storm_lines(rng, sid, n_storms + 1, name, start, *track)
+                f.write('\n'.join(lines) + '\n')
+                n_storms += 1
+                n_fixes += len(lines) - 1
+
+    print(f"Synthetic best track: {n_storms} storms, {n_fixes} fixes ({scale:g}x) saved to {output_file}")
+    return n_storms, n_fixes
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic JMA best-track files (format.txt layout).")
+    parser.add_argument('--scale', type=float, nargs='+', default=[1.0],
+                        help="Size relative to the real archive, e.g. 1 10 100.")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (same seed, same file).")
+    parser.add_argument('--out-dir', default='.', help="Directory for the bst_synthetic_<scale>x.txt files.")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for scale in args.scale:
+        generate_best_track(os.path.join(args.out_dir, OUTPUT_TEMPLATE.format(scale=f"{scale:g}")),
+                            scale, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 
 import csv
+import os
+
+# --- CONFIGURATION ---
+OUTPUT_FILE = 'missing_typhoon_names.csv'
 
 data = [
     # 1965
@@ -177,11 +181,16 @@ data = [
     ("1983", "Thelma", "Krising"), ("1983", "TD", "Dadang"),
 ]
 
-# Write to CSV
-file_path = "x:\\Programming\\Python\\Japan Typhoons\\missing_typhoon_names.csv"
-with open(file_path, 'w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f)
-    writer.writerow(["Year", "International Name", "PAGASA Name"])
-    writer.writerows(data)
+def write_missing_names(file_path):
+    # Write to CSV (LF line endings, like the committed table)
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(["Year", "International Name", "PAGASA Name"])
+        writer.writerows(data)
+
+    print(f"Successfully created {file_path} with {len(data)} rows.")
 
-print(f"Successfully created {file_path} with {len(data)} rows.")
+if __name__ == "__main__":
+    # Setup paths relative to script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    write_missing_names(OUTPUT_FILE)
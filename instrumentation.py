@@ -0,0 +1,167 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# --- CONFIGURATION ---
+# The run report sits next to the output CSV: <output>.report.json
+REPORT_SUFFIX = '.report.json'
+PROFILE_SUFFIX = '.prof'
+
+# Functions / allocation sites listed in the report's profile section
+PROFILE_TOP = 25
+
+PROFILE_MODES = ['cprofile', 'tracemalloc']
+
+def report_path(output_file, suffix=REPORT_SUFFIX):
+    return os.path.splitext(output_file)[0] + suffix
+
+class RunStats:
+    """
+    Stage timers and counters of one run. Stages may nest (a stage's time
+    includes its sub-stages). While tracemalloc is tracing, every stage also
+    records its peak traced memory.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.timers = {}
+        self.counters = {}
+        self.rejected = {}
+        self.profile = None
+        self.peak_bytes = 0
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # Keep the run's and the parent's peak so far before resetting it
+            # for this stage
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak_bytes = max(self.peak_bytes, peak)
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+        frame = [name, 0]
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            timer = self.timers.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            timer['seconds'] += elapsed
+            timer['calls'] += 1
+            if tracing and tracemalloc.is_tracing():
+                peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+                timer['peak_mb'] = max(timer.get('peak_mb', 0.0), round(peak / 2**20, 2))
+                self.peak_bytes = max(self.peak_bytes, peak)
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def reject(self, reason, n=1):
+        """
+        Input the run dropped, by reason (lines, fixes or storms).
+        """
+        if n:
+            self.rejected[reason] = self.rejected.get(reason, 0) + int(n)
+
+    def snapshot(self):
+        return {'timers': self.timers, 'counters': self.counters, 'rejected': self.rejected}
+
+    def merge(self, snapshot):
+        """
+        Adds the stats of another process (a parallel parsing worker).
+        """
+        for name, timer in snapshot['timers'].items():
+            own = self.timers.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            own['seconds'] += timer['seconds']
+            own['calls'] += timer['calls']
+        for name, n in snapshot['counters'].items():
+            self.count(name, n)
+        for reason, n in snapshot['rejected'].items():
+            self.reject(reason, n)
+
+# Stats of the current run (main.py resets it at the start of a run)
+STATS = RunStats()
+stage = STATS.stage
+count = STATS.count
+reject = STATS.reject
+
+@contextmanager
+def profiled(mode, output_file):
+    """
+    Runs the body under cProfile or tracemalloc (mode None: neither) and puts
+    the top functions / allocation sites into STATS.profile. cProfile also
+    dumps the full stats to <output>.prof (for snakeviz, pstats, ...).
+    """
+    if mode is None:
+        yield
+        return
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            prof_file = report_path(output_file, PROFILE_SUFFIX)
+            profiler.dump_stats(prof_file)
+            stats = pstats.Stats(profiler, stream=io.StringIO()).sort_stats('cumulative')
+            top = []
+            for (file, line, func), (cc, nc, tt, ct, _) in list(stats.stats.items()):
+                top.append({'function': f"{os.path.basename(file)}:{line}({func})",
+                            'calls': nc, 'tottime': round(tt, 4), 'cumtime': round(ct, 4)})
+            top.sort(key=lambda entry: entry['cumtime'], reverse=True)
+            STATS.profile = {'mode': mode, 'stats_file': prof_file, 'top': top[:PROFILE_TOP]}
+    elif mode == 'tracemalloc':
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            peak = max(STATS.peak_bytes, tracemalloc.get_traced_memory()[1])
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            top = [{'site': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    'size_mb': round(stat.size / 2**20, 3), 'blocks': stat.count}
+                   for stat in snapshot.statistics('lineno')[:PROFILE_TOP]]
+            STATS.profile = {'mode': mode, 'peak_mb': round(peak / 2**20, 2), 'top_retained': top}
+    else:
+        raise ValueError(f"unknown profile mode {mode!r}")
+
+def write_report(output_file, **info):
+    """
+    Writes the run report (JSON) next to the output and returns it: run
+    info, stage timers, counters, rejected input by reason and the profile.
+    """
+    report = dict(info, output_file=output_file)
+    report['started'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(STATS.started))
+    report['total_seconds'] = round(time.time() - STATS.started, 3)
+    report['stages'] = {name: dict(timer, seconds=round(timer['seconds'], 4))
+                        for name, timer in STATS.timers.items()}
+    report['counters'] = dict(STATS.counters)
+    report['rejected'] = dict(STATS.rejected)
+    report['rejected_total'] = sum(STATS.rejected.values())
+    if STATS.profile is not None:
+        report['profile'] = STATS.profile
+
+    path = report_path(output_file)
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        print(f"Run report saved to {path}")
+    except OSError as e:
+        print(f"Warning: could not write {path}: {e}")
+    return report
@@ -1,12 +1,75 @@
-import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import json
 import os
+import re
+import shutil
+import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# pandas and the output sinks (store, SQLite, summary, name mapping) are
+# imported by the functions that use them, so the parser, geofencing and
+# classification functions can be imported with NumPy alone
+from storm_track import tracks_from_columns
+from instrumentation import PROFILE_MODES, STATS, count, profiled, reject, stage, write_report
 
 # --- CONFIGURATION ---
 INPUT_FILE = 'bst_all.txt'
 MAPPING_FILE = 'pagasa_mapping_all.csv'
 OUTPUT_FILE = 'ph_typhoon_data_v2.csv'
 
+MANIFEST_FILE = 'ph_typhoon_data_v2.manifest.json'
+
+# Streaming export: storms enriched per batch (bounds memory, keeps NumPy busy)
+STREAM_BATCH_STORMS = 64
+
+# CSV rendering: rows formatted per block (bounds the padded byte matrix)
+CSV_CHUNK_ROWS = 100_000
+
+# Integer columns written zero-padded to a width, as the best-track text has
+# them (the MySQL tables compare these cells as text: '050' < '100')
+CSV_ZERO_PAD = {'WindSpeed_kt': 3}
+
+# Parallel parsing: chunks per worker (load balancing vs. per-task overhead)
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+# Bump when the output of build_output_frame (or of a side output derived
+# from it, like the storm summary) changes, so incremental runs rebuild
+# everything instead of splicing old rows next to new ones.
+# 3: a storm whose mapped PAGASA name is blank gets '' instead of 'nan'.
+# 4: the summary's Rapid_Intensification also counts a 30 kt wind gain.
+OUTPUT_FORMAT_VERSION = 4
+
+# Output table column order
+OUTPUT_COLUMNS = ['StormID', 'StormName', 'PAGASA_Name', 'Classification', 'Timestamp', 'In_PAR',
+                  'Latitude', 'Longitude', 'Pressure_hPa', 'WindSpeed_kt', 'Grade', 'Year']
+
+# Output table dtypes: labels are categoricals (one copy of each string),
+# numbers the smallest type that holds them, nullable where a fix can lack
+# the value. Timestamp is the YYYYMMDDHH integer of the columnar store;
+# positions stay float64 (float32 would shift the PAR crossing times the
+# storm summary derives from them).
+OUTPUT_DTYPES = {
+    'StormID': 'category',
+    'StormName': 'category',
+    'PAGASA_Name': 'category',
+    'Classification': 'category',
+    'Timestamp': 'int64',
+    'In_PAR': 'category',
+    'Latitude': 'float64',
+    'Longitude': 'float64',
+    'Pressure_hPa': 'Int16',
+    'WindSpeed_kt': 'Int16',
+    'Grade': 'Int8',
+    'Year': 'int16',
+}
+
+# In_PAR states (category order of the In_PAR column)
+PAR_STATES = ["Outside PAR", "Inside PAR", "Exited PAR"]
+
 # PAR POLYGON VERTICES (Longitude, Latitude)
 # (25°N, 120°E), (25°N, 135°E), (5°N, 135°E), (5°N, 115°E), (15°N, 115°E), (21°N, 120°E)
 PAR_VERTICES = [
@@ -19,6 +82,35 @@ PAR_VERTICES = [
     # Implicitly closes back to (120, 25)
 ]
 
+# PAR lookup grid resolution (degrees) used by is_in_par_batch
+PAR_GRID_STEP = 0.1
+
+# JMA DATA LINE LAYOUT (see format.txt) -> (start, end) byte columns
+JMA_DATA_FIELDS = {
+    'time': (0, 8),          # yymmddhh
+    'grade': (13, 14),
+    'lat': (15, 18),         # 0.1 degree
+    'lon': (19, 23),         # 0.1 degree
+    'pressure': (24, 28),    # hPa
+    'wind': (33, 36),        # kt
+    'dir50': (41, 42),       # direction of longest 50kt radius
+    'r50_long': (42, 46),    # nm
+    'r50_short': (47, 51),   # nm
+    'dir30': (52, 53),       # direction of longest 30kt radius
+    'r30_long': (53, 57),    # nm
+    'r30_short': (58, 62),   # nm
+}
+
+# Per-fix table columns of the wind radii fields
+RADII_COLUMNS = {
+    'R50_Dir': JMA_DATA_FIELDS['dir50'],
+    'R50_Long_nm': JMA_DATA_FIELDS['r50_long'],
+    'R50_Short_nm': JMA_DATA_FIELDS['r50_short'],
+    'R30_Dir': JMA_DATA_FIELDS['dir30'],
+    'R30_Long_nm': JMA_DATA_FIELDS['r30_long'],
+    'R30_Short_nm': JMA_DATA_FIELDS['r30_short'],
+}
+
 def estimate_wind_from_pressure(pressure):
     """
     Estimates 1-min sustained wind speed (kt) from central pressure (hPa)
@@ -114,6 +206,82 @@ def get_classification(grade_str, wind_kt_str, pressure_str=None):
         
     return ""
 
+# PAGASA classification labels (category order of the Classification column)
+CLASSIFICATIONS = [
+    "",
+    "Tropical Depression",
+    "Tropical Storm",
+    "Severe Tropical Storm",
+    "Typhoon",
+    "Super Typhoon",
+    "Extra-tropical Cyclone",
+]
+
+def estimate_wind_from_pressure_array(pressure):
+    """
+    Vectorized estimate_wind_from_pressure (Atkinson & Holliday).
+    Pressures at or above 1010 hPa (and NaN) give 0.
+    """
+    pressure = np.asarray(pressure, dtype=float)
+    with np.errstate(invalid='ignore'):
+        deficit = np.where(pressure < 1010, 1010 - pressure, 0.0)
+    return 6.7 * (deficit ** 0.644)
+
+def classify_columns(grade, wind, pressure):
+    """
+    Columnar version of get_classification: takes numeric grade (-1 or NaN
+    when missing), wind (kt) and pressure (hPa) arrays (NaN when missing) and
+    returns a categorical Classification column in one vectorized pass.
+    Same precedence as the scalar function, which stays the reference:
+      1. grade 6 -> Extra-tropical Cyclone
+      2. measured wind thresholds
+      3. wind estimated from pressure (grade 9 is at least a Tropical Storm)
+      4. grade-only fallback
+    """
+    import pandas as pd
+    grade = np.nan_to_num(np.asarray(grade, dtype=float), nan=-1)
+    wind = np.asarray(wind, dtype=float)
+    pressure = np.asarray(pressure, dtype=float)
+
+    has_wind = ~np.isnan(wind)
+    use_est = ~has_wind & ~np.isnan(pressure)
+    est = estimate_wind_from_pressure_array(pressure)
+    # Fixes classified on Atkinson & Holliday instead of a measured wind
+    # (grade 6 is decided before wind, so those are not counted)
+    count('wind_estimated_from_pressure', np.count_nonzero(use_est & (grade != 6)))
+
+    def bands(speed, valid):
+        # Same closed intervals as the scalar chain (values in the gaps fall through)
+        return [
+            valid & (speed < 34),
+            valid & (speed >= 34) & (speed <= 47),
+            valid & (speed >= 48) & (speed <= 63),
+            valid & (speed >= 64) & (speed <= 99),
+            valid & (speed >= 100),
+        ]
+
+    td, ts, sts, ty, sty = range(1, 6)
+    etc = 6
+    with np.errstate(invalid='ignore'):
+        wind_bands = bands(wind, has_wind)
+        est_bands = bands(est, use_est)
+    conditions = (
+        [grade == 6]
+        + wind_bands
+        + [est_bands[0] & (grade == 9)]
+        + est_bands
+        + [grade == 2, grade == 3, grade == 4, grade == 5, grade == 9]
+    )
+    choices = (
+        [etc]
+        + [td, ts, sts, ty, sty]
+        + [ts]
+        + [td, ts, sts, ty, sty]
+        + [td, ts, sts, ty, ts]
+    )
+    codes = np.select(conditions, choices, default=0).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=CLASSIFICATIONS)
+
 def is_in_par(lat, lon):
     """
     Ray-casting algorithm to check if a point is inside the PAR polygon.
@@ -135,49 +303,112 @@ def is_in_par(lat, lon):
         j = i
     return inside
 
+def is_in_par_array(lat, lon):
+    """
+    Vectorized twin of is_in_par: runs the same ray-casting test over whole
+    arrays of coordinates (one pass per polygon edge instead of per point).
+    Missing (NaN) coordinates are reported as outside.
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    inside = np.zeros(np.broadcast(lat, lon).shape, dtype=bool)
+
+    j = len(PAR_VERTICES) - 1
+    with np.errstate(invalid='ignore'):
+        for i in range(len(PAR_VERTICES)):
+            xi, yi = PAR_VERTICES[i]
+            xj, yj = PAR_VERTICES[j]
+
+            # Same expression (and evaluation order) as the scalar version
+            intersect = ((yi > lat) != (yj > lat)) & \
+                (lon < (xj - xi) * (lat - yi) / (yj - yi + 1e-10) + xi)
+            inside ^= intersect
+            j = i
+    return inside
+
+# Lookup grid cell codes
+PAR_CELL_OUTSIDE = 0
+PAR_CELL_INSIDE = 1
+PAR_CELL_BOUNDARY = 2
+
+@lru_cache(maxsize=1)
+def _par_grid():
+    """
+    Builds the PAR lookup grid: PAR_GRID_STEP cells over the polygon's bounding
+    box (plus one cell of margin), each tagged inside, outside or boundary.
+    Cells an edge passes through, and their neighbours, are 'boundary' so that
+    rounding in the cell index of a point can never skip the exact test.
+    Returns (lon0, lat0, codes) where codes[row, col] covers
+    lat0 + row*step .. and lon0 + col*step ..
+    """
+    lons = [x for x, _ in PAR_VERTICES]
+    lats = [y for _, y in PAR_VERTICES]
+    step = PAR_GRID_STEP
+    lon0, lat0 = min(lons) - step, min(lats) - step
+    n_cols = int(round((max(lons) - min(lons)) / step)) + 2
+    n_rows = int(round((max(lats) - min(lats)) / step)) + 2
+
+    # Classify every cell by its centre with the exact ray-casting test
+    centre_lon = lon0 + (np.arange(n_cols) + 0.5) * step
+    centre_lat = lat0 + (np.arange(n_rows) + 0.5) * step
+    inside = is_in_par_array(centre_lat[:, None], centre_lon[None, :])
+    codes = np.where(inside, PAR_CELL_INSIDE, PAR_CELL_OUTSIDE).astype(np.uint8)
+
+    # Mark the cells each edge passes through (sampled well below cell size)
+    edge = np.zeros((n_rows, n_cols), dtype=bool)
+    j = len(PAR_VERTICES) - 1
+    for i in range(len(PAR_VERTICES)):
+        (xi, yi), (xj, yj) = PAR_VERTICES[i], PAR_VERTICES[j]
+        n_samples = int(max(abs(xj - xi), abs(yj - yi)) / step * 4) + 2
+        t = np.linspace(0.0, 1.0, n_samples)
+        rows = np.floor((yi + (yj - yi) * t - lat0) / step).astype(int)
+        cols = np.floor((xi + (xj - xi) * t - lon0) / step).astype(int)
+        edge[np.clip(rows, 0, n_rows - 1), np.clip(cols, 0, n_cols - 1)] = True
+        j = i
+
+    # Grow the edge cells by one cell in every direction
+    grown = edge.copy()
+    grown[1:, :] |= edge[:-1, :]
+    grown[:-1, :] |= edge[1:, :]
+    grown[:, 1:] |= grown[:, :-1].copy()
+    grown[:, :-1] |= grown[:, 1:].copy()
+    codes[grown] = PAR_CELL_BOUNDARY
+    return lon0, lat0, codes
+
+def is_in_par_batch(lat, lon):
+    """
+    Array-in/array-out PAR geofence, same answers as is_in_par.
+    1. Points outside the polygon's bounding box (or NaN) are outside.
+    2. The rest are looked up in the precomputed _par_grid cells.
+    3. Only points in boundary cells run the exact (vectorized) edge test.
+    """
+    lat, lon = np.broadcast_arrays(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+    shape = lat.shape
+    lat, lon = lat.ravel(), lon.ravel()
+    lon0, lat0, codes = _par_grid()
+    n_rows, n_cols = codes.shape
+
+    # Bounding box prefilter (the grid already spans it)
+    with np.errstate(invalid='ignore'):
+        rows = np.floor((lat - lat0) / PAR_GRID_STEP)
+        cols = np.floor((lon - lon0) / PAR_GRID_STEP)
+        idx = np.flatnonzero((rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols))
+
+    result = np.zeros(len(lat), dtype=bool)
+    cell = codes[rows[idx].astype(np.intp), cols[idx].astype(np.intp)]
+    result[idx[cell == PAR_CELL_INSIDE]] = True
+
+    boundary = idx[cell == PAR_CELL_BOUNDARY]
+    result[boundary] = is_in_par_array(lat[boundary], lon[boundary])
+    return result.reshape(shape)
+
 def load_mappings():
     """
-    Loads mapping from CSV and applies manual overrides.
-    Returns a dict: (Year, Name_Upper) -> PAGASA_Name
+    Loads the shared PAGASA name-mapping index (name_mapping.py): CSV plus
+    manual overrides, names normalized, cached on disk next to the CSV.
     """
-    mapping = {}
-    
-    # 1. Load from CSV if exists
-    if os.path.exists(MAPPING_FILE):
-        try:
-            df_map = pd.read_csv(MAPPING_FILE)
-            for _, row in df_map.iterrows():
-                try:
-                    yr = int(row['Year'])
-                    intl = str(row['International Name']).strip().upper()
-                    pagasa = str(row['PAGASA Name']).strip()
-                    if intl and intl != 'NAN' and intl != 'N/A':
-                        mapping[(yr, intl)] = pagasa
-                except (ValueError, IndexError):
-                    continue
-            print(f"Loaded {len(mapping)} mappings from CSV.")
-        except Exception as e:
-            print(f"Warning: Could not load {MAPPING_FILE}: {e}")
-    
-    # 2. Apply Manual Overrides
-    # format: (Year, International_Name) -> PAGASA_Name
-    manual_overrides = {
-        (1979, 'TIP'): 'WARLING',
-        (1975, 'JUNE'): 'ROSING',
-        (1973, 'NORA'): 'LUING',
-        (1978, 'RITA'): 'KADING',
-        (1984, 'VANESSA'): 'NITANG',
-        (1966, 'KIT'): 'EMANG',
-        (1983, 'FORREST'): 'ISING',
-        (1971, 'IRMA'): 'INING',
-        (1990, 'FLO'): 'BIDANG',
-        (1981, 'ELSIE'): 'TASING',
-        (2015, 'SOUDELOR'): 'HANNA'
-    }
-    
-    mapping.update(manual_overrides)
-    print(f"Total mappings after overrides: {len(mapping)}")
-    return mapping
+    from name_mapping import load_mapping_index
+    return load_mapping_index(MAPPING_FILE)
 
 def parse_jma_data(file_path):
     if not os.path.exists(file_path):
@@ -193,9 +424,11 @@ def parse_jma_data(file_path):
     storms = {} # ID -> list of rows
     
     print("Parsing JMA data...")
+    lines_read = 0
     with open(file_path, 'r') as f:
-        for line in f:
+        for lines_read, line in enumerate(f, 1):
             if line.startswith('66666'):
+                count('headers')
                 current_id = line[6:10].strip()
                 current_name = line[30:50].strip()
                 if not current_name:
@@ -208,9 +441,19 @@ def parse_jma_data(file_path):
                 
                 if current_id not in storms:
                     storms[current_id] = {'rows': [], 'name': current_name, 'entered_par': False}
+                else:
+                    count('repeated_storm_ids')
                 continue
-            
+
+            if not line.strip():
+                reject('blank_line')
+                continue
+            if current_id is None:
+                reject('before_first_header')
+                continue
+
             # Data Line
+            reason = 'bad_coordinates'
             try:
                 date_str = line[0:8].strip()      # YYMMDDHH
                 grade = line[13:14].strip()
@@ -218,11 +461,15 @@ def parse_jma_data(file_path):
                 long_raw = line[19:23].strip()
                 pressure = line[24:28].strip()
                 wind = line[33:36].strip()
+                # Wind radii (format.txt H-M): direction code, longest and
+                # shortest radius (nm) of the 50 kt and the 30 kt winds
+                radii = {column: line[start:end].strip() for column, (start, end) in RADII_COLUMNS.items()}
                 
                 lat = float(lat_raw) / 10.0 if lat_raw else None
                 long = float(long_raw) / 10.0 if long_raw else None
                 
                 # Year Handling
+                reason = 'bad_timestamp'
                 yy = int(date_str[:2])
                 year = 1900 + yy if yy > 50 else 2000 + yy
                 full_ts = f"{year}{date_str[2:]}"
@@ -231,6 +478,8 @@ def parse_jma_data(file_path):
                 in_par = False
                 if lat is not None and long is not None:
                     in_par = is_in_par(lat, long)
+                else:
+                    count('fixes_missing_coordinates')
                 
                 row = {
                     'StormID': current_id,
@@ -242,53 +491,326 @@ def parse_jma_data(file_path):
                     'Grade': grade,
                     'Pressure_hPa': pressure,
                     'WindSpeed_kt': wind,
+                    **radii,
                     'In_PAR': in_par
                 }
                 
                 storms[current_id]['rows'].append(row)
+                count('fixes_parsed')
                 if in_par:
                     storms[current_id]['entered_par'] = True
                     
             except ValueError:
+                reject(reason)
                 continue
-                
+
+    count('lines_read', lines_read)
     return storms
 
+def _decode_fixed_field(buf, starts, ends, start, end):
+    """
+    Decodes one fixed-width integer field of every line in a raw byte buffer.
+    `starts`/`ends` are the offsets of each line and of its newline; columns
+    past the end of a short line read as the newline (blank).
+    Returns (values, n_digits, valid):
+      values   - int32 value of the digits (0 where blank)
+      n_digits - number of digits in the field (0 = missing)
+      valid    - the stripped text is a plain integer or empty (what float()/int()
+                 in parse_jma_data would accept for this file format)
+    """
+    n = len(starts)
+    values = np.zeros(n, dtype=np.int32)
+    n_digits = np.zeros(n, dtype=np.uint8)
+    runs = np.zeros(n, dtype=np.uint8)
+    bad = np.zeros(n, dtype=bool)
+
+    # Scratch buffers reused for every column (large temporaries are costly)
+    index = np.empty_like(starts)
+    chars = np.empty(n, dtype=np.uint8)
+    digit = np.empty(n, dtype=np.uint8)
+    is_digit = np.empty(n, dtype=bool)
+    prev_digit = np.zeros(n, dtype=bool)
+    scratch = np.empty(n, dtype=bool)
+    shifted = np.empty(n, dtype=np.int32)
+
+    # Horner's scheme, one character position at a time (blanks are skipped)
+    for col in range(start, end):
+        np.add(starts, col, out=index)
+        np.minimum(index, ends, out=index)
+        np.take(buf, index, out=chars)
+        np.subtract(chars, ord('0'), out=digit)
+        np.less(digit, 10, out=is_digit)
+
+        np.multiply(values, 10, out=shifted)
+        np.add(shifted, digit, out=shifted)
+        np.copyto(values, shifted, where=is_digit)
+
+        # Anything that is neither a digit nor blank/control
+        np.greater(chars, ord(' '), out=scratch)
+        np.greater(scratch, is_digit, out=scratch)
+        bad |= scratch
+
+        # Count runs of digits
+        np.greater(is_digit, prev_digit, out=scratch)
+        runs += scratch
+        n_digits += is_digit
+        prev_digit, is_digit = is_digit, prev_digit
+
+    # "1 5" is rejected just like float("1 5")
+    return values, n_digits, ~bad & (runs <= 1)
+
+def parse_jma_columns(file_path):
+    """
+    Vectorized alternative to parse_jma_data.
+    Reads the whole best-track file into a byte buffer, splits header and data
+    rows on the '66666' prefix and decodes the fixed columns of format.txt
+    straight into NumPy arrays instead of building a dict per 6-hourly fix.
+
+    Returns a dict of arrays:
+      storm_id, storm_name, storm_revision, storm_entered_par  (one per storm)
+      storm_index, timestamp (YYYYMMDDHH), year, grade, lat, lon, pressure,
+      wind, dir50, r50_long, r50_short, dir30, r30_long, r30_short, in_par
+                                                              (one per fix)
+    Missing numeric values are NaN; missing grade/direction codes are -1.
+    Data lines without a full 8-digit yymmddhh stamp are skipped.
+    """
+    if not os.path.exists(file_path):
+        print(f"Error: {file_path} not found.")
+        return None
+
+    print("Parsing JMA data (vectorized)...")
+    with open(file_path, 'rb') as f:
+        return parse_jma_bytes(f.read())
+
+def parse_jma_bytes(data):
+    """
+    Body of parse_jma_columns for best-track text already in memory
+    (a whole file or any run of complete storm blocks).
+    """
+    if not data.endswith(b'\n'):
+        data += b'\n'
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    # int32 offsets keep the per-column index arrays small (and fast)
+    offset_type = np.int32 if len(buf) < 2**31 else np.int64
+    ends = np.flatnonzero(buf == ord('\n')).astype(offset_type)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+
+    # Only lines starting with '6' can be headers, check the rest on those
+    header_rows = np.flatnonzero(buf[starts] == ord('6'))
+    for col, char in enumerate(b'6666', start=1):
+        header_rows = header_rows[buf[np.minimum(starts[header_rows] + col, ends[header_rows])] == char]
+    is_header = np.zeros(len(starts), dtype=bool)
+    is_header[header_rows] = True
+
+    # Header lines are few (~2k), decode them as text. Duplicate IDs are folded
+    # into the first storm with that ID, like the dict in parse_jma_data.
+    storm_ids, storm_names, storm_revisions = [], [], []
+    first_seen = {}
+    header_to_storm = []
+    for a, b in zip(starts[header_rows].tolist(), ends[header_rows].tolist()):
+        line = data[a:b].decode('latin-1')
+        storm_id = line[6:10].strip()
+        if storm_id not in first_seen:
+            first_seen[storm_id] = len(storm_ids)
+            storm_ids.append(storm_id)
+            storm_names.append(line[30:50].strip() or "UNNAMED")
+            storm_revisions.append(line[64:72].strip())
+        header_to_storm.append(first_seen[storm_id])
+    header_to_storm = np.array(header_to_storm, dtype=np.int32)
+
+    # Data lines: everything after the first header that is not a header
+    header_ordinal = np.cumsum(is_header) - 1
+    data_rows = np.flatnonzero(~is_header & (header_ordinal >= 0))
+    data_starts, data_ends = starts[data_rows], ends[data_rows]
+    fields = {name: _decode_fixed_field(buf, data_starts, data_ends, start, end)
+              for name, (start, end) in JMA_DATA_FIELDS.items()}
+
+    # A fix needs a full yymmddhh stamp and parseable (or blank) coordinates
+    keep = (fields['time'][1] == 8) & fields['lat'][2] & fields['lon'][2]
+    order = None if keep.all() else np.flatnonzero(keep)
+
+    count('lines_read', len(starts))
+    count('headers', len(header_rows))
+    count('repeated_storm_ids', len(header_to_storm) - len(storm_ids))
+    count('fixes_parsed', np.count_nonzero(keep))
+    reject('before_first_header', np.count_nonzero(~is_header & (header_ordinal < 0)))
+    # Rejected lines are rare, sort out why one by one
+    for i in np.flatnonzero(~keep).tolist():
+        if not data[data_starts[i]:data_ends[i]].strip():
+            reject('blank_line')
+        elif not (fields['lat'][2][i] and fields['lon'][2][i]):
+            reject('bad_coordinates')
+        else:
+            reject('bad_timestamp')
+
+    storm_index = header_to_storm[header_ordinal[data_rows]]
+    if order is not None:
+        storm_index = storm_index[order]
+    if len(header_to_storm) != len(storm_ids):
+        # Rows of a repeated ID are appended to the earlier storm
+        resort = np.argsort(storm_index, kind='stable')
+        storm_index = storm_index[resort]
+        order = resort if order is None else order[resort]
+
+    def column(name, scale=1.0, code=False):
+        values, n_digits, valid = fields[name]
+        present = (n_digits > 0) & valid
+        if code:
+            out = np.where(present, values, -1).astype(np.int8)
+        else:
+            out = np.where(present, values / scale, np.nan)
+        return out if order is None else out[order]
+
+    time_val = fields['time'][0] if order is None else fields['time'][0][order]
+    yy = time_val // 1000000
+    year = yy + np.where(yy > 50, 1900, 2000).astype(np.int32)
+
+    lat = column('lat', 10.0)
+    lon = column('lon', 10.0)
+    count('fixes_missing_coordinates', np.count_nonzero(np.isnan(lat) | np.isnan(lon)))
+    in_par = is_in_par_batch(lat, lon)
+
+    entered_par = np.zeros(len(storm_ids), dtype=bool)
+    entered_par[storm_index[in_par]] = True
+
+    return {
+        'storm_id': np.array(storm_ids, dtype=object),
+        'storm_name': np.array(storm_names, dtype=object),
+        'storm_revision': np.array(storm_revisions, dtype=object),
+        'storm_entered_par': entered_par,
+        'storm_index': storm_index,
+        'timestamp': year.astype(np.int64) * 1000000 + time_val % 1000000,
+        'year': year,
+        'grade': column('grade', code=True),
+        'lat': lat,
+        'lon': lon,
+        'pressure': column('pressure'),
+        'wind': column('wind'),
+        'dir50': column('dir50', code=True),
+        'r50_long': column('r50_long'),
+        'r50_short': column('r50_short'),
+        'dir30': column('dir30', code=True),
+        'r30_long': column('r30_long'),
+        'r30_short': column('r30_short'),
+        'in_par': in_par,
+    }
+
+def parse_jma_tracks(file_path):
+    """
+    Same storms as parse_jma_data, as {StormID: StormTrack} (storm_track.py):
+    typed per-storm arrays instead of one dict per fix.
+    """
+    cols = parse_jma_columns(file_path)
+    if cols is None:
+        return None
+    return tracks_from_columns(cols)
+
+def jma_columns_to_frame(cols):
+    """
+    Builds the same per-fix table parse_jma_data produces (one row per fix,
+    same column names) from the arrays of parse_jma_columns, typed as in
+    OUTPUT_DTYPES: StormID and StormName are categoricals coded by storm,
+    Timestamp, Grade, Pressure_hPa, WindSpeed_kt and the wind radii
+    (RADII_COLUMNS) are numeric (nullable) instead of text.
+    """
+    import pandas as pd
+    idx = cols['storm_index']
+    return pd.DataFrame({
+        'StormID': storm_categorical(cols['storm_id'], idx),
+        'StormName': storm_categorical(cols['storm_name'], idx),
+        'Timestamp': cols['timestamp'].astype(np.int64),
+        'Year': cols['year'].astype(np.int16),
+        'Latitude': cols['lat'],
+        'Longitude': cols['lon'],
+        'Grade': pd.array(np.where(cols['grade'] >= 0, cols['grade'], np.nan), dtype='Int8'),
+        'Pressure_hPa': pd.array(cols['pressure'], dtype='Int16'),
+        'WindSpeed_kt': pd.array(cols['wind'], dtype='Int16'),
+        'R50_Dir': pd.array(np.where(cols['dir50'] >= 0, cols['dir50'], np.nan), dtype='Int8'),
+        'R50_Long_nm': pd.array(cols['r50_long'], dtype='Int16'),
+        'R50_Short_nm': pd.array(cols['r50_short'], dtype='Int16'),
+        'R30_Dir': pd.array(np.where(cols['dir30'] >= 0, cols['dir30'], np.nan), dtype='Int8'),
+        'R30_Long_nm': pd.array(cols['r30_long'], dtype='Int16'),
+        'R30_Short_nm': pd.array(cols['r30_short'], dtype='Int16'),
+        'In_PAR': cols['in_par'],
+    })
+
+def storm_categorical(values, storm_index):
+    """
+    Per-fix categorical of a per-storm value (the storm's ID, name, ...):
+    the distinct values once, codes through the fixes' storm index.
+    """
+    import pandas as pd
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    return pd.Categorical.from_codes(codes[storm_index], uniques)
+
+def as_output_types(df):
+    """
+    The output table with the OUTPUT_DTYPES, whatever built it (text rows of
+    the legacy parser, frames concatenated across workers).
+    """
+    import pandas as pd
+    typed = {}
+    for col in df.columns:
+        dtype = OUTPUT_DTYPES.get(col)
+        if dtype is None or df[col].dtype == dtype:
+            typed[col] = df[col]
+        elif dtype == 'category':
+            typed[col] = df[col].astype('category')
+        else:
+            typed[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    return pd.DataFrame(typed, index=df.index)
+
+def resolve_pagasa_names(mappings, first_years, names, entered_par):
+    """
+    PAGASA name of each storm from its first year, JMA name and whether it
+    ever entered PAR (one vectorized join for all storms).
+    """
+    import pandas as pd
+    from name_mapping import attach_pagasa_names
+    # Priority 1: Mapping index (Year, normalized Name)
+    found = attach_pagasa_names(mappings, first_years, names)
+
+    # Priority 2: Historical & Location fallback
+    first_years = np.asarray(first_years)
+    entered_par = np.asarray(entered_par, dtype=bool)
+    fallback = np.where(entered_par, np.where(first_years < 1963, "PRE-1963", ""), "OUTSIDE PAR")
+    missing = pd.isna(found) | (found == '')
+
+    count('mapping_hits', np.count_nonzero(~missing))
+    count('mapping_misses', np.count_nonzero(missing))
+    count('mapping_misses_outside_par', np.count_nonzero(missing & ~entered_par))
+    count('mapping_misses_pre_1963', np.count_nonzero(missing & entered_par & (first_years < 1963)))
+    # Storms that entered PAR in the naming era but got no PAGASA name
+    count('mapping_misses_unmatched', np.count_nonzero(missing & entered_par & (first_years >= 1963)))
+    return np.where(missing, fallback, found).astype(object)
+
 def process_and_export(storms, mappings):
+    import pandas as pd
+    from columnar_store import STORE_DIR, write_store
+    from name_mapping import NEAR_MISS_FILE
+    from rapid_intensification import RI_EVENTS_FILE, export_ri_events
+    from sqlite_sink import DB_FILE, load_sqlite
+    from storm_summary import SUMMARY_FILE, build_storm_summary, write_storm_summary
     final_rows = []
     
     print("Processing names and geofencing...")
-    for storm_id, data in storms.items():
-        entered_par = data['entered_par']
+    named = [data for data in storms.values() if data['rows']]
+    reject('storm_without_fixes', len(storms) - len(named))
+    with stage('pagasa_names'):
+        pagasa_names = resolve_pagasa_names(mappings, [data['rows'][0]['Year'] for data in named],
+                                            [data['name'] for data in named],
+                                            [data['entered_par'] for data in named])
+
+    for data, pagasa_name in zip(named, pagasa_names):
         rows = data['rows']
-        name = data['name']
-        
-        if not rows:
-            continue
-            
-        first_year = rows[0]['Year']
-        lookup_name = name.upper()
-        
-        pagasa_name = ""
-        
-        # Priority 1: Mapping Dict (Year, Name)
-        found_name = mappings.get((first_year, lookup_name))
-        
-        # Priority 2: Historical & Location fallback
-        if found_name:
-            pagasa_name = found_name
-        elif entered_par:
-            if first_year < 1963:
-                pagasa_name = "PRE-1963"
-        else:
-            pagasa_name = "OUTSIDE PAR"
-            
+
         has_entered_so_far = False
         for row in rows:
             row['PAGASA_Name'] = pagasa_name
-            # Classification
-            row['Classification'] = get_classification(row['Grade'], row['WindSpeed_kt'], row['Pressure_hPa'])
-            
+
             # Update In_PAR Logic (Stateful)
             currently_in = row['In_PAR']
             if currently_in:
@@ -303,43 +825,591 @@ def process_and_export(storms, mappings):
             final_rows.append(row)
             
     df = pd.DataFrame(final_rows)
-    
-    # Columns order
-    cols = ['StormID', 'StormName', 'PAGASA_Name', 'Classification', 'Timestamp', 'In_PAR', 
-            'Latitude', 'Longitude', 'Pressure_hPa', 'WindSpeed_kt', 'Grade', 'Year']
-    
-    # Ensure all exist
-    existing_cols = [c for c in cols if c in df.columns]
-    df = df[existing_cols]
-    
+
+    # Classification (one vectorized pass over the whole table)
+    if not df.empty:
+        with stage('classify'):
+            df['Classification'] = classify_columns(
+                pd.to_numeric(df['Grade'], errors='coerce'),
+                pd.to_numeric(df['WindSpeed_kt'], errors='coerce'),
+                pd.to_numeric(df['Pressure_hPa'], errors='coerce'),
+            )
+
+    # Ensure all exist; text rows become the typed table (OUTPUT_DTYPES)
+    existing_cols = [c for c in OUTPUT_COLUMNS if c in df.columns]
+    df = as_output_types(df[existing_cols])
+    with stage('write_csv'):
+        write_output(df)
+    count('rows_written', len(df))
+    # Storm-level summary (one row per storm) next to the fix table
+    summary = save_side_output(write_storm_summary, SUMMARY_FILE, build_storm_summary(df))
+
+    save_side_output(write_store, STORE_DIR, df)
+    save_side_output(load_sqlite, DB_FILE, df, summary)
+    save_side_output(export_ri_events, RI_EVENTS_FILE)
+    save_side_output(report_name_near_misses, NEAR_MISS_FILE, summary, mappings)
+
+def build_output_frame(cols, mappings):
+    """
+    Columnar counterpart of process_and_export: turns the arrays of
+    parse_jma_columns into the final table (PAGASA names, classification and
+    the Inside/Exited/Outside PAR state) without a Python loop per fix.
+    """
+    import pandas as pd
+    frame = jma_columns_to_frame(cols)
+    idx = cols['storm_index']
+    n_storms = len(cols['storm_id'])
+
+    # Storm-level: first year and PAGASA name (fixes are grouped by storm,
+    # storms without fixes simply have no rows)
+    first_row = np.searchsorted(idx, np.arange(n_storms))
+    first_year = cols['year'][np.minimum(first_row, len(idx) - 1)] if len(idx) else np.zeros(n_storms, int)
+    pagasa = resolve_pagasa_names(mappings, first_year, cols['storm_name'], cols['storm_entered_par'])
+
+    # Stateful In_PAR: inside now, inside at some earlier fix, or never yet
+    in_par = cols['in_par']
+    seen = np.cumsum(in_par)
+    seen_before = seen - np.concatenate([[0], seen])[first_row][idx]
+    state = np.where(in_par, 1, np.where(seen_before > 0, 2, 0)).astype(np.int8)
+
+    frame['PAGASA_Name'] = storm_categorical(pagasa, idx)
+    frame['In_PAR'] = pd.Categorical.from_codes(state, PAR_STATES)
+    frame['Classification'] = classify_columns(cols['grade'], cols['wind'], cols['pressure'])
+    return frame[OUTPUT_COLUMNS]
+
+def write_output(df, output_file=OUTPUT_FILE):
+    """
+    Writes the final table to CSV (falling back to another name if the file
+    is locked, e.g. open in Excel) and prints the validation stats.
+    """
+    df = as_output_types(df)
+    text = csv_header(df.columns) + render_csv(df)[0]
     try:
-        df.to_csv(OUTPUT_FILE, index=False)
-        print(f"Success! Saved {len(df)} rows to {OUTPUT_FILE}")
+        with open(output_file, 'wb') as f:
+            f.write(text)
+        print(f"Success! Saved {len(df)} rows to {output_file}")
     except PermissionError:
         fallback_file = "ph_typhoon_data_v4.csv"
-        df.to_csv(fallback_file, index=False)
-        print(f"Notice: {OUTPUT_FILE} and v3 were locked. Saved to {fallback_file} instead.")
-    
-    # Validation stats
-    par_entries = df[df['In_PAR'] == "Inside PAR"]
-    print(f"Rows inside PAR: {len(par_entries)}")
-    
-    pre63 = df[df['PAGASA_Name'] == 'PRE-1963']
-    print(f"Historical (Pre-1963) PAR storms identified: {pre63['StormID'].nunique()}")
-    
-    mapped = df[ (df['PAGASA_Name'] != '') & (df['PAGASA_Name'].notna()) ]
-    print(f"Total rows with PAGASA names: {len(mapped)}")
+        with open(fallback_file, 'wb') as f:
+            f.write(text)
+        print(f"Notice: {output_file} and v3 were locked. Saved to {fallback_file} instead.")
+
+    # Validation stats, on the category codes (no string compared per row)
+    in_par = category_mask(df['In_PAR'], ["Inside PAR"])
+    print(f"Rows inside PAR: {np.count_nonzero(in_par)}")
+
+    pre63 = category_mask(df['PAGASA_Name'], ['PRE-1963'])
+    storms = df['StormID'].cat.codes.to_numpy()[pre63]
+    print(f"Historical (Pre-1963) PAR storms identified: {len(np.unique(storms[storms >= 0]))}")
+
+    mapped = ~category_mask(df['PAGASA_Name'], ['']) & (df['PAGASA_Name'].cat.codes.to_numpy() >= 0)
+    print(f"Total rows with PAGASA names: {np.count_nonzero(mapped)}")
+
+def category_mask(values, labels):
+    """
+    Rows of a categorical column whose value is one of `labels`.
+    """
+    categories = values.cat.categories
+    wanted = np.flatnonzero(categories.isin(labels))
+    return np.isin(values.cat.codes.to_numpy(), wanted)
+
+def _csv_quote(text):
+    # The quoting of to_csv (csv.QUOTE_MINIMAL)
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+def csv_header(columns):
+    return (','.join(_csv_quote(str(col)) for col in columns) + '\n').encode('utf-8')
+
+def _csv_cells(values, zero_pad=0):
+    """
+    One column as CSV cells, without a Python string per row: (table, used,
+    index, length). Row i's bytes are the `used` bytes of table row
+    index[i] (index None: row i), length[i] of them.
+    Labels and floats are formatted once per distinct value, integers
+    digit by digit (at least `zero_pad` digits, zero-filled).
+    """
+    import pandas as pd
+    dtype = values.dtype
+    if pd.api.types.is_integer_dtype(dtype):
+        missing = values.isna().to_numpy()
+        number = values.to_numpy(dtype=np.int64, na_value=0)
+        negative = number < 0
+        magnitude = np.abs(number)
+        digits = np.full(len(number), max(zero_pad, 1), dtype=np.int8)
+        power = 10**int(digits.max(initial=1))
+        while len(number) and power <= magnitude.max():
+            digits += magnitude >= power
+            power *= 10
+        width = int(digits.max(initial=1) + negative.any())
+        # Right-aligned: the last column holds the units
+        table = np.empty((len(number), width), dtype=np.uint8)
+        for j in range(width):
+            table[:, width - 1 - j] = 48 + magnitude // 10**j % 10
+        table[np.flatnonzero(negative), width - 1 - digits[negative]] = ord('-')
+        length = np.where(missing, 0, digits + negative).astype(np.int8)
+        used = np.arange(width, dtype=np.int8) >= (width - length)[:, None]
+        return table, used, None, length
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        texts = [_csv_quote(str(value)) for value in values.cat.categories]
+    elif pd.api.types.is_float_dtype(dtype):
+        uniques, codes = np.unique(values.to_numpy(dtype=float, na_value=np.nan), return_inverse=True)
+        texts = ['' if text == 'nan' else text for text in uniques.astype(str)]
+    else:
+        codes, uniques = pd.factorize(values)
+        texts = [_csv_quote(str(value)) for value in uniques]
+    # Code -1 (missing) takes the empty text appended last
+    encoded = np.array([text.encode('utf-8') for text in texts] + [b''])
+    width = max(encoded.dtype.itemsize, 1)
+    table = np.frombuffer(encoded.astype(f'S{width}').tobytes(), dtype=np.uint8).reshape(-1, width)
+    lengths = np.char.str_len(encoded).astype(np.int32)
+    codes = np.where(codes >= 0, codes, len(texts)).astype(np.int32)
+    return table, np.arange(width) < lengths[:, None], codes, lengths[codes]
+
+def render_csv(df):
+    """
+    The rows of a table as CSV (the bytes to_csv(index=False, header=False)
+    writes) and the offset of every row in them, plus the end. Every cell
+    gets a fixed-width slot in a byte matrix, CSV_CHUNK_ROWS rows at a
+    time; dropping the padding leaves the rows one after the other.
+    Columns in CSV_ZERO_PAD are zero-filled to their width.
+    """
+    cells = [_csv_cells(df[col], CSV_ZERO_PAD.get(col, 0)) for col in df.columns]
+    n = len(df)
+    # Each cell is followed by a comma, the last one by the newline
+    row_length = np.full(n, len(cells), dtype=np.int64)
+    for *_, length in cells:
+        row_length += length
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(row_length, out=offsets[1:])
+
+    width = sum(table.shape[1] + 1 for table, *_ in cells)
+    parts = []
+    for start in range(0, n, CSV_CHUNK_ROWS):
+        stop = min(start + CSV_CHUNK_ROWS, n)
+        slots = np.empty((stop - start, width), dtype=np.uint8)
+        used = np.ones((stop - start, width), dtype=bool)
+        column = 0
+        for table, cell_used, index, _ in cells:
+            rows = slice(start, stop) if index is None else index[start:stop]
+            end = column + table.shape[1]
+            slots[:, column:end] = table[rows]
+            used[:, column:end] = cell_used[rows]
+            slots[:, end] = ord(',')
+            column = end + 1
+        slots[:, -1] = ord('\n')
+        parts.append(slots[used].tobytes())
+    return b''.join(parts), offsets
+
+def save_side_output(writer, target, *args):
+    """
+    Runs the writer of a secondary output (storm summary, columnar store,
+    SQLite database, RI events, name report) and returns its result. The CSV stays the primary output,
+    so a failure only prints a warning and returns None; the half-written
+    target is removed so the next run rebuilds it.
+    """
+    try:
+        with stage(writer.__name__):
+            return writer(*args)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: could not write {target}: {e}")
+        if os.path.isdir(target):
+            shutil.rmtree(target, ignore_errors=True)
+        elif os.path.exists(target):
+            os.remove(target)
+        return None
+
+def unmatched_storms(summary):
+    """
+    The storms of a summary that entered PAR (1963 onwards) but got no
+    PAGASA name. The summary may come back from the CSV as text ('' for no
+    PAR entry).
+    """
+    import pandas as pd
+    entered_par = summary['PAR_Entry'].fillna('').astype(str) != ''
+    return summary[entered_par & (pd.to_numeric(summary['Year'], errors='coerce') >= 1963)
+                   & (summary['PAGASA_Name'].fillna('') == '')]
+
+def report_name_near_misses(summary, mappings):
+    """
+    Close-but-unmatched mapping candidates for the unmatched_storms, for
+    manual review.
+    """
+    from name_mapping import near_misses, write_near_misses
+    if summary is None:
+        return None
+    unmatched = unmatched_storms(summary)
+    return write_near_misses(near_misses(mappings, unmatched['Year'], unmatched['StormName']))
+
+def update_name_near_misses(summary, summary_new, mappings):
+    """
+    report_name_near_misses after an incremental run: only the re-parsed
+    storms (summary_new) are looked up and spliced into the existing report,
+    which is rebuilt in full if it is missing.
+    """
+    from name_mapping import update_near_misses
+    if summary is None:
+        return None
+    unmatched = unmatched_storms(summary)
+    new = unmatched_storms(summary_new)
+    report = update_near_misses(mappings, new['Year'], new['StormName'],
+                                zip(unmatched['Year'], unmatched['StormName']))
+    return report if report is not None else report_name_near_misses(summary, mappings)
+
+def split_storm_blocks(data):
+    """
+    Splits best-track text into per-storm blocks on the '66666' header lines.
+    Returns an ordered dict: StormID -> {'revision', 'hash', 'blocks'} where
+    blocks are (start, end) byte ranges. A repeated ID keeps its first
+    position and gets the later blocks appended (as in parse_jma_data).
+    """
+    header_starts = [m.start() for m in re.finditer(rb'^66666', data, re.MULTILINE)]
+    # Text before the first header belongs to no storm and is never parsed
+    preamble = data[:header_starts[0] if header_starts else len(data)].splitlines()
+    blank = sum(1 for line in preamble if not line.strip())
+    reject('blank_line', blank)
+    reject('before_first_header', len(preamble) - blank)
+    storms = {}
+    for start, end in zip(header_starts, header_starts[1:] + [len(data)]):
+        newline = data.find(b'\n', start, end)
+        header = data[start:newline if newline >= 0 else end].decode('latin-1')
+        storm_id = header[6:10].strip()
+        storm = storms.setdefault(storm_id, {'revision': [], 'blocks': []})
+        storm['revision'].append(header[64:72].strip())
+        storm['blocks'].append((start, end))
+
+    for storm in storms.values():
+        digest = hashlib.sha1()
+        for start, end in storm['blocks']:
+            digest.update(data[start:end].rstrip(b'\r\n'))
+            digest.update(b'\n')
+        storm['hash'] = digest.hexdigest()
+        storm['revision'] = max(storm['revision'])
+    return storms
+
+def load_manifest(manifest_file):
+    """
+    Reads the manifest of the previous run (None if missing or unreadable).
+    """
+    if not os.path.exists(manifest_file):
+        return None
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read {manifest_file}: {e}")
+        return None
+
+def storm_payload(data, storms, sids):
+    """
+    Best-track text of the given storms (all blocks of a repeated ID together).
+    """
+    return b''.join(data[start:end].rstrip(b'\r\n') + b'\n'
+                    for sid in sids for start, end in storms[sid]['blocks'])
+
+def render_storms(data, mappings):
+    """
+    Full per-storm pipeline on a piece of best-track text: parse, enrich and
+    render as CSV. Returns (frame, {StormID: CSV bytes of its rows}).
+    """
+    with stage('parse'):
+        cols = parse_jma_bytes(data)
+    with stage('enrich'):
+        frame = build_output_frame(cols, mappings)
+    with stage('render_csv'):
+        text, row_offsets = render_csv(frame)
+    counts = np.bincount(cols['storm_index'], minlength=len(cols['storm_id']))
+    reject('storm_without_fixes', np.count_nonzero(counts == 0))
+    offsets = row_offsets[np.concatenate([[0], np.cumsum(counts)])]
+    chunks = {sid: text[offsets[i]:offsets[i + 1]] for i, sid in enumerate(cols['storm_id'])}
+    return frame, chunks
+
+# Mappings of a pool worker (sent once per process, not once per task)
+_worker_mappings = None
+
+def _init_worker(mappings):
+    global _worker_mappings
+    _worker_mappings = mappings
+
+def _render_worker(data):
+    # Fresh stats per task, merged into the parent's by render_storms_parallel
+    STATS.reset()
+    frame, chunks = render_storms(data, _worker_mappings)
+    return frame, chunks, STATS.snapshot()
+
+def render_storms_parallel(data, storms, sids, mappings, workers):
+    """
+    render_storms over a process pool. The storms are cut into chunks of
+    about equal size on storm boundaries ('66666' headers; a repeated ID
+    stays in one chunk), a few chunks per worker so a slow chunk does not
+    hold up the rest. Results come back in storm order, so the output is
+    the same as the serial path.
+    """
+    import pandas as pd
+    sizes = np.array([sum(end - start for start, end in storms[sid]['blocks']) for sid in sids])
+    n_chunks = min(len(sids), workers * PARALLEL_CHUNKS_PER_WORKER)
+    cuts = np.searchsorted(np.cumsum(sizes), sizes.sum() * np.arange(1, n_chunks) / n_chunks)
+    bounds = np.unique(np.concatenate([[0], cuts + 1, [len(sids)]]).clip(0, len(sids)))
+    payloads = [storm_payload(data, storms, sids[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    print(f"Parsing {len(sids)} storms in {len(payloads)} chunks on {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(mappings,)) as pool:
+        results = list(pool.map(_render_worker, payloads))
+
+    # Workers' categoricals have their own categories (concat leaves text)
+    frame = as_output_types(pd.concat([result[0] for result in results], ignore_index=True))
+    chunks = {}
+    for _, result_chunks, stats in results:
+        chunks.update(result_chunks)
+        STATS.merge(stats)
+    return frame, chunks
+
+def iter_storm_blocks(f):
+    """
+    Yields the text of one storm at a time from an open best-track file
+    (binary mode), as soon as the next '66666' header line is read.
+    """
+    block = []
+    for line in f:
+        if line.startswith(b'66666') and block:
+            yield b''.join(block)
+            block = []
+        block.append(line)
+    if block:
+        yield b''.join(block)
+
+def export_streaming(input_file, mappings, output_file=OUTPUT_FILE, batch_storms=STREAM_BATCH_STORMS):
+    """
+    Constant-memory export: storms are read one at a time, enriched in small
+    batches (render_storms) and their rows appended to the CSV right away,
+    so memory stays flat however large the input is. The CSV is the same as
+    the batch path's, except that a storm ID repeated later in the file is
+    written where it appears instead of being merged into the first one.
+    Only the CSV is written (no manifest, store, summary or database).
+    """
+    if not os.path.exists(input_file):
+        print(f"Error: {input_file} not found.")
+        return None
+
+    print("Parsing JMA data (streaming)...")
+    seen = set()
+    repeated = 0
+    n_storms = n_rows = 0
+    tmp_file = output_file + '.tmp'
+    try:
+        with open(input_file, 'rb') as src, open(tmp_file, 'wb') as out:
+            out.write((','.join(OUTPUT_COLUMNS) + '\n').encode('utf-8'))
+            batch = []
+
+            def flush():
+                frame, chunks = render_storms(b''.join(batch), mappings)
+                with stage('write_csv'):
+                    out.writelines(chunks.values())
+                batch.clear()
+                return len(frame)
+
+            for block in iter_storm_blocks(src):
+                if block.startswith(b'66666'):
+                    storm_id = block[6:10].decode('latin-1').strip()
+                    repeated += storm_id in seen
+                    seen.add(storm_id)
+                    n_storms += 1
+                batch.append(block if block.endswith(b'\n') else block + b'\n')
+                if len(batch) >= batch_storms:
+                    n_rows += flush()
+            if batch:
+                n_rows += flush()
+        os.replace(tmp_file, output_file)
+    except PermissionError:
+        print(f"Error: Could not write to {output_file}. Is it open in Excel?")
+        return None
+
+    count('rows_written', n_rows)
+    if repeated:
+        print(f"Warning: {repeated} repeated storm IDs were written where they appear "
+              f"(the batch path merges them into the first storm).")
+    print(f"Success! Streamed {n_rows} rows of {n_storms} storms to {output_file}")
+    return n_rows
+
+def export_incremental(input_file, mappings, output_file=OUTPUT_FILE,
+                       manifest_file=MANIFEST_FILE, full_rebuild=False, workers=1):
+    """
+    Incremental version of parse + export.
+    The manifest next to the output keeps, per storm, the header revision date,
+    a hash of its best-track lines and the byte range of its rows in the output
+    CSV. Only storms that are new or whose revision/content changed are parsed;
+    the rows of every other storm are copied from the previous CSV as-is.
+    Falls back to a full rebuild when there is no usable manifest, when the
+    mapping file or output format changed, or when full_rebuild is set.
+    With workers > 1 the storms to parse are spread over a process pool.
+    """
+    import pandas as pd
+    from columnar_store import STORE_DIR, STORE_META, update_store, write_store
+    from name_mapping import NEAR_MISS_FILE, index_hash
+    from rapid_intensification import RI_EVENTS_FILE, export_ri_events
+    from sqlite_sink import DB_FILE, load_sqlite, update_sqlite
+    from storm_summary import SUMMARY_FILE, build_storm_summary, update_storm_summary, write_storm_summary
+    if not os.path.exists(input_file):
+        print(f"Error: {input_file} not found.")
+        return None
+
+    with stage('read_input'):
+        with open(input_file, 'rb') as f:
+            data = f.read()
+    with stage('split_storm_blocks'):
+        storms = split_storm_blocks(data)
+    mapping_hash = index_hash(mappings)
+
+    manifest = None if full_rebuild else load_manifest(manifest_file)
+    if manifest is not None and (
+            manifest.get('format_version') != OUTPUT_FORMAT_VERSION
+            or manifest.get('mapping_hash') != mapping_hash
+            or not os.path.exists(output_file)
+            or os.path.getsize(output_file) != manifest.get('output_size')
+            or not os.path.exists(os.path.join(STORE_DIR, STORE_META))
+            or not os.path.exists(SUMMARY_FILE)
+            or not os.path.exists(DB_FILE)):
+        print("Manifest is stale (mapping, format or one of the outputs changed). Rebuilding everything.")
+        manifest = None
+
+    previous = manifest['storms'] if manifest else {}
+    changed = [sid for sid, storm in storms.items()
+               if sid not in previous
+               or previous[sid]['revision'] != storm['revision']
+               or previous[sid]['hash'] != storm['hash']]
+    removed = [sid for sid in previous if sid not in storms]
+    count('storms_total', len(storms))
+    count('storms_reparsed', len(changed))
+    count('storms_removed', len(removed))
+
+    if manifest is not None and not changed and not removed:
+        print(f"No new or revised storms. {output_file} is up to date.")
+        return manifest
+
+    print(f"Storms: {len(storms)} total, {len(changed)} new/revised, {len(removed)} removed.")
+
+    # Parse and enrich only the changed storms, rendered as CSV rows
+    chunks = {}
+    frame = pd.DataFrame(columns=OUTPUT_COLUMNS)
+    if changed:
+        if workers > 1 and len(changed) > 1:
+            frame, chunks = render_storms_parallel(data, storms, changed, mappings, workers)
+        else:
+            frame, chunks = render_storms(storm_payload(data, storms, changed), mappings)
+
+    # Splice: new rows for changed storms, old bytes for the rest (file order)
+    old_csv = b''
+    if manifest is not None:
+        with open(output_file, 'rb') as f:
+            old_csv = f.read()
+
+    header = (','.join(OUTPUT_COLUMNS) + '\n').encode('utf-8')
+    parts = [header]
+    position = len(header)
+    entries = {}
+    for sid, storm in storms.items():
+        if sid in chunks:
+            chunk = chunks[sid]
+        elif sid in previous and sid not in changed:
+            old = previous[sid]
+            chunk = old_csv[old['offset']:old['offset'] + old['length']]
+        else:
+            chunk = b''  # header without any valid fix
+        parts.append(chunk)
+        entries[sid] = {'revision': storm['revision'], 'hash': storm['hash'],
+                        'offset': position, 'length': len(chunk)}
+        position += len(chunk)
+
+    tmp_file = output_file + '.tmp'
+    try:
+        with stage('write_csv'):
+            with open(tmp_file, 'wb') as f:
+                f.writelines(parts)
+            os.replace(tmp_file, output_file)
+    except PermissionError:
+        print(f"Error: Could not write to {output_file}. Is it open in Excel?")
+        return None
+    count('rows_reparsed', len(frame))
+    count('rows_written', sum(part.count(b'\n') for part in parts[1:]))
+
+    manifest = {
+        'format_version': OUTPUT_FORMAT_VERSION,
+        'input_file': os.path.basename(input_file),
+        'mapping_hash': mapping_hash,
+        'output_size': position,
+        'storms': entries,
+    }
+
+    # Summary, columnar store and SQLite: full write on a rebuild, otherwise
+    # only the re-parsed and removed storms (touched years for the store)
+    if not previous:
+        summary = save_side_output(write_storm_summary, SUMMARY_FILE, build_storm_summary(frame))
+        save_side_output(write_store, STORE_DIR, frame)
+        save_side_output(load_sqlite, DB_FILE, frame, summary)
+    else:
+        order = {sid: i for i, sid in enumerate(storms)}
+        replaced = changed + removed
+        summary_new = build_storm_summary(frame)
+        summary = save_side_output(update_storm_summary, SUMMARY_FILE, summary_new, replaced, order)
+        save_side_output(update_store, STORE_DIR, frame, replaced, order)
+        save_side_output(update_sqlite, DB_FILE, frame, replaced, summary)
+
+    # RI event catalogue, from the (updated) store's typed arrays
+    save_side_output(export_ri_events, RI_EVENTS_FILE)
+    # Name near misses: a full report on a rebuild, else the re-parsed storms'
+    if not previous:
+        save_side_output(report_name_near_misses, NEAR_MISS_FILE, summary, mappings)
+    else:
+        save_side_output(update_name_near_misses, NEAR_MISS_FILE, summary, summary_new, mappings)
+
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    print(f"Success! Wrote {output_file} ({len(changed)} storms re-parsed).")
+    return manifest
 
 def main():
+    parser = argparse.ArgumentParser(description="Parse JMA best-track data into the PAGASA-enriched CSV.")
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help="Ignore the manifest and re-parse every storm.")
+    parser.add_argument('--legacy', action='store_true',
+                        help="Use the original line-by-line parser (always a full rebuild).")
+    parser.add_argument('--stream', action='store_true',
+                        help="Constant-memory export of the CSV only, one storm batch at a time.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parse in parallel with this many processes (0 = one per CPU).")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help="Profile the run (cProfile or tracemalloc); the top entries go into the run report.")
+    args = parser.parse_args()
+
     # Setup paths relative to script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
-    
-    mappings = load_mappings()
-    storms = parse_jma_data(INPUT_FILE)
-    
-    if storms:
-        process_and_export(storms, mappings)
+
+    STATS.reset()
+    mode = 'legacy' if args.legacy else 'stream' if args.stream else 'incremental'
+    workers = args.workers or os.cpu_count() or 1
+    with profiled(args.profile, OUTPUT_FILE):
+        with stage('load_mappings'):
+            mappings = load_mappings()
+        if args.legacy:
+            with stage('parse'):
+                result = parse_jma_data(INPUT_FILE)
+            if result:
+                process_and_export(result, mappings)
+        elif args.stream:
+            result = export_streaming(INPUT_FILE, mappings)
+        else:
+            result = export_incremental(INPUT_FILE, mappings, full_rebuild=args.full_rebuild, workers=workers)
+
+    # Parse counters only cover the storms parsed in this run (incremental
+    # runs copy the rows of unchanged storms without parsing them)
+    write_report(OUTPUT_FILE, mode=mode, input_file=INPUT_FILE,
+                 workers=workers if mode == 'incremental' else 1,
+                 status='ok' if result is not None else 'failed')
 
 if __name__ == "__main__":
     main()
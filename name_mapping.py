@@ -0,0 +1,224 @@
+import difflib
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+# NumPy / pandas are imported by the functions that build and query the
+# index, so normalize_name is cheap to import (name_merge)
+
+# --- CONFIGURATION ---
+MAPPING_FILE = 'pagasa_mapping_all.csv'
+NEAR_MISS_FILE = 'pagasa_mapping_near_misses.csv'
+
+# Manual overrides, applied over the CSV: (Year, International_Name) -> PAGASA_Name
+# (updatetyphoon.py's (1991, 'THELMA') fallback is already in the CSV)
+MANUAL_OVERRIDES = {
+    (1979, 'TIP'): 'WARLING',
+    (1975, 'JUNE'): 'ROSING',
+    (1973, 'NORA'): 'LUING',
+    (1978, 'RITA'): 'KADING',
+    (1984, 'VANESSA'): 'NITANG',
+    (1966, 'KIT'): 'EMANG',
+    (1983, 'FORREST'): 'ISING',
+    (1971, 'IRMA'): 'INING',
+    (1990, 'FLO'): 'BIDANG',
+    (1981, 'ELSIE'): 'TASING',
+    (2015, 'SOUDELOR'): 'HANNA',
+}
+
+# Bump when normalize_name or the index layout changes (invalidates caches)
+INDEX_VERSION = 1
+
+# Near-miss report: candidates at least this similar, within this many years
+NEAR_MISS_SIMILARITY = 0.8
+NEAR_MISS_YEARS = 1
+
+def normalize_name(name):
+    """
+    Matching key of an international name: diacritics removed, upper case,
+    only letters and digits ("Kai-tak", "KAI TAK" and "KAITAK" -> "KAITAK").
+    """
+    if name is None or (isinstance(name, float) and name != name):
+        return ''
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r'[^A-Z0-9]', '', text.upper())
+
+def _cache_path(mapping_file):
+    root, _ = os.path.splitext(mapping_file)
+    return root + '.index.json'
+
+def _file_sha1(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _overrides_key():
+    return hashlib.sha1(repr(sorted(MANUAL_OVERRIDES.items())).encode('utf-8')).hexdigest()
+
+def _build_index(mapping_file):
+    """
+    (Year, Key) -> PAGASA_Name table from the CSV plus the overrides.
+    Later entries win, like the old dict updates.
+    """
+    import pandas as pd
+    frames = []
+    if os.path.exists(mapping_file):
+        try:
+            df_map = pd.read_csv(mapping_file)
+            intl = df_map['International Name'].fillna('').astype(str).str.strip()
+            frames.append(pd.DataFrame({
+                'Year': pd.to_numeric(df_map['Year'], errors='coerce'),
+                'International_Name': intl,
+                'PAGASA_Name': df_map['PAGASA Name'].fillna('').astype(str).str.strip(),
+            })[(intl != '') & (intl.str.upper() != 'N/A') & (intl.str.upper() != 'NAN')])
+            print(f"Loaded {len(frames[0])} mappings from CSV.")
+        except Exception as e:
+            print(f"Warning: Could not load {mapping_file}: {e}")
+    else:
+        print(f"Warning: Mapping file {mapping_file} not found. Using overrides only.")
+
+    frames.append(pd.DataFrame([(year, name, pagasa) for (year, name), pagasa in MANUAL_OVERRIDES.items()],
+                               columns=['Year', 'International_Name', 'PAGASA_Name']))
+    index = pd.concat(frames, ignore_index=True).dropna(subset=['Year'])
+    index['Year'] = index['Year'].astype(int)
+    index['Key'] = index['International_Name'].map(normalize_name)
+    index = index[index['Key'] != ''].drop_duplicates(['Year', 'Key'], keep='last')
+    return index[['Year', 'Key', 'International_Name', 'PAGASA_Name']].reset_index(drop=True)
+
+def load_mapping_index(mapping_file=MAPPING_FILE, use_cache=True):
+    """
+    The mapping index (columns Year, Key, International_Name, PAGASA_Name),
+    cached next to the CSV. The cache is reused while the CSV's mtime and
+    size are unchanged, or its SHA-1 still matches (e.g. after a touch),
+    and the overrides / INDEX_VERSION are the same.
+    """
+    import pandas as pd
+    cache_file = _cache_path(mapping_file)
+    stat = os.stat(mapping_file) if os.path.exists(mapping_file) else None
+    stamp = [stat.st_mtime_ns, stat.st_size] if stat else None
+    key = {'version': INDEX_VERSION, 'overrides': _overrides_key()}
+
+    if use_cache and stat and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache['key'] == key and (cache['stamp'] == stamp or cache['sha1'] == _file_sha1(mapping_file)):
+                index = pd.DataFrame(cache['index'], columns=['Year', 'Key', 'International_Name', 'PAGASA_Name'])
+                print(f"Loaded {len(index)} name mappings from cache {cache_file}.")
+                if cache['stamp'] != stamp:
+                    # Same content, new mtime: remember it to skip hashing next time
+                    _write_cache(cache_file, key, stamp, cache['sha1'], index)
+                return index
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: ignoring mapping cache {cache_file}: {e}")
+
+    index = _build_index(mapping_file)
+    print(f"Total mappings after overrides: {len(index)}")
+    if use_cache and stat:
+        _write_cache(cache_file, key, stamp, _file_sha1(mapping_file), index)
+    return index
+
+def _write_cache(cache_file, key, stamp, sha1, index):
+    # Written aside and renamed, so a process loading the cache at the same
+    # time (pipeline.py runs main.py and updatetyphoon.py in parallel) never
+    # sees half a file
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'stamp': stamp, 'sha1': sha1, 'index': index.values.tolist()}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: could not write mapping cache {cache_file}: {e}")
+
+def index_hash(index):
+    """
+    Fingerprint of the index contents (CSV and overrides together).
+    """
+    return hashlib.sha1(index[['Year', 'Key', 'PAGASA_Name']].to_csv(index=False).encode('utf-8')).hexdigest()
+
+def attach_pagasa_names(index, years, names):
+    """
+    PAGASA name for every (year, international name) pair, via one join on
+    (Year, normalized name). Returns an object array, None where unmatched.
+    """
+    import numpy as np
+    import pandas as pd
+    names = pd.Series(np.asarray(names, dtype=object))
+    # Normalize each distinct name once
+    uniques = names.drop_duplicates()
+    keys = names.map(dict(zip(uniques, uniques.map(normalize_name))))
+    query = pd.DataFrame({'Year': pd.to_numeric(pd.Series(np.asarray(years)), errors='coerce'), 'Key': keys})
+    joined = query.merge(index[['Year', 'Key', 'PAGASA_Name']], on=['Year', 'Key'], how='left', sort=False)
+    return joined['PAGASA_Name'].astype(object).where(joined['PAGASA_Name'].notna(), None).to_numpy()
+
+def near_misses(index, years, names, min_similarity=NEAR_MISS_SIMILARITY, max_years=NEAR_MISS_YEARS):
+    """
+    For (year, name) pairs without an exact mapping, index entries that are
+    close: same key within max_years, or a similar key (difflib ratio) in the
+    same year. One row per candidate, best first, for manual review.
+    """
+    import numpy as np
+    import pandas as pd
+    query = pd.DataFrame({'Year': pd.to_numeric(pd.Series(np.asarray(years)), errors='coerce'),
+                          'Name': np.asarray(names, dtype=object)}).drop_duplicates()
+    query['Key'] = query['Name'].map(normalize_name)
+    # Plain (key, name, PAGASA name) tuples per year: indexing a frame per
+    # query costs more than the comparisons
+    by_year = {year: list(zip(group['Key'], group['International_Name'], group['PAGASA_Name']))
+               for year, group in index.groupby('Year')}
+
+    rows = []
+    for year, name, key in query.itertuples(index=False):
+        if not key or pd.isna(year):
+            continue
+        same_year = by_year.get(int(year), [])
+        if any(cand_key == key for cand_key, _, _ in same_year):
+            continue
+        for offset in range(-max_years, max_years + 1):
+            candidates = by_year.get(int(year) + offset, [])
+            for cand_key, cand_name, pagasa in candidates:
+                if offset != 0:
+                    # Other years: the same key only, no ratio needed
+                    if cand_key == key:
+                        rows.append((int(year), name, int(year) + offset, cand_name, pagasa, 1.0))
+                    continue
+                score = difflib.SequenceMatcher(None, key, cand_key).ratio()
+                if score >= min_similarity:
+                    rows.append((int(year), name, int(year) + offset, cand_name, pagasa, round(score, 3)))
+
+    report = pd.DataFrame(rows, columns=['Year', 'StormName', 'Candidate_Year', 'Candidate_Name',
+                                         'Candidate_PAGASA_Name', 'Similarity'])
+    return _sort_near_misses(report)
+
+def _sort_near_misses(report):
+    return report.sort_values(['Year', 'StormName', 'Similarity'], ascending=[True, True, False],
+                              kind='stable').reset_index(drop=True)
+
+def update_near_misses(index, years, names, unmatched, report_file=NEAR_MISS_FILE):
+    """
+    Refreshes an existing report after an incremental run: near_misses only
+    for the (year, name) pairs of the re-parsed storms, whose rows replace
+    those pairs' old rows, and the rows of pairs no longer in `unmatched`
+    (every pair still without a name) dropped. A pair's rows only depend on
+    the pair and the index, so this writes what a full report would.
+    Returns the report, or None if there is no report file.
+    """
+    import pandas as pd
+    if not os.path.exists(report_file):
+        return None
+    old = pd.read_csv(report_file, keep_default_na=False)
+    fresh = near_misses(index, years, names)
+    redone = set(zip(pd.to_numeric(pd.Series(list(years)), errors='coerce'), map(str, names)))
+    unmatched = set((int(year), str(name)) for year, name in unmatched)
+    pairs = zip(pd.to_numeric(old['Year'], errors='coerce'), old['StormName'].astype(str))
+    keep = [pair in unmatched and pair not in redone for pair in pairs]
+    report = pd.concat([part for part in (old[keep], fresh) if len(part)] or [fresh], ignore_index=True)
+    return write_near_misses(_sort_near_misses(report), report_file)
+
+def write_near_misses(report, report_file=NEAR_MISS_FILE):
+    report.to_csv(report_file, index=False)
+    print(f"Name mapping: {report['StormName'].nunique()} unmatched names with close candidates "
+          f"saved to {report_file}")
+    return report
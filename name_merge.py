@@ -0,0 +1,242 @@
+import argparse
+import csv
+import os
+import sys
+
+from name_mapping import MAPPING_FILE, normalize_name
+
+# --- CONFIGURATION ---
+# Hand fixes to the name tables, applied by every merge (replaces one-off
+# scripts like the old update_mindulle.py row removal)
+PATCH_FILE = 'pagasa_name_patches.csv'
+PATCH_COLUMNS = ['Action', 'Year', 'International Name', 'PAGASA Name', 'Reason']
+PATCH_ACTIONS = ['delete', 'set']
+
+# Each merge writes its conflicts next to the output: <output>.conflicts.csv.
+# Other_* is the row that lost, or for rule 'kept_both' the second of two
+# read names that disagree (both rows stay in the output)
+CONFLICT_SUFFIX = '.conflicts.csv'
+CONFLICT_COLUMNS = ['Year', 'International Name', 'Kept_PAGASA_Name', 'Kept_From',
+                    'Other_PAGASA_Name', 'Other_From', 'Rule']
+
+TABLE_COLUMNS = ['Year', 'International Name', 'PAGASA Name', 'Heuristic']
+MISSING_NAME = 'N/A'
+
+# International "names" that do not identify a storm (the curated list
+# writes TD for unnamed depressions); such rows are keyed by PAGASA name
+PLACEHOLDER_NAMES = ['TD']
+
+# Every source of pagasa_mapping_all.csv, lowest precedence first
+MAPPING_SOURCES = ['ph_typhoon_names_1963_1999.csv', 'ph_typhoon_names_2000_2025.csv']
+
+def is_missing(name):
+    return name is None or name.strip().upper() in ('', 'N/A', 'NAN')
+
+def row_key(year, intl, pagasa):
+    """
+    Hash key of a row: (year, normalized international name). Rows without
+    an international name (PAGASA-only depressions, PLACEHOLDER_NAMES) are
+    keyed by their PAGASA name instead ('=' never occurs in a normalized
+    name).
+    """
+    key = normalize_name(intl) if not is_missing(intl) else ''
+    if key in PLACEHOLDER_NAMES:
+        key = ''
+    return int(year), key or '=' + normalize_name(pagasa)
+
+def read_table(path):
+    """
+    Rows of a name table as dicts (TABLE_COLUMNS); Heuristic is False for
+    tables without that column (curated lists).
+    """
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        rows = []
+        for row in csv.DictReader(f):
+            rows.append({
+                'Year': row['Year'].strip(),
+                'International Name': (row['International Name'] or '').strip(),
+                'PAGASA Name': (row['PAGASA Name'] or '').strip(),
+                'Heuristic': (row.get('Heuristic') or '').strip() == 'True',
+            })
+    return rows
+
+def read_patches(path):
+    """
+    Patch rows (PATCH_COLUMNS): 'delete' drops a (Year, International Name)
+    row, 'set' adds it or overrides its PAGASA name. Returns [] if there is
+    no patch file; raises ValueError on an unknown action.
+    """
+    if path is None or not os.path.exists(path):
+        return []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        patches = [{col: (row.get(col) or '').strip() for col in PATCH_COLUMNS} for row in csv.DictReader(f)]
+    for patch in patches:
+        patch['Action'] = patch['Action'].lower()
+        if patch['Action'] not in PATCH_ACTIONS:
+            raise ValueError(f"{path}: unknown patch action {patch['Action']!r}")
+    return patches
+
+def _rank(row):
+    # Higher wins: a PAGASA name over none, a read name over a guessed one
+    return (not is_missing(row['PAGASA Name']), not row['Heuristic'])
+
+def _conflict(year, intl, kept, kept_from, other, other_from, rule):
+    return {'Year': year, 'International Name': intl, 'Kept_PAGASA_Name': kept, 'Kept_From': kept_from,
+            'Other_PAGASA_Name': other, 'Other_From': other_from, 'Rule': rule}
+
+def _same_name(a, b):
+    return normalize_name(a['PAGASA Name']) == normalize_name(b['PAGASA Name'])
+
+def merge_tables(sources, patches=(), sort=False):
+    """
+    Keyed upsert of name tables, one pass over the rows with a dict on
+    row_key. sources is [(label, rows)], lowest precedence first. When two
+    rows share a key:
+    1. a row with a PAGASA name beats one without,
+    2. a read name beats a heuristic guess,
+    3. two read names that differ are both kept (the lists give some storms
+       two PAGASA names, e.g. KIT 1972 as ASIANG and BIRING),
+    4. otherwise the later row (later source) wins.
+    Patches (only for years the sources cover) then win over everything.
+    Returns (rows, conflicts); a conflict is every dropped PAGASA name that
+    differs from the kept one, every pair kept by rule 3, and patches that
+    matched nothing. Rows keep their first-seen position, or are sorted by
+    (Year, International Name). Merging the output again with the same
+    patches changes nothing.
+    """
+    # key -> [(row, label)], more than one only for rule 3
+    index = {}
+    conflicts = []
+    for label, rows in sources:
+        for row in rows:
+            key = row_key(row['Year'], row['International Name'], row['PAGASA Name'])
+            entries = index.setdefault(key, [])
+            if not entries:
+                entries.append((row, label))
+                continue
+            # Upsert the row with the same PAGASA name, else the first one
+            pos = next((i for i, (old, _) in enumerate(entries) if _same_name(old, row)), 0)
+            entry = entries[pos]
+            old, old_label = entry
+            if _rank(row) == _rank(old) == (True, True) and not _same_name(old, row):
+                entries.append((row, label))
+                conflicts.append(_conflict(row['Year'], old['International Name'], old['PAGASA Name'],
+                                           old_label, row['PAGASA Name'], label, 'kept_both'))
+                continue
+            if _rank(row) < _rank(old):
+                winner, loser = entry, (row, label)
+            else:
+                winner, loser = (row, label), entry
+                # Keep the international name's spelling if the winner has none
+                if is_missing(row['International Name']) and not is_missing(old['International Name']):
+                    winner = (dict(row, **{'International Name': old['International Name']}), label)
+                entries[pos] = winner
+            if not is_missing(loser[0]['PAGASA Name']) and not _same_name(loser[0], winner[0]):
+                rule = 'read_over_guess' if _rank(winner[0]) > _rank(loser[0]) else 'later_source'
+                conflicts.append(_conflict(row['Year'], winner[0]['International Name'],
+                                           winner[0]['PAGASA Name'], winner[1],
+                                           loser[0]['PAGASA Name'], loser[1], rule))
+
+    years = {key[0] for key in index}
+    for patch in patches:
+        if not patch['Year'].isdigit() or int(patch['Year']) not in years:
+            continue
+        key = row_key(patch['Year'], patch['International Name'], patch['PAGASA Name'])
+        entries = index.get(key)
+        if patch['Action'] == 'delete':
+            if not entries:
+                conflicts.append(_conflict(patch['Year'], patch['International Name'], '', '',
+                                           '', 'patch', 'patch_unmatched'))
+                continue
+            for old, old_label in index.pop(key):
+                conflicts.append(_conflict(patch['Year'], old['International Name'], '', 'patch',
+                                           old['PAGASA Name'], old_label, 'patch_delete'))
+        else:
+            row = {'Year': patch['Year'], 'International Name': patch['International Name'] or MISSING_NAME,
+                   'PAGASA Name': patch['PAGASA Name'] or MISSING_NAME, 'Heuristic': False}
+            for old, old_label in entries or []:
+                if not _same_name(old, row):
+                    conflicts.append(_conflict(patch['Year'], row['International Name'], row['PAGASA Name'],
+                                               'patch', old['PAGASA Name'], old_label, 'patch_set'))
+            index[key] = [(row, 'patch')]
+
+    rows = [row for entries in index.values() for row, _ in entries]
+    if sort:
+        rows.sort(key=lambda row: (int(row['Year']), row['International Name']))
+    return rows, conflicts
+
+def write_conflicts(conflicts, output_file):
+    path = os.path.splitext(output_file)[0] + CONFLICT_SUFFIX
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CONFLICT_COLUMNS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(conflicts)
+    return path
+
+def merge_name_files(input_files, output_file, patch_file=PATCH_FILE, sort=False,
+                     columns=TABLE_COLUMNS, missing=MISSING_NAME):
+    """
+    Merges name tables (lowest precedence first) plus the patch file into
+    output_file, and writes the conflict report next to it. Returns the
+    rows, or None if an input is missing.
+    """
+    for path in input_files:
+        if not os.path.exists(path):
+            print(f"Error: {path} not found.")
+            return None
+    try:
+        patches = read_patches(patch_file)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return None
+
+    sources = [(os.path.basename(path), read_table(path)) for path in input_files]
+    rows, conflicts = merge_tables(sources, patches, sort=sort)
+
+    def cell(row, col):
+        value = row[col]
+        if col == 'Heuristic':
+            return str(bool(value))
+        return '' if is_missing(value) and missing == '' else value
+
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(columns)
+        writer.writerows([cell(row, col) for col in columns] for row in rows)
+    report = write_conflicts(conflicts, output_file)
+    read = sum(len(table) for _, table in sources)
+    print(f"Merged {read} rows from {len(sources)} tables into {len(rows)} rows "
+          f"({len(conflicts)} conflicts, see {report}): {output_file}")
+    return rows
+
+def rebuild_mapping(input_files=MAPPING_SOURCES, mapping_file=MAPPING_FILE, patch_file=PATCH_FILE):
+    """
+    pagasa_mapping_all.csv from every name table, in the layout
+    name_mapping reads (no Heuristic column, '' for a missing name).
+    """
+    return merge_name_files(input_files, mapping_file, patch_file,
+                            columns=TABLE_COLUMNS[:3], missing='')
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyed merge of PAGASA name tables.")
+    parser.add_argument('inputs', nargs='*', help="Name tables, lowest precedence first.")
+    parser.add_argument('--out', help="Merged table.")
+    parser.add_argument('--patch', default=PATCH_FILE, help="Patch file (delete / set rows).")
+    parser.add_argument('--sort', action='store_true', help="Sort by year and international name.")
+    parser.add_argument('--mapping', action='store_true',
+                        help=f"Rebuild {MAPPING_FILE} from {', '.join(MAPPING_SOURCES)}.")
+    args = parser.parse_args()
+
+    if args.mapping:
+        # Setup paths relative to script (the mapping sources live there)
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        result = rebuild_mapping(patch_file=args.patch)
+    elif args.inputs and args.out:
+        result = merge_name_files(args.inputs, args.out, args.patch, sort=args.sort)
+    else:
+        parser.error("give input tables and --out, or --mapping")
+    if result is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
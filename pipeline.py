@@ -0,0 +1,413 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# --- CONFIGURATION ---
+STATE_FILE = 'pipeline_state.json'
+
+# Bump when the stage table or the key computation changes (reruns everything)
+PIPELINE_VERSION = 1
+
+# --- STAGE FUNCTIONS ---
+# Each stage is called with its declared input and output paths. Imports are
+# done inside, so checking an up-to-date pipeline never loads pandas.
+
+def extract_names_1963_1999(inputs, outputs):
+    from extract_1963_1999 import parse_wiki_data
+    parse_wiki_data(inputs[0], outputs[0])
+
+def extract_names_2000_2025(inputs, outputs):
+    from extract_typhoons_wiki import extract_typhoon_names
+    extract_typhoon_names(inputs[0], outputs[0])
+
+def generate_missing_names(inputs, outputs):
+    from generate_missing_data import write_missing_names
+    write_missing_names(outputs[0])
+
+def merge_names_1963_1999(inputs, outputs):
+    from merge_and_sort_data import merge_names
+    if merge_names(inputs[0], inputs[1], outputs[0], inputs[2]) is None:
+        raise RuntimeError("name merge failed")
+
+def fix_names_2000_2025(inputs, outputs):
+    from update_mindulle import apply_name_patches
+    if apply_name_patches(inputs[0], outputs[0], inputs[1]) is None:
+        raise RuntimeError("name patching failed")
+
+def export_tracks(inputs, outputs, full_rebuild=False):
+    from main import export_incremental
+    from name_mapping import load_mapping_index
+    # main.py keeps its own per-storm manifest, so a rerun after a small
+    # archive revision only re-parses the revised storms (the manifest knows
+    # nothing about code changes, hence full_rebuild)
+    if export_incremental(inputs[0], load_mapping_index(inputs[1]), outputs[0], outputs[1],
+                          full_rebuild=full_rebuild) is None:
+        raise RuntimeError("main.py export failed")
+
+def export_wind_swaths(inputs, outputs):
+    from wind_swath import export_wind_swaths as export
+    if export(inputs[0], outputs[0], outputs[1]) is None:
+        raise RuntimeError("wind swath export failed")
+
+def export_par_crossings(inputs, outputs):
+    from track_interpolation import export_par_crossings as export
+    export(os.path.dirname(inputs[0]), outputs[0], outputs[1])
+
+def export_bi_extracts(inputs, outputs):
+    from bi_extracts import export_bi_extracts as export
+    export(os.path.dirname(inputs[0]), outputs[0], outputs[1], outputs[2])
+
+def export_complete_table(inputs, outputs):
+    from updatetyphoon import parse_and_map_typhoons
+    parse_and_map_typhoons(inputs[0], inputs[1], outputs[0])
+
+# --- STAGES ---
+# Paths are relative to this script's directory and must match the scripts'
+# CONFIGURATION constants. A stage depends on the stages producing its
+# inputs; inputs nobody produces are sources (raw wiki text, the JMA archive,
+# the curated pagasa_mapping_all.csv). 'code' is the module whose source,
+# plus the local modules it imports, is part of the stage's hash.
+# 'incremental' stages update their outputs in place; their run function
+# takes full_rebuild, set when the code (not just the inputs) changed.
+STAGES = [
+    {
+        'name': 'extract_1963_1999',
+        'run': extract_names_1963_1999,
+        'code': 'extract_1963_1999',
+        'inputs': ['raw_wiki_1963_1999.txt'],
+        'outputs': ['ph_typhoon_names_1963_1999_extracted.csv'],
+    },
+    {
+        'name': 'extract_2000_2025',
+        'run': extract_names_2000_2025,
+        'code': 'extract_typhoons_wiki',
+        'inputs': ['raw_wiki_data.txt'],
+        'outputs': ['ph_typhoon_names_2000_2025_extracted.csv'],
+    },
+    {
+        'name': 'generate_missing',
+        'run': generate_missing_names,
+        'code': 'generate_missing_data',
+        'inputs': [],
+        'outputs': ['missing_typhoon_names.csv'],
+    },
+    {
+        'name': 'merge_1963_1999',
+        'run': merge_names_1963_1999,
+        'code': 'merge_and_sort_data',
+        'inputs': ['ph_typhoon_names_1963_1999_extracted.csv', 'missing_typhoon_names.csv',
+                   'pagasa_name_patches.csv'],
+        'outputs': ['ph_typhoon_names_1963_1999.csv', 'ph_typhoon_names_1963_1999.conflicts.csv'],
+    },
+    {
+        'name': 'fix_2000_2025',
+        'run': fix_names_2000_2025,
+        'code': 'update_mindulle',
+        'inputs': ['ph_typhoon_names_2000_2025_extracted.csv', 'pagasa_name_patches.csv'],
+        'outputs': ['ph_typhoon_names_2000_2025.csv', 'ph_typhoon_names_2000_2025.conflicts.csv'],
+    },
+    {
+        'name': 'tracks',
+        'run': export_tracks,
+        'code': 'main',
+        'incremental': True,
+        'inputs': ['bst_all.txt', 'pagasa_mapping_all.csv'],
+        'outputs': ['ph_typhoon_data_v2.csv', 'ph_typhoon_data_v2.manifest.json',
+                    'ph_typhoon_storm_summary.csv', os.path.join('ph_typhoon_store', 'store.json'),
+                    'ph_typhoon_data.db', 'ph_typhoon_ri_events.csv', 'pagasa_mapping_near_misses.csv'],
+    },
+    {
+        'name': 'wind_swaths',
+        'run': export_wind_swaths,
+        'code': 'wind_swath',
+        'inputs': ['bst_all.txt'],
+        'outputs': ['ph_typhoon_wind_swaths.npz', 'ph_typhoon_wind_exposure.csv'],
+    },
+    {
+        'name': 'par_crossings',
+        'run': export_par_crossings,
+        'code': 'track_interpolation',
+        'inputs': [os.path.join('ph_typhoon_store', 'store.json')],
+        'outputs': ['ph_typhoon_par_crossings.csv', 'ph_typhoon_track_resampled.csv'],
+    },
+    {
+        'name': 'bi_extracts',
+        'run': export_bi_extracts,
+        'code': 'bi_extracts',
+        'inputs': [os.path.join('ph_typhoon_store', 'store.json')],
+        'outputs': ['ph_typhoon_track_simplified.csv', 'ph_typhoon_fix_facts.csv', 'ph_typhoon_storm_facts.csv'],
+    },
+    {
+        'name': 'complete_table',
+        'run': export_complete_table,
+        'code': 'updatetyphoon',
+        'inputs': ['bst_all.txt', 'pagasa_mapping_all.csv'],
+        'outputs': ['ph_typhoon_data_complete.csv'],
+    },
+]
+
+STAGE_BY_NAME = {stage['name']: stage for stage in STAGES}
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+class FileHasher:
+    """
+    SHA-1 of files, re-hashing only those whose mtime or size changed since
+    the last run (the stamps are kept in the state file).
+    """
+    def __init__(self, known):
+        self.known = known
+
+    def sha1(self, path):
+        stamp = _stamp(path)
+        entry = self.known.get(path)
+        if entry and entry[:2] == stamp:
+            return entry[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        self.known[path] = stamp + [digest]
+        return digest
+
+def local_modules(module):
+    """
+    Source files of `module` and of the modules next to it that it imports,
+    directly or indirectly.
+    """
+    files, queue = [], [module]
+    while queue:
+        name = queue.pop()
+        path = name + '.py'
+        if path in files or not os.path.exists(path):
+            continue
+        files.append(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                queue.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                queue.append(node.module)
+    return sorted(files)
+
+def _sha1_json(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+def stage_key(stage, hasher):
+    """
+    Hash of everything a stage's outputs depend on: input contents, the
+    source of its code, and its declaration. Returns (key, code_key), the
+    latter without the inputs (it changes when only the code did).
+    """
+    code = {
+        'version': PIPELINE_VERSION,
+        'run': stage['run'].__name__,
+        'outputs': stage['outputs'],
+        'code': {path: hasher.sha1(path) for path in local_modules(stage['code'])},
+    }
+    inputs = {path: hasher.sha1(path) for path in stage['inputs']}
+    return _sha1_json(dict(code, inputs=inputs)), _sha1_json(code)
+
+def is_up_to_date(stage, key, state):
+    """
+    Same key as the last successful run, and the outputs untouched since.
+    """
+    previous = state['stages'].get(stage['name'])
+    if not previous or previous['key'] != key:
+        return False
+    return all(os.path.exists(path) and _stamp(path) == previous['outputs'].get(path)
+               for path in stage['outputs'])
+
+def load_state(state_file=STATE_FILE):
+    empty = {'version': PIPELINE_VERSION, 'files': {}, 'stages': {}}
+    if not os.path.exists(state_file):
+        return empty
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring pipeline state {state_file}: {e}")
+        return empty
+    return state if state.get('version') == PIPELINE_VERSION else empty
+
+def save_state(state, state_file=STATE_FILE):
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_file, state_file)
+
+def run_stage(name, full_rebuild=False):
+    """
+    Runs one stage (in a worker process when running in parallel).
+    Returns the elapsed seconds.
+    """
+    stage = STAGE_BY_NAME[name]
+    start = time.perf_counter()
+    if stage.get('incremental'):
+        stage['run'](stage['inputs'], stage['outputs'], full_rebuild=full_rebuild)
+    else:
+        stage['run'](stage['inputs'], stage['outputs'])
+    return time.perf_counter() - start
+
+def select_stages(targets=None):
+    """
+    The requested stages plus everything upstream of them, in table order.
+    """
+    if not targets:
+        return list(STAGES)
+    producer = {path: stage['name'] for stage in STAGES for path in stage['outputs']}
+    wanted, queue = set(), list(targets)
+    while queue:
+        name = queue.pop()
+        if name in wanted:
+            continue
+        wanted.add(name)
+        queue.extend(producer[path] for path in STAGE_BY_NAME[name]['inputs'] if path in producer)
+    return [stage for stage in STAGES if stage['name'] in wanted]
+
+def run_pipeline(targets=None, force=False, jobs=1, dry_run=False, state_file=STATE_FILE):
+    """
+    Runs the stale stages of the pipeline, independent ones in parallel
+    (up to `jobs` processes). A stage is stale if its key changed, one of its
+    outputs is missing or was modified, or `force` is set. Returns the names
+    of the stages that failed (or, for a dry run, would run).
+    """
+    start = time.perf_counter()
+    stages = select_stages(targets)
+    producer = {path: stage['name'] for stage in stages for path in stage['outputs']}
+    deps = {stage['name']: {producer[path] for path in stage['inputs'] if path in producer}
+            for stage in stages}
+
+    state = load_state(state_file)
+    hasher = FileHasher(state['files'])
+    pending = [stage['name'] for stage in stages]
+    done, failed, ran, would_run = set(), set(), [], set()
+    up_to_date = 0
+    running = {}
+    pool = None
+
+    def finish(name, key, code_key, error=None):
+        stage = STAGE_BY_NAME[name]
+        missing = [path for path in stage['outputs'] if not os.path.exists(path)]
+        if error is None and missing:
+            error = f"missing outputs {', '.join(missing)}"
+        if error is not None:
+            print(f"Error: stage {name} failed: {error}")
+            state['stages'].pop(name, None)
+            failed.add(name)
+        else:
+            state['stages'][name] = {'key': key, 'code_key': code_key,
+                                     'outputs': {path: _stamp(path) for path in stage['outputs']}}
+            for path in stage['outputs']:
+                hasher.sha1(path)
+            done.add(name)
+        save_state(state, state_file)
+
+    try:
+        while pending or running:
+            progressed = False
+            for name in list(pending):
+                stage = STAGE_BY_NAME[name]
+                if deps[name] & (failed | would_run):
+                    pending.remove(name)
+                    progressed = True
+                    if dry_run:
+                        print(f"[{name}] would run (upstream changes)")
+                        would_run.add(name)
+                    else:
+                        print(f"[{name}] skipped: upstream stage failed")
+                        failed.add(name)
+                    continue
+                if not deps[name] <= done:
+                    continue
+                pending.remove(name)
+                progressed = True
+
+                missing = [path for path in stage['inputs'] if not os.path.exists(path)]
+                if missing:
+                    print(f"Error: stage {name} is missing inputs {', '.join(missing)}")
+                    failed.add(name)
+                    continue
+                key, code_key = stage_key(stage, hasher)
+                if not force and is_up_to_date(stage, key, state):
+                    done.add(name)
+                    up_to_date += 1
+                    continue
+                if dry_run:
+                    print(f"[{name}] would run")
+                    would_run.add(name)
+                    continue
+
+                # Incremental outputs are rebuilt when more than the inputs changed
+                previous = state['stages'].get(name) or {}
+                full_rebuild = force or previous.get('code_key') != code_key
+                if stage.get('incremental') and full_rebuild:
+                    print(f"[{name}] running (full rebuild)")
+                else:
+                    print(f"[{name}] running")
+                ran.append(name)
+                if jobs <= 1:
+                    try:
+                        elapsed = run_stage(name, full_rebuild)
+                        print(f"[{name}] done in {elapsed:.2f} s")
+                        finish(name, key, code_key)
+                    except Exception as e:
+                        finish(name, key, code_key, e)
+                else:
+                    pool = pool or ProcessPoolExecutor(max_workers=jobs)
+                    running[pool.submit(run_stage, name, full_rebuild)] = (name, key, code_key)
+
+            if running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, key, code_key = running.pop(future)
+                    try:
+                        print(f"[{name}] done in {future.result():.2f} s")
+                        finish(name, key, code_key)
+                    except Exception as e:
+                        finish(name, key, code_key, e)
+            elif not progressed:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if dry_run:
+        print(f"Pipeline: {len(would_run)} of {len(stages)} stages would run.")
+        return sorted(would_run)
+    print(f"Pipeline: {len(stages)} stages, {len(ran)} run, {up_to_date} up to date, {len(failed)} failed "
+          f"({time.perf_counter() - start:.2f} s).")
+    save_state(state, state_file)
+    return sorted(failed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the stale stages of the typhoon data pipeline.")
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help=f"Stages to bring up to date, with their upstream ({', '.join(STAGE_BY_NAME)}). "
+                             "Default: all.")
+    parser.add_argument('--force', action='store_true', help="Rerun the selected stages even if up to date.")
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="Stages run in parallel (0 = one per CPU, 1 = in this process).")
+    parser.add_argument('--dry-run', action='store_true', help="Only list the stages that would run.")
+    args = parser.parse_args()
+    unknown = [name for name in args.stages if name not in STAGE_BY_NAME]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    # Setup paths relative to script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+    sys.path.insert(0, script_dir)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    failed = run_pipeline(args.stages, force=args.force, jobs=jobs, dry_run=args.dry_run)
+    sys.exit(1 if failed and not args.dry_run else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+from columnar_store import STORE_DIR, NULL_INT, load_columns
+
+# --- CONFIGURATION ---
+RI_EVENTS_FILE = 'ph_typhoon_ri_events.csv'
+
+# Rapid intensification over a true 24-hour window: pressure drop as in
+# typhoon_analysis.sql, wind gain as the usual 30 kt / 24 h definition
+RI_WINDOW_HOURS = 24
+RI_PRESSURE_DROP = 24
+RI_WIND_GAIN = 30
+
+# The value 24 h earlier is interpolated between the two fixes around it,
+# but only if they are at most this far apart
+RI_MAX_GAP_HOURS = 12
+
+RI_EVENT_COLUMNS = ['StormID', 'StormName', 'Start', 'End', 'Duration_Hours', 'Criterion',
+                    'Max_Pressure_Drop_hPa', 'Max_Wind_Gain_kt', 'Peak_Time']
+
+def stamp_to_hours(stamp):
+    """
+    YYYYMMDDHH integers -> hours since 1970-01-01 (float, NaN if missing).
+    """
+    stamp = np.asarray(stamp, dtype=float)
+    valid = np.isfinite(stamp) & (stamp > 0)
+    value = np.where(valid, stamp, 1970010100).astype(np.int64)
+    months = (value // 1000000 - 1970) * 12 + (value // 10000 % 100 - 1)
+    days = months.astype('datetime64[M]').astype('datetime64[D]') + (value // 100 % 100 - 1)
+    hours = (days.astype('datetime64[h]') + value % 100).astype(np.int64).astype(float)
+    return np.where(valid, hours, np.nan)
+
+def hours_to_stamp(hours):
+    """
+    Hours since 1970 -> 'YYYYMMDDHH' strings ('' if missing).
+    """
+    hours = np.asarray(hours, dtype=float)
+    valid = np.isfinite(hours)
+    text = np.where(valid, hours, 0).astype(np.int64).astype('datetime64[h]').astype(str)
+    # '1951-02-19T06' -> '1951021906'
+    text = np.char.replace(np.char.replace(text, '-', ''), 'T', '')
+    return np.where(valid, text, '')
+
+def change_over_window(group, hours, values, window=RI_WINDOW_HOURS, max_gap=RI_MAX_GAP_HOURS):
+    """
+    values(t) - values(t - window) for every fix, within its group (storm).
+    Fixes may be unevenly spaced and in any order: everything is sorted once
+    by (group, time), missing values are skipped, and the earlier value is
+    read at the fix exactly `window` hours before or interpolated between
+    the fixes around that time. NaN where there is no such value.
+    """
+    group = np.asarray(group)
+    hours = np.asarray(hours, dtype=float)
+    values = np.asarray(values, dtype=float)
+    change = np.full(len(values), np.nan)
+
+    keep = np.flatnonzero(np.isfinite(hours) & np.isfinite(values))
+    if len(keep) == 0:
+        return change
+    order = keep[np.lexsort((hours[keep], group[keep]))]
+    g, h, v = group[order], hours[order], values[order]
+
+    # One sorted composite key (group, time) so a single searchsorted finds,
+    # for every fix, the fixes on both sides of t - window in its own group
+    _, g_code = np.unique(g, return_inverse=True)
+    span = (h.max() - h.min()) + window + 1.0
+    key = g_code * span + (h - h.min())
+    target = key - window
+    hi = np.searchsorted(key, target, side='right')     # first fix after t - window
+    lo = hi - 1                                         # last fix at or before it
+
+    lo_ok = (lo >= 0) & (g_code[np.maximum(lo, 0)] == g_code)
+    lo_c = np.maximum(lo, 0)
+    hi_c = np.minimum(hi, len(h) - 1)
+    exact = lo_ok & (key[lo_c] == target)
+    bracket = (lo_ok & ~exact & (hi < len(h)) & (g_code[hi_c] == g_code)
+               & (h[hi_c] - h[lo_c] <= max_gap))
+
+    frac = np.where(bracket, (h - window - h[lo_c]) / np.where(bracket, h[hi_c] - h[lo_c], 1.0), 0.0)
+    earlier = v[lo_c] + frac * (v[hi_c] - v[lo_c])
+    change[order] = np.where(exact | bracket, v - earlier, np.nan)
+    return change
+
+def ri_fixes(group, hours, pressure, wind, window=RI_WINDOW_HOURS):
+    """
+    Per fix: pressure drop and wind gain over the previous `window` hours,
+    and whether each reaches RI_PRESSURE_DROP / RI_WIND_GAIN. A fix is in
+    rapid intensification if either does.
+    """
+    # JMA gives 0 kt for depressions / extra-tropical fixes without a wind
+    # estimate; that is missing, not calm (else TD -> TS reads as a 35 kt gain)
+    wind = np.asarray(wind, dtype=float)
+    wind = np.where(wind > 0, wind, np.nan)
+    drop = -change_over_window(group, hours, pressure, window)
+    gain = change_over_window(group, hours, wind, window)
+
+    by_pressure = np.nan_to_num(drop, nan=-np.inf) >= RI_PRESSURE_DROP
+    by_wind = np.nan_to_num(gain, nan=-np.inf) >= RI_WIND_GAIN
+    return drop, gain, by_pressure, by_wind
+
+def detect_ri_events(group, timestamp, pressure, wind, window=RI_WINDOW_HOURS):
+    """
+    RI event catalogue from track arrays (one entry per fix: group/storm key,
+    YYYYMMDDHH timestamp, pressure, wind; NaN for missing values).
+    A fix qualifies if pressure fell by >= RI_PRESSURE_DROP or wind rose by
+    >= RI_WIND_GAIN over the previous `window` hours. Qualifying fixes of a
+    storm whose windows overlap form one event, from the start of the first
+    window to the last qualifying fix.
+    """
+    group = np.asarray(group)
+    hours = stamp_to_hours(timestamp)
+    drop, gain, by_pressure, by_wind = ri_fixes(group, hours, pressure, wind, window)
+    hit = np.flatnonzero(by_pressure | by_wind)
+    if len(hit) == 0:
+        return pd.DataFrame(columns=['Group', 'Start', 'End', 'Duration_Hours', 'Criterion',
+                                     'Max_Pressure_Drop_hPa', 'Max_Wind_Gain_kt', 'Peak_Time'])
+
+    hit = hit[np.lexsort((hours[hit], group[hit]))]
+    g, h = group[hit], hours[hit]
+    # New event when the storm changes or the window no longer overlaps
+    new_event = np.ones(len(hit), dtype=bool)
+    new_event[1:] = (g[1:] != g[:-1]) | (h[1:] - window > h[:-1])
+    event = np.cumsum(new_event) - 1
+
+    hits = pd.DataFrame({
+        'Event': event,
+        'Group': g,
+        'Start': h - window,
+        'End': h,
+        'Drop': drop[hit],
+        'Gain': gain[hit],
+        'By_Pressure': by_pressure[hit],
+        'By_Wind': by_wind[hit],
+    })
+    events = hits.groupby('Event', sort=True).agg(
+        Group=('Group', 'first'),
+        Start=('Start', 'min'),
+        End=('End', 'max'),
+        Max_Pressure_Drop_hPa=('Drop', 'max'),
+        Max_Wind_Gain_kt=('Gain', 'max'),
+        By_Pressure=('By_Pressure', 'any'),
+        By_Wind=('By_Wind', 'any'),
+    )
+    # Peak: end of the window with the largest pressure drop (largest wind
+    # gain for events that only qualify on wind)
+    use_drop = hits['Event'].map(events['By_Pressure']).to_numpy()
+    score = pd.Series(np.nan_to_num(np.where(use_drop, hits['Drop'], hits['Gain']), nan=-np.inf))
+    peak = hits['End'].to_numpy()[score.groupby(hits['Event']).idxmax().to_numpy()]
+
+    events['Duration_Hours'] = events['End'] - events['Start']
+    events['Criterion'] = np.select([events['By_Pressure'] & events['By_Wind'], events['By_Pressure']],
+                                    ['pressure+wind', 'pressure'], 'wind')
+    events['Start'] = hours_to_stamp(events['Start'])
+    events['End'] = hours_to_stamp(events['End'])
+    events['Peak_Time'] = hours_to_stamp(peak)
+    events['Max_Pressure_Drop_hPa'] = events['Max_Pressure_Drop_hPa'].round(1)
+    events['Max_Wind_Gain_kt'] = events['Max_Wind_Gain_kt'].round(1)
+    return events.reset_index(drop=True)[['Group', 'Start', 'End', 'Duration_Hours', 'Criterion',
+                                           'Max_Pressure_Drop_hPa', 'Max_Wind_Gain_kt', 'Peak_Time']]
+
+def build_ri_catalogue(store_dir=STORE_DIR):
+    """
+    Runs the detector on the columnar store (typed arrays, storm codes as
+    the group key) and attaches StormID / StormName.
+    """
+    arrays, meta = load_columns(store_dir, columns=['StormID', 'StormName', 'Timestamp',
+                                                    'Pressure_hPa', 'WindSpeed_kt'])
+    pressure = np.where(arrays['Pressure_hPa'] == NULL_INT, np.nan, arrays['Pressure_hPa'])
+    wind = np.where(arrays['WindSpeed_kt'] == NULL_INT, np.nan, arrays['WindSpeed_kt'])
+    events = detect_ri_events(arrays['StormID'], arrays['Timestamp'], pressure, wind)
+
+    # Storm code -> ID and name (name of the storm's first fix)
+    storm_ids = np.array(meta['dictionaries']['StormID'], dtype=object)
+    names = np.array(meta['dictionaries']['StormName'], dtype=object)
+    codes, first = np.unique(arrays['StormID'], return_index=True)
+    name_of = dict(zip(codes.tolist(), names[arrays['StormName'][first]].tolist()))
+
+    group = events.pop('Group').astype(int)
+    events.insert(0, 'StormID', storm_ids[group.to_numpy()] if len(group) else [])
+    events.insert(1, 'StormName', group.map(name_of).to_numpy() if len(group) else [])
+    # Chronological catalogue (storm codes depend on the store's history)
+    events = events.sort_values(['Start', 'StormID'], kind='stable')
+    return events[RI_EVENT_COLUMNS].reset_index(drop=True)
+
+def write_ri_events(events, events_file=RI_EVENTS_FILE):
+    events.to_csv(events_file, index=False)
+    print(f"RI events: {len(events)} events in {events['StormID'].nunique()} storms saved to {events_file}")
+    return events
+
+def export_ri_events(store_dir=STORE_DIR, events_file=RI_EVENTS_FILE):
+    """
+    Rebuilds the RI event catalogue from the columnar store.
+    """
+    return write_ri_events(build_ri_catalogue(store_dir), events_file)
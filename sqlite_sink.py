@@ -0,0 +1,259 @@
+import argparse
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+# --- CONFIGURATION ---
+DB_FILE = 'ph_typhoon_data.db'
+SQL_FILE = 'typhoon_analysis.sql'
+
+# Same table name as the MySQL import, so typhoon_analysis.sql runs unchanged
+TABLE_NAME = 'ph_typhoon_data_v4'
+
+# Column -> SQLite type (numbers are stored as numbers, no CAST needed)
+TABLE_SCHEMA = {
+    'StormID': 'TEXT',
+    'StormName': 'TEXT',
+    'PAGASA_Name': 'TEXT',
+    'Classification': 'TEXT',
+    'Timestamp': 'TEXT',       # YYYYMMDDHH, sorts chronologically as text
+    'In_PAR': 'TEXT',
+    'Latitude': 'REAL',
+    'Longitude': 'REAL',
+    'Pressure_hPa': 'INTEGER',
+    'WindSpeed_kt': 'INTEGER',
+    'Grade': 'INTEGER',
+    'Year': 'INTEGER',
+}
+
+# Storm-level summary table (see storm_summary.py)
+SUMMARY_TABLE = 'ph_typhoon_storm_summary'
+SUMMARY_SCHEMA = {
+    'StormID': 'TEXT',
+    'StormName': 'TEXT',
+    'PAGASA_Name': 'TEXT',
+    'Year': 'INTEGER',
+    'Decade': 'TEXT',
+    'First_Timestamp': 'TEXT',
+    'Last_Timestamp': 'TEXT',
+    'PAR_Entry': 'TEXT',
+    'PAR_Exit': 'TEXT',
+    'Peak_WindSpeed_kt': 'INTEGER',
+    'Min_Pressure_hPa': 'INTEGER',
+    'Peak_Classification': 'TEXT',
+    'Hours_Inside_PAR': 'REAL',
+    'ACE': 'REAL',
+    'Rapid_Intensification': 'BOOLEAN',
+    'Fixes': 'INTEGER',
+}
+
+# Indexes for the access paths used by typhoon_analysis.sql
+INDEXES = {
+    'idx_storm_time': ('StormID', 'Timestamp'),     # per-storm LAG() window, storm lookups
+    'idx_par_year': ('In_PAR', 'Year'),             # "Inside PAR" filters, decade binning
+    'idx_classification': ('Classification',),     # GROUP BY Classification
+}
+SUMMARY_INDEXES = {
+    'idx_summary_storm': ('StormID',),
+    'idx_summary_year': ('Year',),
+}
+
+def connect(db_file=DB_FILE):
+    """
+    Opens the database with the MySQL functions typhoon_analysis.sql uses
+    that SQLite lacks (or spells differently).
+    """
+    conn = sqlite3.connect(db_file)
+    # MySQL CONCAT; FLOOR returning an integer so CONCAT gives '1990s', not '1990.0s'
+    conn.create_function('CONCAT', -1, lambda *args: None if None in args else ''.join(map(str, args)),
+                         deterministic=True)
+    conn.create_function('FLOOR', 1, lambda x: None if x is None else math.floor(x), deterministic=True)
+    return conn
+
+def mysql_to_sqlite(query):
+    """
+    Rewrites the MySQL-only semantics of a query.
+    MySQL '/' is always a decimal division, SQLite divides integers as
+    integers (COUNT(...) / COUNT(...) would be 0), so force a real division.
+    """
+    return re.sub(r'\s/\s', ' * 1.0 / ', query)
+
+def _create_table(conn, table=TABLE_NAME, schema=TABLE_SCHEMA):
+    columns = ', '.join(f'"{col}" {sql_type}' for col, sql_type in schema.items())
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({columns})')
+
+def _create_indexes(conn, table=TABLE_NAME, indexes=INDEXES):
+    for name, columns in indexes.items():
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+
+def _row_tuples(df, schema=TABLE_SCHEMA):
+    """
+    DataFrame -> row tuples with typed values and None for missing ones.
+    """
+    data = {}
+    for col, sql_type in schema.items():
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if sql_type == 'BOOLEAN':
+            values = values.map({True: 1, False: 0, 'True': 1, 'False': 0})
+        elif sql_type == 'INTEGER':
+            values = pd.to_numeric(values, errors='coerce').astype('Int64')
+        elif sql_type == 'REAL':
+            values = pd.to_numeric(values, errors='coerce')
+        else:
+            values = values.astype(object)
+        data[col] = values.astype(object).where(values.notna(), None)
+    return zip(*(data[col] for col in schema))
+
+def _insert(conn, df, table=TABLE_NAME, schema=TABLE_SCHEMA):
+    placeholders = ', '.join('?' for _ in schema)
+    conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})', _row_tuples(df, schema))
+
+def _replace_summary(conn, summary):
+    """
+    Rewrites the storm summary table (about 2k rows, cheap to redo in full).
+    Blank PAR entry/exit (storm never inside PAR) become NULL.
+    """
+    summary = summary.replace({'PAR_Entry': {'': None}, 'PAR_Exit': {'': None}})
+    conn.execute(f'DROP TABLE IF EXISTS {SUMMARY_TABLE}')
+    _create_table(conn, SUMMARY_TABLE, SUMMARY_SCHEMA)
+    _insert(conn, summary, SUMMARY_TABLE, SUMMARY_SCHEMA)
+    _create_indexes(conn, SUMMARY_TABLE, SUMMARY_INDEXES)
+
+def load_sqlite(df, summary=None, db_file=DB_FILE):
+    """
+    Bulk-loads the full output table (and the storm summary, if given) into
+    a fresh database. Rows go in first, the indexes are built afterwards (one
+    sort per index instead of index maintenance per row), then the file
+    replaces the old one.
+    """
+    tmp_file = db_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    conn = connect(tmp_file)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        _create_table(conn)
+        with conn:
+            _insert(conn, df)
+            if summary is not None:
+                _replace_summary(conn, summary)
+        _create_indexes(conn)
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    os.replace(tmp_file, db_file)
+    print(f"SQLite: loaded {len(df)} rows into {db_file} ({TABLE_NAME}).")
+
+def update_sqlite(df_new, replaced_ids, summary=None, db_file=DB_FILE):
+    """
+    Replaces the rows of the storms in `replaced_ids` with the rows of
+    `df_new` (and the summary table with `summary`, if given) in one
+    transaction. Returns False if there is no database yet.
+    """
+    if not os.path.exists(db_file):
+        return False
+
+    conn = connect(db_file)
+    try:
+        with conn:
+            conn.executemany(f'DELETE FROM {TABLE_NAME} WHERE StormID = ?',
+                             [(sid,) for sid in replaced_ids])
+            _insert(conn, df_new)
+            if summary is not None:
+                _replace_summary(conn, summary)
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    print(f"SQLite: replaced {len(replaced_ids)} storms ({len(df_new)} rows) in {db_file}.")
+    return True
+
+def split_queries(sql_text):
+    """
+    Splits a .sql script into (title, query) pairs. The title is the first
+    comment of the comment block right in front of the query (the comments
+    after the last blank line).
+    """
+    queries = []
+    for chunk in sql_text.split(';'):
+        leading = re.match(r'(?:\s*(?:--[^\n]*|/\*.*?\*/))*', chunk, flags=re.S).group(0)
+        block = re.split(r'\n[ \t]*\n', leading.strip())[-1]
+        comments = re.findall(r'--[ \t]*([^\n]*)|/\*(.*?)\*/', block, flags=re.S)
+        body = re.sub(r'--[^\n]*|/\*.*?\*/', '', chunk, flags=re.S).strip()
+        if not body:
+            continue
+        title = next((' '.join((a or b).split()) for a, b in comments if (a or b).strip()), body[:60])
+        queries.append((title, body))
+    return queries
+
+def full_scans(conn, query):
+    """
+    Returns the EXPLAIN QUERY PLAN steps that pass over the whole table.
+    SQLite reports a lookup with a search constraint as SEARCH; every SCAN
+    of the table reads all rows, also in the order of an index
+    ('SCAN ... USING [COVERING] INDEX ...').
+    """
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + query).fetchall()
+    pattern = re.compile(rf'^SCAN {TABLE_NAME}\b')
+    return [row[-1] for row in plan if pattern.match(row[-1])]
+
+def run_queries(db_file=DB_FILE, sql_file=SQL_FILE, repeat=3):
+    """
+    Runs every query of sql_file against the database, printing the best of
+    `repeat` timings and the plan check. Returns the number of queries that
+    need a full table scan.
+    """
+    if not os.path.exists(db_file):
+        print(f"Error: {db_file} not found. Run main.py first.")
+        return None
+    if not os.path.exists(sql_file):
+        print(f"Error: {sql_file} not found.")
+        return None
+
+    with open(sql_file, 'r', encoding='utf-8') as f:
+        queries = split_queries(f.read())
+
+    conn = connect(db_file)
+    flagged = 0
+    try:
+        for i, (title, query) in enumerate(queries, 1):
+            query = mysql_to_sqlite(query)
+            scans = full_scans(conn, query)
+
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = conn.execute(query).fetchall()
+                best = min(best, time.perf_counter() - start)
+
+            status = "FULL TABLE SCAN" if scans else "indexed"
+            flagged += bool(scans)
+            print(f"[{i}] {best * 1000:8.2f} ms  {len(rows):6d} rows  {status:15s}  {title[:70]}")
+    finally:
+        conn.close()
+
+    print(f"{len(queries)} queries, {flagged} with a full table scan.")
+    return flagged
+
+def main():
+    parser = argparse.ArgumentParser(description="Time typhoon_analysis.sql against the SQLite sink.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database written by main.py.")
+    parser.add_argument('--sql', default=SQL_FILE, help="Query script to run.")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per query (best time is shown).")
+    args = parser.parse_args()
+
+    # Setup paths relative to script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    flagged = run_queries(args.db, args.sql, args.repeat)
+    sys.exit(1 if flagged is None or flagged else 0)
+
+if __name__ == "__main__":
+    main()
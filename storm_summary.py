@@ -0,0 +1,142 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from rapid_intensification import ri_fixes, stamp_to_hours
+from track_interpolation import par_pieces, par_residence
+
+# --- CONFIGURATION ---
+SUMMARY_FILE = 'ph_typhoon_storm_summary.csv'
+
+# Classification ranking for the peak (a post-tropical ETC fix never beats a
+# tropical one; blank = no classification at all)
+CLASSIFICATION_RANK = ["", "Extra-tropical Cyclone", "Tropical Depression", "Tropical Storm",
+                       "Severe Tropical Storm", "Typhoon", "Super Typhoon"]
+
+# ACE: 1e-4 * sum(vmax^2) over synoptic fixes at tropical-storm strength
+ACE_HOURS = (0, 6, 12, 18)
+ACE_MIN_WIND = 35
+
+SUMMARY_COLUMNS = ['StormID', 'StormName', 'PAGASA_Name', 'Year', 'Decade',
+                   'First_Timestamp', 'Last_Timestamp', 'PAR_Entry', 'PAR_Exit',
+                   'Peak_WindSpeed_kt', 'Min_Pressure_hPa', 'Peak_Classification',
+                   'Hours_Inside_PAR', 'ACE', 'Rapid_Intensification', 'Fixes']
+
+def fix_times(stamp):
+    """
+    YYYYMMDDHH stamps (strings or ints) -> datetime64 Series, NaT if invalid.
+    Splitting the integer is much faster than parsing the strings.
+    """
+    value = pd.to_numeric(pd.Series(stamp), errors='coerce')
+    parts = pd.DataFrame({'year': value // 1000000, 'month': value // 10000 % 100,
+                          'day': value // 100 % 100, 'hour': value % 100})
+    return pd.to_datetime(parts, errors='coerce')
+
+def fix_ace(hour, wind, grade):
+    """
+    ACE contribution of each fix (1e-4 kt^2): synoptic hours only, at
+    tropical-storm strength, not for extra-tropical (grade 6) fixes.
+    """
+    wind = np.nan_to_num(np.asarray(wind, dtype=float))
+    synoptic = np.isin(np.asarray(hour), ACE_HOURS)
+    return np.where(synoptic & (wind >= ACE_MIN_WIND) & (np.asarray(grade, dtype=float) != 6), wind ** 2 * 1e-4, 0.0)
+
+def build_storm_summary(df):
+    """
+    One row per storm from the final fix table (same columns as the CSV).
+    - PAR_Entry / PAR_Exit: first / last fix flagged "Inside PAR"
+    - Hours_Inside_PAR: time inside PAR along the track, from the exact
+      times it crosses the PAR boundary (see track_interpolation.par_pieces)
+    - Rapid_Intensification: pressure fell >= 24 hPa or wind rose >= 30 kt
+      within 24 hours at some point, the test of the RI event catalogue
+      (see rapid_intensification.ri_fixes)
+    """
+    if df.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    sid = df['StormID'].astype(str).to_numpy()
+    stamp = df['Timestamp'].astype(str)
+    fix_stamps = pd.to_numeric(stamp, errors='coerce')
+    time = fix_times(fix_stamps)
+    wind = pd.to_numeric(df['WindSpeed_kt'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    pressure = pd.to_numeric(df['Pressure_hPa'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    grade = pd.to_numeric(df['Grade'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    inside = (df['In_PAR'].astype(str) == 'Inside PAR').to_numpy()
+    rank = pd.Categorical(df['Classification'].astype(str), categories=CLASSIFICATION_RANK).codes
+
+    # Hours inside PAR, with entry / exit at the boundary crossings
+    lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    residence = par_residence(par_pieces(sid, fix_stamps.to_numpy(dtype=float, na_value=np.nan), lat, lon))
+
+    # ACE contribution per fix
+    ace = fix_ace(time.dt.hour.to_numpy(dtype=float, na_value=np.nan), wind, grade)
+
+    # Rapid intensification: pressure / wind change over a true 24 h window
+    _, _, by_pressure, by_wind = ri_fixes(sid, stamp_to_hours(fix_stamps.to_numpy(dtype=float, na_value=np.nan)),
+                                          pressure, wind)
+    ri = by_pressure | by_wind
+
+    work = pd.DataFrame({
+        'StormID': sid,
+        'StormName': df['StormName'].to_numpy(),
+        'PAGASA_Name': df['PAGASA_Name'].to_numpy(),
+        'Year': pd.to_numeric(df['Year'], errors='coerce').to_numpy(),
+        'Timestamp': stamp.to_numpy(),
+        'Inside': np.where(inside, stamp.to_numpy(), None),
+        'Wind': wind,
+        'Pressure': pressure,
+        'Rank': rank,
+        'ACE': ace,
+        'RI': ri,
+    })
+    g = work.groupby('StormID', sort=False)
+
+    summary = g.agg(
+        StormName=('StormName', 'first'),
+        PAGASA_Name=('PAGASA_Name', 'first'),
+        Year=('Year', 'first'),
+        First_Timestamp=('Timestamp', 'first'),
+        Last_Timestamp=('Timestamp', 'last'),
+        PAR_Entry=('Inside', 'first'),
+        PAR_Exit=('Inside', 'last'),
+        Peak_WindSpeed_kt=('Wind', 'max'),
+        Min_Pressure_hPa=('Pressure', 'min'),
+        Peak_Rank=('Rank', 'max'),
+        ACE=('ACE', 'sum'),
+        Rapid_Intensification=('RI', 'any'),
+        Fixes=('Timestamp', 'size'),
+    ).reset_index()
+
+    summary['Hours_Inside_PAR'] = summary['StormID'].map(residence).fillna(0.0).round(2)
+    summary['Decade'] = (summary['Year'] // 10 * 10).astype('Int64').astype(str) + 's'
+    summary['Year'] = summary['Year'].astype('Int64')
+    summary['Peak_WindSpeed_kt'] = summary['Peak_WindSpeed_kt'].astype('Int64')
+    summary['Min_Pressure_hPa'] = summary['Min_Pressure_hPa'].astype('Int64')
+    summary['Peak_Classification'] = np.array(CLASSIFICATION_RANK, dtype=object)[summary['Peak_Rank'].clip(lower=0)]
+    summary['ACE'] = summary['ACE'].round(4)
+    return summary[SUMMARY_COLUMNS]
+
+def write_storm_summary(summary, summary_file=SUMMARY_FILE):
+    summary.to_csv(summary_file, index=False)
+    print(f"Storm summary: {len(summary)} storms saved to {summary_file}")
+    return summary
+
+def update_storm_summary(summary_new, replaced_ids, storm_order, summary_file=SUMMARY_FILE):
+    """
+    Replaces the rows of the storms in `replaced_ids` in an existing summary
+    file (a storm's row only depends on its own fixes) and keeps the input
+    file's storm order. Returns the full summary, or None if there is no file.
+    """
+    if not os.path.exists(summary_file):
+        return None
+
+    # Read as text so untouched rows are written back exactly as they were
+    old = pd.read_csv(summary_file, dtype=str, keep_default_na=False)
+    old = old[~old['StormID'].isin(set(replaced_ids))]
+    parts = [part for part in (old, summary_new.astype(object)) if len(part)]
+    summary = pd.concat(parts, ignore_index=True) if parts else old
+    position = summary['StormID'].map(storm_order).to_numpy()
+    summary = summary.iloc[np.argsort(position, kind='stable')]
+    return write_storm_summary(summary[SUMMARY_COLUMNS], summary_file)
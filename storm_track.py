@@ -0,0 +1,147 @@
+import numpy as np
+
+# PAR state codes (stateful: once a storm has been inside, leaving is "Exited")
+PAR_OUTSIDE = 0
+PAR_INSIDE = 1
+PAR_EXITED = 2
+PAR_STATE_LABELS = ["Outside PAR", "Inside PAR", "Exited PAR"]
+
+# Missing values in the integer arrays
+MISSING_INT16 = -1      # pressure, wind
+MISSING_GRADE = 0       # JMA grades are 2-9
+
+def par_states(in_par, storm_start=None):
+    """
+    Inside/Exited/Outside PAR codes (uint8) from the per-fix in_par flags.
+    storm_start: index of each fix's first fix of its storm, when in_par
+    spans several storms (default: all one storm).
+    """
+    in_par = np.asarray(in_par, dtype=bool)
+    seen = np.cumsum(in_par)
+    if storm_start is None:
+        seen_before = seen
+    else:
+        seen_before = seen - np.concatenate([[0], seen])[storm_start]
+    return np.where(in_par, PAR_INSIDE, np.where(seen_before > 0, PAR_EXITED, PAR_OUTSIDE)).astype(np.uint8)
+
+class StormTrack:
+    """
+    One storm: metadata held once, fixes as typed parallel arrays
+    (int64 YYYYMMDDHH time, float32 lat/lon, int16 pressure/wind, uint8
+    grade and PAR state). Replaces the per-fix dicts of parse_jma_data.
+    """
+    __slots__ = ('storm_id', 'name', 'revision', 'time', 'lat', 'lon',
+                 'pressure', 'wind', 'grade', 'par_state')
+
+    def __init__(self, storm_id, name, revision, time, lat, lon, pressure, wind, grade, par_state):
+        self.storm_id = storm_id
+        self.name = name
+        self.revision = revision
+        self.time = np.asarray(time, dtype=np.int64)
+        self.lat = np.asarray(lat, dtype=np.float32)
+        self.lon = np.asarray(lon, dtype=np.float32)
+        self.pressure = np.asarray(pressure, dtype=np.int16)
+        self.wind = np.asarray(wind, dtype=np.int16)
+        self.grade = np.asarray(grade, dtype=np.uint8)
+        self.par_state = np.asarray(par_state, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.time)
+
+    def __repr__(self):
+        return f"StormTrack({self.storm_id!r}, {self.name!r}, {len(self)} fixes)"
+
+    @property
+    def year(self):
+        """
+        Year of the first fix (None if the storm has no fixes).
+        """
+        return int(self.time[0] // 1000000) if len(self) else None
+
+    @property
+    def in_par(self):
+        return self.par_state == PAR_INSIDE
+
+    @property
+    def entered_par(self):
+        return bool(self.in_par.any())
+
+    @classmethod
+    def from_rows(cls, storm_id, storm):
+        """
+        Converts one storm of parse_jma_data ({'name', 'rows': [dict, ...]}).
+        """
+        rows = storm['rows']
+
+        def ints(key, missing):
+            return [int(row[key]) if str(row[key]).strip().isdigit() else missing for row in rows]
+
+        def floats(key):
+            return [np.nan if row[key] is None else row[key] for row in rows]
+
+        return cls(storm_id, storm['name'], None,
+                   [int(row['Timestamp']) for row in rows],
+                   floats('Latitude'), floats('Longitude'),
+                   ints('Pressure_hPa', MISSING_INT16), ints('WindSpeed_kt', MISSING_INT16),
+                   ints('Grade', MISSING_GRADE),
+                   par_states([row['In_PAR'] for row in rows]))
+
+def tracks_from_columns(cols):
+    """
+    {StormID: StormTrack} from the arrays of parse_jma_columns / parse_jma_bytes.
+    Each column is converted once; a track's arrays are slices of those.
+    """
+    idx = cols['storm_index']
+    n_storms = len(cols['storm_id'])
+    counts = np.bincount(idx, minlength=n_storms)
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    def typed(values, dtype, missing):
+        return np.where(np.isnan(values), missing, values).astype(dtype)
+
+    time = cols['timestamp'].astype(np.int64)
+    lat = cols['lat'].astype(np.float32)
+    lon = cols['lon'].astype(np.float32)
+    pressure = typed(cols['pressure'], np.int16, MISSING_INT16)
+    wind = typed(cols['wind'], np.int16, MISSING_INT16)
+    grade = np.where(cols['grade'] < 0, MISSING_GRADE, cols['grade']).astype(np.uint8)
+    state = par_states(cols['in_par'], bounds[:-1][idx]) if len(idx) else np.zeros(0, dtype=np.uint8)
+
+    tracks = {}
+    for i, storm_id in enumerate(cols['storm_id']):
+        part = slice(bounds[i], bounds[i + 1])
+        tracks[storm_id] = StormTrack(storm_id, cols['storm_name'][i], cols['storm_revision'][i],
+                                      time[part], lat[part], lon[part], pressure[part],
+                                      wind[part], grade[part], state[part])
+    return tracks
+
+def _traced(func, *args):
+    """
+    (result, bytes still allocated while the result is alive, peak bytes)
+    """
+    import tracemalloc
+    tracemalloc.start()
+    result = func(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+if __name__ == "__main__":
+    # Memory of the parsed archive: per-fix dicts vs. StormTrack arrays
+    import os
+    import sys
+    import main
+
+    input_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                    main.INPUT_FILE)
+    storms, dict_bytes, dict_peak = _traced(main.parse_jma_data, input_file)
+    del storms
+    tracks, track_bytes, track_peak = _traced(main.parse_jma_tracks, input_file)
+    if tracks is None:
+        sys.exit(1)
+
+    n_fixes = sum(len(track) for track in tracks.values())
+    print(f"{len(tracks)} storms, {n_fixes} fixes")
+    print(f"  dict rows:    {dict_bytes / 2**20:8.1f} MB held  ({dict_peak / 2**20:.1f} MB peak)")
+    print(f"  StormTrack:   {track_bytes / 2**20:8.1f} MB held  ({track_peak / 2**20:.1f} MB peak)")
+    print(f"  reduction:    {dict_bytes / max(track_bytes, 1):8.1f}x")
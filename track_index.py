@@ -0,0 +1,253 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import STORE_DIR, STORE_META, load_frame
+from rapid_intensification import hours_to_stamp, stamp_to_hours
+from wind_swath import track_segments
+
+# --- CONFIGURATION ---
+# Bucket size of the index (degrees): each track segment is listed in every
+# cell its bounding box touches
+INDEX_CELL_DEG = 1.0
+
+# Fixes further apart than this are not joined into a segment
+INDEX_MAX_GAP_HOURS = 12
+
+DEFAULT_RADIUS_KM = 100.0
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+# Columns of the enriched track table the index needs
+INDEX_COLUMNS = ['StormID', 'StormName', 'PAGASA_Name', 'Classification', 'Timestamp',
+                 'Latitude', 'Longitude', 'Pressure_hPa', 'WindSpeed_kt']
+
+PROXIMITY_COLUMNS = ['Location', 'Query_Lat', 'Query_Lon', 'StormID', 'StormName', 'PAGASA_Name',
+                     'Distance_km', 'Closest_Time', 'Closest_Lat', 'Closest_Lon',
+                     'WindSpeed_kt', 'Pressure_hPa', 'Classification']
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def _expand(counts):
+    """
+    For ragged groups of the given sizes: (group of each item, position of
+    the item within its group).
+    """
+    group = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.cumsum(counts) - counts
+    return group, np.arange(len(group)) - offsets[group]
+
+class TrackIndex:
+    """
+    Grid index over the track segments of the enriched table: segment i
+    joins fix seg_start[i] to fix seg_end[i] of the same storm (fixes at
+    most INDEX_MAX_GAP_HOURS apart; a lone fix is a zero-length segment).
+    Segments are bucketed by the cells of their bounding box, so a
+    proximity query only looks at the segments listed in the cells around
+    the query point.
+    """
+    def __init__(self, frame, cell_deg=INDEX_CELL_DEG, max_gap_hours=INDEX_MAX_GAP_HOURS):
+        storm_code, storm_ids = pd.factorize(np.asarray(frame['StormID']))
+        hours = stamp_to_hours(pd.to_numeric(pd.Series(np.asarray(frame['Timestamp'])), errors='coerce'))
+        order = np.lexsort((hours, storm_code))
+
+        def numeric(col):
+            values = pd.to_numeric(frame[col], errors='coerce')
+            return values.to_numpy(dtype=float, na_value=np.nan)[order]
+
+        self.cell_deg = cell_deg
+        self.storm_ids = np.asarray(storm_ids, dtype=object)
+        self.storm_code = storm_code[order]
+        self.hours = hours[order]
+        self.lat = numeric('Latitude')
+        self.lon = numeric('Longitude')
+        self.pressure = numeric('Pressure_hPa')
+        # 0 kt is "no estimate" in the JMA data, not calm
+        wind = numeric('WindSpeed_kt')
+        self.wind = np.where(wind > 0, wind, np.nan)
+        self.storm_name = np.asarray(frame['StormName'], dtype=object)[order]
+        self.pagasa_name = np.asarray(frame['PAGASA_Name'], dtype=object)[order]
+        self.classification = np.asarray(frame['Classification'], dtype=object)[order]
+
+        self.seg_start, self.seg_end = track_segments(
+            {'storm_index': self.storm_code, 'lat': self.lat, 'lon': self.lon,
+             'timestamp': np.asarray(frame['Timestamp'])[order]}, max_gap_hours)
+
+        # Cells touched by each segment's bounding box -> CSR lists per cell
+        a, b = self.seg_start, self.seg_end
+        row0, row1 = self._row(np.minimum(self.lat[a], self.lat[b])), self._row(np.maximum(self.lat[a], self.lat[b]))
+        col0, col1 = self._col(np.minimum(self.lon[a], self.lon[b])), self._col(np.maximum(self.lon[a], self.lon[b]))
+        n_cols = col1 - col0 + 1
+        seg, local = _expand((row1 - row0 + 1) * n_cols)
+        keys = self._key(row0[seg] + local // n_cols[seg], col0[seg] + local % n_cols[seg])
+        by_cell = np.argsort(keys, kind='stable')
+        self.cell_keys, first = np.unique(keys[by_cell], return_index=True)
+        self.cell_start = np.append(first, len(keys))
+        self.cell_segments = seg[by_cell]
+
+    def __len__(self):
+        return len(self.seg_start)
+
+    def __repr__(self):
+        return (f"TrackIndex({len(self.storm_ids)} storms, {len(self)} segments, "
+                f"{len(self.cell_keys)} cells of {self.cell_deg:g} deg)")
+
+    def _row(self, lat):
+        return np.floor((np.asarray(lat) + 90) / self.cell_deg).astype(np.int64)
+
+    def _col(self, lon):
+        return np.floor((np.asarray(lon) + 180) / self.cell_deg).astype(np.int64)
+
+    def _key(self, row, col):
+        # Longitudes of the archive stay within -180..360
+        return row * int(np.ceil(540 / self.cell_deg)) + col
+
+    def candidates(self, lats, lons, radius_km):
+        """
+        (query, segment) pairs for the segments listed in the cells that
+        intersect each query's search box. A segment in several of those
+        cells appears more than once.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        pad_lat = radius_km / KM_PER_DEGREE
+        pad_lon = pad_lat / np.maximum(np.cos(np.radians(np.minimum(np.abs(lats) + pad_lat, 89.0))), 0.01)
+        row0, row1 = self._row(lats - pad_lat), self._row(lats + pad_lat)
+        col0, col1 = self._col(lons - pad_lon), self._col(lons + pad_lon)
+        n_cols = col1 - col0 + 1
+        query, local = _expand((row1 - row0 + 1) * n_cols)
+        keys = self._key(row0[query] + local // n_cols[query], col0[query] + local % n_cols[query])
+
+        pos = np.searchsorted(self.cell_keys, keys)
+        found = pos < len(self.cell_keys)
+        found[found] = self.cell_keys[pos[found]] == keys[found]
+        query, pos = query[found], pos[found]
+        counts = self.cell_start[pos + 1] - self.cell_start[pos]
+        cell, local = _expand(counts)
+        return query[cell], self.cell_segments[self.cell_start[pos[cell]] + local]
+
+    def query_many(self, lats, lons, radius_km=DEFAULT_RADIUS_KM, names=None):
+        """
+        Storms that passed within radius_km of each location, one row per
+        (location, storm) at the storm's closest approach: distance, time,
+        position and the wind / pressure interpolated there (Classification
+        of the nearer fix). The segment check is exact (nearest point of
+        the segment in a local projection, reported as a great-circle
+        distance). Sorted by location, then distance.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        names = np.arange(len(lats)) if names is None else np.asarray(names, dtype=object)
+        query, seg = self.candidates(lats, lons, radius_km)
+
+        # Nearest point of each candidate segment, at fraction t along it
+        a, b = self.seg_start[seg], self.seg_end[seg]
+        scale = np.cos(np.radians(lats[query])) * KM_PER_DEGREE
+        x = (lons[query] - self.lon[a]) * scale
+        y = (lats[query] - self.lat[a]) * KM_PER_DEGREE
+        sx = (self.lon[b] - self.lon[a]) * scale
+        sy = (self.lat[b] - self.lat[a]) * KM_PER_DEGREE
+        length2 = sx * sx + sy * sy
+        t = np.clip((x * sx + y * sy) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+        near_lat = self.lat[a] + t * (self.lat[b] - self.lat[a])
+        near_lon = self.lon[a] + t * (self.lon[b] - self.lon[a])
+        distance = haversine_km(lats[query], lons[query], near_lat, near_lon)
+
+        within = np.flatnonzero(distance <= radius_km)
+        storm = self.storm_code[a[within]]
+        # Closest approach per (location, storm): first after sorting by distance
+        order = within[np.lexsort((distance[within], storm, query[within]))]
+        storm = self.storm_code[a[order]]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (query[order][1:] != query[order][:-1]) | (storm[1:] != storm[:-1])
+        hit = order[first]
+
+        a, b, t, q = a[hit], b[hit], t[hit], query[hit]
+
+        def interpolated(values):
+            va, vb = values[a], values[b]
+            mixed = va + t * (vb - va)
+            return np.where(np.isnan(va), vb, np.where(np.isnan(vb), va, mixed))
+
+        nearer = np.where(t <= 0.5, a, b)
+        result = pd.DataFrame({
+            'Location': names[q],
+            'Query_Lat': lats[q],
+            'Query_Lon': lons[q],
+            'StormID': self.storm_ids[self.storm_code[a]],
+            'StormName': self.storm_name[a],
+            'PAGASA_Name': self.pagasa_name[a],
+            'Distance_km': np.round(distance[hit], 1),
+            'Closest_Time': hours_to_stamp(np.round(self.hours[a] + t * (self.hours[b] - self.hours[a]))),
+            'Closest_Lat': np.round(near_lat[hit], 2),
+            'Closest_Lon': np.round(near_lon[hit], 2),
+            'WindSpeed_kt': pd.array(np.round(interpolated(self.wind)), dtype='Int64'),
+            'Pressure_hPa': pd.array(np.round(interpolated(self.pressure)), dtype='Int64'),
+            'Classification': self.classification[nearer],
+        })
+        result['_query'] = q
+        result = result.sort_values(['_query', 'Distance_km'], kind='stable').drop(columns='_query')
+        return result[PROXIMITY_COLUMNS].reset_index(drop=True)
+
+    def query(self, lat, lon, radius_km=DEFAULT_RADIUS_KM):
+        """
+        Storms within radius_km of one location (see query_many).
+        """
+        return self.query_many([lat], [lon], radius_km).drop(columns=['Location', 'Query_Lat', 'Query_Lon'])
+
+def load_track_index(store_dir=STORE_DIR, years=None, cell_deg=INDEX_CELL_DEG):
+    """
+    Builds the index from the columnar store (optionally only some years).
+    """
+    return TrackIndex(load_frame(store_dir, columns=INDEX_COLUMNS, years=years), cell_deg)
+
+def main():
+    parser = argparse.ArgumentParser(description="Storms that passed within a distance of one or more locations.")
+    parser.add_argument('--point', type=float, nargs=2, metavar=('LAT', 'LON'),
+                        help="One location, e.g. --point 11.24 125.00 (Tacloban).")
+    parser.add_argument('--locations', help="CSV with Name, Latitude, Longitude columns (one query each).")
+    parser.add_argument('--radius-km', type=float, default=DEFAULT_RADIUS_KM, help="Search radius (km).")
+    parser.add_argument('--out', help="Write the result to this CSV instead of printing it.")
+    args = parser.parse_args()
+    if (args.point is None) == (args.locations is None):
+        parser.error("give either --point or --locations")
+
+    # Setup paths relative to script (the locations/output files stay
+    # relative to where the command was run)
+    locations_file = os.path.abspath(args.locations) if args.locations else None
+    out_file = os.path.abspath(args.out) if args.out else None
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    if not os.path.exists(os.path.join(STORE_DIR, STORE_META)):
+        print(f"Error: no columnar store in {STORE_DIR}. Run main.py first.")
+        sys.exit(1)
+    index = load_track_index()
+
+    if locations_file:
+        if not os.path.exists(locations_file):
+            print(f"Error: {locations_file} not found.")
+            sys.exit(1)
+        places = pd.read_csv(locations_file)
+        result = index.query_many(places['Latitude'], places['Longitude'], args.radius_km, places['Name'])
+    else:
+        result = index.query_many([args.point[0]], [args.point[1]], args.radius_km,
+                                  [f"{args.point[0]:g},{args.point[1]:g}"])
+
+    if out_file:
+        result.to_csv(out_file, index=False)
+        print(f"{len(result)} storm passages saved to {out_file}")
+    else:
+        with pd.option_context('display.max_rows', None, 'display.width', 200):
+            print(result.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
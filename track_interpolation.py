@@ -0,0 +1,258 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import STORE_DIR, STORE_META, load_frame
+from rapid_intensification import stamp_to_hours
+from wind_swath import track_segments
+
+# --- CONFIGURATION ---
+CROSSINGS_FILE = 'ph_typhoon_par_crossings.csv'
+RESAMPLED_FILE = 'ph_typhoon_track_resampled.csv'
+
+# Resampling step (hours); samples fall on multiples of it (00:00, 01:00, ...)
+RESAMPLE_STEP_HOURS = 1.0
+
+# Fixes further apart than this are not joined: no time inside PAR is
+# counted across the gap and a change of state is dated at the fix after it
+TRACK_MAX_GAP_HOURS = 12
+
+CROSSING_COLUMNS = ['StormID', 'StormName', 'Event', 'Time', 'Latitude', 'Longitude', 'Crossing']
+RESAMPLED_COLUMNS = ['StormID', 'Time', 'Latitude', 'Longitude', 'Pressure_hPa', 'WindSpeed_kt',
+                     'In_PAR', 'Is_Fix']
+
+def hours_to_text(hours):
+    """
+    Hours since 1970 -> 'YYYY-MM-DD HH:MM' (to the minute, '' if missing).
+    """
+    hours = np.asarray(hours, dtype=float)
+    valid = np.isfinite(hours)
+    minutes = np.round(np.where(valid, hours, 0) * 60).astype(np.int64).astype('datetime64[m]')
+    return np.where(valid, np.char.replace(minutes.astype(str), 'T', ' '), '')
+
+def _sorted_tracks(group, timestamp, lat, lon, max_gap):
+    """
+    Fixes sorted by (group, time) and the segments joining them. Returns
+    (order, codes, labels, hours, lat, lon, seg_start, seg_end), sorted
+    arrays and group codes / labels as from pd.factorize; seg_start ==
+    seg_end for a fix that is on no segment (a lone fix).
+    """
+    codes, labels = pd.factorize(np.asarray(group))
+    timestamp = np.asarray(timestamp, dtype=float)
+    hours = stamp_to_hours(timestamp)
+    order = np.lexsort((hours, codes))
+    codes, hours, timestamp = codes[order], hours[order], timestamp[order]
+    lat = np.asarray(lat, dtype=float)[order]
+    lon = np.asarray(lon, dtype=float)[order]
+    start, end = track_segments({'storm_index': codes, 'lat': lat, 'lon': lon, 'timestamp': timestamp}, max_gap)
+
+    # track_segments also gives the last fix of every joined run a
+    # zero-length segment; keep those only for fixes on no real segment
+    real = start != end
+    on_segment = np.zeros(len(codes), dtype=bool)
+    on_segment[end[real]] = True
+    keep = real | ~on_segment[start]
+    return order, codes, np.asarray(labels, dtype=object), hours, lat, lon, start[keep], end[keep]
+
+def par_pieces(group, timestamp, lat, lon, max_gap=TRACK_MAX_GAP_HOURS):
+    """
+    Every track segment cut where it crosses an edge of PAR_VERTICES, for
+    all storms at once. Cuts are the intersections of the segment with the
+    polygon edges (straight lines in lat/lon, as in is_in_par); a piece
+    between two cuts is inside or outside as a whole, tested at its
+    midpoint. Returns a DataFrame in track order: Group, Start / End (hours
+    since 1970) and their points, Inside, and Cut (the piece starts at an
+    edge crossing rather than at a fix).
+    """
+    from main import PAR_VERTICES, is_in_par_array
+
+    _, codes, labels, hours, lat, lon, a, b = _sorted_tracks(group, timestamp, lat, lon, max_gap)
+    ax, ay = lon[a], lat[a]
+    dx, dy = lon[b] - ax, lat[b] - ay
+
+    # Segment x edge intersections (n_segments x n_edges)
+    vx = np.array([x for x, _ in PAR_VERTICES])
+    vy = np.array([y for _, y in PAR_VERTICES])
+    ex, ey = np.roll(vx, -1) - vx, np.roll(vy, -1) - vy
+    wx, wy = vx[None, :] - ax[:, None], vy[None, :] - ay[:, None]
+    denom = dx[:, None] * ey[None, :] - dy[:, None] * ex[None, :]
+    safe = np.where(denom != 0, denom, 1.0)
+    t = (wx * ey[None, :] - wy * ex[None, :]) / safe
+    u = (wx * dy[:, None] - wy * dx[:, None]) / safe
+    hit = (denom != 0) & (t > 0) & (t < 1) & (u >= 0) & (u <= 1)
+
+    # Cut points per segment in order; unused slots become empty pieces at 1
+    cuts = np.sort(np.where(hit, t, 1.0), axis=1)
+    bounds = np.column_stack([np.zeros(len(a)), cuts, np.ones(len(a))])
+    t0, t1 = bounds[:, :-1], bounds[:, 1:]
+    # A lone fix keeps one (empty) piece, so its state still counts
+    used = (t1 > t0) | ((a == b)[:, None] & (np.arange(t0.shape[1]) == 0)[None, :])
+    seg = np.repeat(np.arange(len(a)), used.sum(axis=1))
+    t0, t1 = t0[used], t1[used]
+
+    mid = (t0 + t1) / 2
+    duration = hours[b] - hours[a]
+    return pd.DataFrame({
+        'Group': labels[codes[a[seg]]],
+        'Start': hours[a[seg]] + t0 * duration[seg],
+        'End': hours[a[seg]] + t1 * duration[seg],
+        'Start_Lat': ay[seg] + t0 * dy[seg],
+        'Start_Lon': ax[seg] + t0 * dx[seg],
+        'End_Lat': ay[seg] + t1 * dy[seg],
+        'End_Lon': ax[seg] + t1 * dx[seg],
+        'Inside': is_in_par_array(ay[seg] + mid * dy[seg], ax[seg] + mid * dx[seg]),
+        'Cut': t0 > 0,
+    })
+
+def par_residence(pieces):
+    """
+    Hours inside PAR per group (storm) from par_pieces.
+    """
+    hours = np.where(pieces['Inside'], pieces['End'] - pieces['Start'], 0.0)
+    return pd.Series(hours, index=pieces['Group']).groupby(level=0, sort=False).sum()
+
+def par_crossings(pieces):
+    """
+    PAR entry / exit events from par_pieces: an Entry where a track goes
+    from outside to inside, an Exit where it goes back out. A storm that
+    forms inside PAR gets an Entry at its first fix and one that ends
+    inside an Exit at its last fix; those (and changes across a gap) have
+    Crossing False, exact edge crossings True.
+    """
+    group = pieces['Group'].to_numpy()
+    inside = pieces['Inside'].to_numpy()
+    first = np.ones(len(pieces), dtype=bool)
+    first[1:] = group[1:] != group[:-1]
+    last = np.append(first[1:], True)
+    before = np.concatenate([[False], inside[:-1]]) & ~first
+
+    # Entries and exits happen at the start of a piece, track ends at its end
+    at_start = np.flatnonzero(inside != before)
+    at_end = np.flatnonzero(inside & last)
+    events = pd.DataFrame({
+        'Group': np.concatenate([group[at_start], group[at_end]]),
+        'Event': np.where(np.concatenate([inside[at_start], np.zeros(len(at_end), dtype=bool)]), 'Entry', 'Exit'),
+        'Hours': np.concatenate([pieces['Start'].to_numpy()[at_start], pieces['End'].to_numpy()[at_end]]),
+        'Latitude': np.concatenate([pieces['Start_Lat'].to_numpy()[at_start], pieces['End_Lat'].to_numpy()[at_end]]),
+        'Longitude': np.concatenate([pieces['Start_Lon'].to_numpy()[at_start], pieces['End_Lon'].to_numpy()[at_end]]),
+        'Crossing': np.concatenate([pieces['Cut'].to_numpy()[at_start], np.zeros(len(at_end), dtype=bool)]),
+        'Order': np.concatenate([at_start, at_end + 0.5]),
+    })
+    return events.sort_values('Order', kind='stable').drop(columns='Order').reset_index(drop=True)
+
+def resample_tracks(group, timestamp, lat, lon, step_hours=RESAMPLE_STEP_HOURS, values=None,
+                    max_gap=TRACK_MAX_GAP_HOURS):
+    """
+    Tracks resampled every step_hours (on multiples of the step), all
+    storms at once: position and the given per-fix values (dict of arrays,
+    e.g. pressure) interpolated linearly between the fixes around each
+    sample; a value missing at either fix stays missing. The last fix of
+    each run of joined fixes (and any lone fix) is kept as a sample too.
+    Returns a DataFrame with Group, Hours, Latitude, Longitude, the value
+    columns, In_PAR and Is_Fix, sorted by group and time.
+    """
+    from main import is_in_par_batch
+
+    order, codes, labels, hours, lat, lon, a, b = _sorted_tracks(group, timestamp, lat, lon, max_gap)
+    values = {name: np.asarray(column, dtype=float)[order] for name, column in (values or {}).items()}
+
+    # Samples inside each segment: first multiple of the step at or after
+    # its start fix, up to (not including) its end fix
+    real = np.flatnonzero(a != b)
+    first = np.ceil(hours[a[real]] / step_hours - 1e-9) * step_hours
+    counts = np.maximum(np.ceil((hours[b[real]] - first) / step_hours - 1e-9), 0).astype(np.int64)
+    seg = np.repeat(real, counts)
+    k = np.arange(len(seg)) - np.repeat(np.cumsum(counts) - counts, counts)
+    sample_hours = np.repeat(first, counts) + k * step_hours
+    span = hours[b[seg]] - hours[a[seg]]
+    t = (sample_hours - hours[a[seg]]) / span
+
+    # Plus the fixes that end a run (end of a segment that starts no other)
+    # and lone fixes, at their own time
+    starts_segment = np.zeros(len(codes), dtype=bool)
+    starts_segment[a[real]] = True
+    tail = np.concatenate([b[real][~starts_segment[b[real]]], a[a == b]])
+
+    fix_a = np.concatenate([a[seg], tail])
+    fix_b = np.concatenate([b[seg], tail])
+    t = np.concatenate([t, np.zeros(len(tail))])
+    sample_hours = np.concatenate([sample_hours, hours[tail]])
+
+    def interpolated(column):
+        return column[fix_a] + t * (column[fix_b] - column[fix_a])
+
+    out = {'Group': codes[fix_a], 'Hours': sample_hours,
+           'Latitude': interpolated(lat), 'Longitude': interpolated(lon)}
+    for name, column in values.items():
+        out[name] = interpolated(column)
+    resampled = pd.DataFrame(out)
+    resampled['In_PAR'] = is_in_par_batch(resampled['Latitude'].to_numpy(), resampled['Longitude'].to_numpy())
+    resampled['Is_Fix'] = t == 0
+    resampled = resampled.iloc[np.lexsort((sample_hours, resampled['Group'].to_numpy()))]
+    resampled['Group'] = labels[resampled['Group'].to_numpy()]
+    return resampled.reset_index(drop=True)
+
+def export_par_crossings(store_dir=STORE_DIR, crossings_file=CROSSINGS_FILE, resampled_file=RESAMPLED_FILE,
+                         step_hours=RESAMPLE_STEP_HOURS):
+    """
+    From the columnar store: the PAR entry / exit events of every storm and
+    the tracks resampled every step_hours. Returns the events.
+    """
+    frame = load_frame(store_dir, columns=['StormID', 'StormName', 'Timestamp', 'Latitude', 'Longitude',
+                                           'Pressure_hPa', 'WindSpeed_kt'])
+    sid = np.asarray(frame['StormID'], dtype=object)
+    lat = frame['Latitude'].to_numpy(dtype=float)
+    lon = frame['Longitude'].to_numpy(dtype=float)
+
+    pieces = par_pieces(sid, frame['Timestamp'], lat, lon)
+    events = par_crossings(pieces)
+    names = pd.Series(np.asarray(frame['StormName'], dtype=object), index=sid)
+    names = names[~names.index.duplicated()]
+    events.insert(0, 'StormID', events.pop('Group'))
+    events.insert(1, 'StormName', events['StormID'].map(names).to_numpy())
+    events['Time'] = hours_to_text(events.pop('Hours'))
+    events['Latitude'] = events['Latitude'].round(2)
+    events['Longitude'] = events['Longitude'].round(2)
+    events = events[CROSSING_COLUMNS]
+    events.to_csv(crossings_file, index=False)
+    residence = par_residence(pieces)
+    print(f"PAR crossings: {len(events)} entry/exit events, {residence.sum():.0f} storm-hours inside PAR "
+          f"saved to {crossings_file}")
+
+    # 0 kt is "no estimate" in the JMA data, not calm
+    wind = frame['WindSpeed_kt'].to_numpy(dtype=float, na_value=np.nan)
+    resampled = resample_tracks(sid, frame['Timestamp'], lat, lon, step_hours, {
+        'Pressure_hPa': frame['Pressure_hPa'].to_numpy(dtype=float, na_value=np.nan),
+        'WindSpeed_kt': np.where(wind > 0, wind, np.nan),
+    })
+    resampled.insert(0, 'StormID', resampled.pop('Group'))
+    resampled.insert(1, 'Time', hours_to_text(resampled.pop('Hours')))
+    for col in ['Latitude', 'Longitude']:
+        resampled[col] = resampled[col].round(2)
+    for col in ['Pressure_hPa', 'WindSpeed_kt']:
+        resampled[col] = pd.array(resampled[col].round(), dtype='Int64')
+    resampled[RESAMPLED_COLUMNS].to_csv(resampled_file, index=False)
+    print(f"Resampled tracks: {len(resampled)} points every {step_hours:g} h saved to {resampled_file}")
+    return events
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact PAR entry/exit times and resampled tracks.")
+    parser.add_argument('--step', type=float, default=RESAMPLE_STEP_HOURS, help="Resampling step in hours.")
+    args = parser.parse_args()
+    if args.step <= 0:
+        parser.error("--step must be positive")
+
+    # Setup paths relative to script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    if not os.path.exists(os.path.join(STORE_DIR, STORE_META)):
+        print(f"Error: no columnar store in {STORE_DIR}. Run main.py first.")
+        sys.exit(1)
+    export_par_crossings(step_hours=args.step)
+
+if __name__ == "__main__":
+    main()
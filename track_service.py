@@ -0,0 +1,353 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import numpy as np
+
+from columnar_store import STORE_DIR, STORE_META, load_frame
+from name_mapping import normalize_name
+from rapid_intensification import build_ri_catalogue
+from storm_summary import build_storm_summary
+
+# --- CONFIGURATION ---
+# Local only: the service has no authentication
+HOST = '127.0.0.1'
+PORT = 8765
+
+# Responses kept in the LRU cache (by path and query)
+CACHE_SIZE = 2048
+
+# Latency percentiles (/stats) are taken over this many latest requests
+LATENCY_WINDOW = 10000
+LATENCY_PERCENTILES = [50, 90, 99]
+
+TOP_N_DEFAULT = 10
+TOP_N_MAX = 500
+# /top?by=... -> (summary column, highest first)
+TOP_METRICS = {
+    'wind': ('Peak_WindSpeed_kt', True),
+    'pressure': ('Min_Pressure_hPa', False),
+    'ace': ('ACE', True),
+    'par_hours': ('Hours_Inside_PAR', True),
+}
+
+# Request line plus headers; a longer request gets 431
+MAX_HEADER_BYTES = 16384
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_SECONDS = 15
+LISTEN_BACKLOG = 1024
+
+# Per-fix fields of a storm's track
+FIX_COLUMNS = ['Timestamp', 'Classification', 'In_PAR', 'Latitude', 'Longitude',
+               'Pressure_hPa', 'WindSpeed_kt', 'Grade']
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _records(frame):
+    """
+    DataFrame -> list of dicts of plain Python values (None for missing).
+    """
+    records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+    return [{k: v.item() if isinstance(v, np.generic) else v for k, v in row.items()} for row in records]
+
+def _column_list(series):
+    """
+    A column as a list of plain Python values: floats to 2 decimals (the
+    store keeps float32), None for missing.
+    """
+    if series.dtype.kind == 'f':
+        values = np.round(series.to_numpy(dtype=float), 2)
+        return [None if v != v else v for v in values.tolist()]
+    return [v.item() if isinstance(v, np.generic) else v
+            for v in series.to_numpy(dtype=object, na_value=None).tolist()]
+
+def _flag(query, name):
+    value = query.get(name)
+    if value is None:
+        return None
+    value = value.lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    raise QueryError(400, f"{name} must be 1 or 0")
+
+def _int(query, name, default=None):
+    value = query.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(400, f"{name} must be an integer") from None
+
+class TrackData:
+    """
+    The enriched track table held in memory for queries: every fix in
+    per-column lists sorted by storm (a storm is a slice), one summary
+    record per storm and the RI events, with hash indexes by storm ID,
+    normalized name (international and PAGASA) and year.
+    """
+    def __init__(self, frame, summary, ri_events):
+        # Group the fixes by storm (a storm that runs into the next year
+        # sits in two year partitions), keeping their order within a storm
+        sid = frame['StormID'].astype(str).to_numpy()
+        first_seen = {}
+        for i, s in enumerate(sid.tolist()):
+            first_seen.setdefault(s, i)
+        order = np.argsort(np.array([first_seen[s] for s in sid.tolist()], dtype=np.int64), kind='stable')
+        frame = frame.iloc[order]
+        sid = sid[order]
+
+        self.columns = {col: _column_list(frame[col]) for col in FIX_COLUMNS}
+        starts = np.flatnonzero(np.r_[True, sid[1:] != sid[:-1]]) if len(sid) else np.empty(0, dtype=np.int64)
+        ends = np.r_[starts[1:], len(sid)]
+        self.slices = {s: (a, b) for s, a, b in zip(sid[starts].tolist(), starts.tolist(), ends.tolist())}
+
+        self.summary = {row['StormID']: row for row in _records(summary)}
+        self.by_name = {}
+        self.by_year = {}
+        for storm_id, row in self.summary.items():
+            for name in (row['StormName'], row['PAGASA_Name']):
+                key = normalize_name(name)
+                if key and storm_id not in self.by_name.setdefault(key, []):
+                    self.by_name[key].append(storm_id)
+            self.by_year.setdefault(row['Year'], []).append(storm_id)
+
+        self.ri_events = _records(ri_events)
+        self.ri_by_storm = {}
+        for event in self.ri_events:
+            self.ri_by_storm.setdefault(event['StormID'], []).append(event)
+
+    def fixes(self, storm_id, in_par=None):
+        a, b = self.slices.get(storm_id, (0, 0))
+        rows = [dict(zip(FIX_COLUMNS, values)) for values in zip(*(self.columns[c][a:b] for c in FIX_COLUMNS))]
+        if in_par is not None:
+            rows = [row for row in rows if (row['In_PAR'] == 'Inside PAR') == in_par]
+        return rows
+
+    def storm(self, storm_id, in_par=None):
+        if storm_id not in self.summary:
+            raise QueryError(404, f"no storm {storm_id}")
+        return {'storm': self.summary[storm_id], 'fixes': self.fixes(storm_id, in_par)}
+
+    def _filter(self, storm_ids, year=None, in_par=None):
+        rows = [self.summary[s] for s in storm_ids]
+        if year is not None:
+            rows = [row for row in rows if row['Year'] == year]
+        if in_par is not None:
+            rows = [row for row in rows if (row['PAR_Entry'] is not None) == in_par]
+        return rows
+
+    def find(self, name, year=None, in_par=None):
+        """
+        Storms named `name` (international or PAGASA, any spelling that
+        normalizes the same), with their tracks.
+        """
+        rows = self._filter(self.by_name.get(normalize_name(name), []), year)
+        return {'storms': [self.storm(row['StormID'], in_par) for row in rows]}
+
+    def storms(self, year=None, in_par=None):
+        storm_ids = self.by_year.get(year, []) if year is not None else list(self.summary)
+        return {'storms': self._filter(storm_ids, None, in_par)}
+
+    def top(self, n=TOP_N_DEFAULT, by='wind', year=None, in_par=None):
+        if by not in TOP_METRICS:
+            raise QueryError(400, f"by must be one of {', '.join(TOP_METRICS)}")
+        if not 1 <= n <= TOP_N_MAX:
+            raise QueryError(400, f"n must be between 1 and {TOP_N_MAX}")
+        column, descending = TOP_METRICS[by]
+        rows = [row for row in self.storms(year, in_par)['storms'] if row[column] is not None]
+        # Ties: the stronger storm by the other intensity measure, then the older one
+        rows.sort(key=lambda row: (-row[column] if descending else row[column],
+                                   row['Min_Pressure_hPa'] if row['Min_Pressure_hPa'] is not None else 9999,
+                                   row['First_Timestamp']))
+        return {'by': by, 'storms': rows[:n]}
+
+    def ri(self, year=None, storm_id=None):
+        events = self.ri_by_storm.get(storm_id, []) if storm_id is not None else self.ri_events
+        if year is not None:
+            events = [event for event in events if int(event['Start']) // 1000000 == year]
+        return {'events': events}
+
+def load_track_data(store_dir=STORE_DIR):
+    frame = load_frame(store_dir)
+    summary = build_storm_summary(frame)
+    return TrackData(frame, summary, build_ri_catalogue(store_dir))
+
+class TrackService:
+    """
+    The HTTP side: routes GET requests to TrackData, caches the encoded
+    responses (LRU, bounded) and keeps the latency of the latest requests.
+    A request's latency is the time from the parsed request to the encoded
+    response, so a cache hit shows up as a few microseconds.
+    """
+    def __init__(self, data, cache_size=CACHE_SIZE):
+        self.data = data
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {'requests': 0, 'cache_hits': 0, 'cache_misses': 0, 'errors': 0}
+        self.started = time.time()
+
+    def route(self, path, query):
+        parts = [unquote(p) for p in path.strip('/').split('/') if p]
+        in_par = _flag(query, 'in_par')
+        year = _int(query, 'year')
+        if parts == ['storm'] and 'name' in query:
+            return self.data.find(query['name'], year, in_par)
+        if len(parts) == 2 and parts[0] == 'storm':
+            return self.data.storm(parts[1], in_par)
+        if parts == ['storms']:
+            return self.data.storms(year, in_par)
+        if parts == ['top']:
+            return self.data.top(_int(query, 'n', TOP_N_DEFAULT), query.get('by', 'wind'), year, in_par)
+        if parts == ['ri']:
+            return self.data.ri(year, query.get('storm'))
+        if parts == ['stats']:
+            return self.stats()
+        if parts == ['health']:
+            return {'status': 'ok', 'storms': len(self.data.summary)}
+        raise QueryError(404, f"unknown endpoint /{'/'.join(parts)}")
+
+    def respond(self, target):
+        """
+        (status, JSON body) for a request target like /top?n=5&by=wind.
+        """
+        start = time.perf_counter()
+        self.counters['requests'] += 1
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        key = (url.path.rstrip('/'), tuple(sorted(query.items())))
+        live = key[0] in ('/stats', '/health')
+
+        cached = None if live else self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.counters['cache_hits'] += 1
+            status, body = cached
+        else:
+            try:
+                status, payload = 200, self.route(url.path, query)
+            except QueryError as e:
+                status, payload = e.status, {'error': str(e)}
+            except Exception as e:
+                status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+            body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            if not live and status < 500:
+                self.counters['cache_misses'] += 1
+                self.cache[key] = (status, body)
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        if status >= 400:
+            self.counters['errors'] += 1
+        self.latencies.append(time.perf_counter() - start)
+        return status, body
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000.0
+        percentiles = ({f"p{p}": round(float(v), 3) for p, v in
+                        zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES))}
+                       if len(latencies) else {})
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            **self.counters,
+            'cache_entries': len(self.cache),
+            'cache_capacity': self.cache_size,
+            'latency_ms': dict(percentiles, max=round(float(latencies.max()), 3) if len(latencies) else None,
+                               window=len(latencies)),
+        }
+
+    async def handle(self, reader, writer):
+        """
+        One connection: HTTP/1.1 requests with keep-alive until the client
+        closes, asks to close, or stays idle for KEEP_ALIVE_SECONDS.
+        """
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_SECONDS)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 431, b'{"error":"request too large"}', close=True)
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                request = lines[0].split()
+                headers = {k.strip().lower(): v.strip() for k, _, v in
+                           (line.partition(':') for line in lines[1:] if line)}
+                if len(request) != 3:
+                    await self._send(writer, 400, b'{"error":"bad request line"}', close=True)
+                    break
+                method, target, version = request
+                close = (headers.get('connection', '').lower() == 'close'
+                         or (version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive'))
+                if method not in ('GET', 'HEAD'):
+                    status, body = 405, b'{"error":"only GET is supported"}'
+                else:
+                    status, body = self.respond(target)
+                await self._send(writer, status, body, close=close, head_only=method == 'HEAD')
+                if close:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _send(self, writer, status, body, close=False, head_only=False):
+        header = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                  f"Content-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n"
+                  f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n").encode('latin-1')
+        writer.write(header if head_only else header + body)
+        await writer.drain()
+
+async def serve(service, host=HOST, port=PORT, ready=None):
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES,
+                                        backlog=LISTEN_BACKLOG)
+    address = server.sockets[0].getsockname()
+    print(f"Serving {len(service.data.summary)} storms on http://{address[0]}:{address[1]}/ (Ctrl+C to stop)")
+    if ready is not None:
+        ready.set_result(address)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP query service over the enriched track data.")
+    parser.add_argument('--host', default=HOST, help="Interface to listen on.")
+    parser.add_argument('--port', type=int, default=PORT, help="Port to listen on.")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help="Responses kept in the LRU cache.")
+    args = parser.parse_args()
+
+    # Setup paths relative to script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    if not os.path.exists(os.path.join(STORE_DIR, STORE_META)):
+        print(f"Error: no columnar store in {STORE_DIR}. Run main.py first.")
+        sys.exit(1)
+    start = time.perf_counter()
+    data = load_track_data()
+    print(f"Loaded {sum(b - a for a, b in data.slices.values())} fixes of {len(data.summary)} storms "
+          f"in {time.perf_counter() - start:.2f} s")
+    try:
+        asyncio.run(serve(TrackService(data, args.cache_size), args.host, args.port))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+if __name__ == "__main__":
+    main()
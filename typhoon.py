@@ -0,0 +1,75 @@
+import argparse
+import importlib
+import sys
+
+# --- CONFIGURATION ---
+# Subcommand -> (module, entry point, help). The module is imported only
+# when its subcommand runs, so `typhoon.py --help` and the lookups below
+# never load pandas (see benchmark.py --stage startup).
+COMMANDS = {
+    'export': ('main', 'main', "Parse the JMA archive into the enriched track table and its side outputs."),
+    'pipeline': ('pipeline', 'main', "Run the stale stages of the data pipeline."),
+    'names': ('wiki_names', 'main', "Extract storm names from Wikipedia season lists."),
+    'merge-names': ('name_merge', 'main', "Keyed merge of PAGASA name tables."),
+    'swaths': ('wind_swath', 'main', "Gale / storm-force wind swaths and exposure."),
+    'crossings': ('track_interpolation', 'main', "Exact PAR entry/exit times and resampled tracks."),
+    'agencies': ('best_track_formats', 'main', "Ingest JMA / JTWC / IBTrACS best tracks and match storms across them."),
+    'near': ('track_index', 'main', "Storms that passed near a location."),
+    'bi': ('bi_extracts', 'main', "Simplified tracks and fact tables for the Power BI model."),
+    'serve': ('track_service', 'main', "Local HTTP query service over the track data."),
+    'sql': ('sqlite_sink', 'main', "Time typhoon_analysis.sql against the SQLite sink."),
+    'generate': ('generate_best_track', 'main', "Write synthetic JMA best-track files."),
+    'benchmark': ('benchmark', 'main_cli', "Benchmark the pipeline stages."),
+}
+
+# Lookups answered here, with the pure functions of main.py (NumPy only)
+LOCAL_COMMANDS = {
+    'classify': "Classification of one fix on the PAGASA scale.",
+    'par': "Whether points (LAT LON pairs) are inside PAR.",
+}
+
+def classify(argv):
+    parser = argparse.ArgumentParser(prog='typhoon.py classify', description=LOCAL_COMMANDS['classify'])
+    parser.add_argument('--grade', default='', help="JMA grade (2-7).")
+    parser.add_argument('--wind', default='', help="Maximum sustained wind (kt).")
+    parser.add_argument('--pressure', default='', help="Central pressure (hPa).")
+    args = parser.parse_args(argv)
+
+    from main import get_classification
+    print(get_classification(args.grade, args.wind, args.pressure) or 'Unclassified')
+
+def par(argv):
+    parser = argparse.ArgumentParser(prog='typhoon.py par', description=LOCAL_COMMANDS['par'])
+    parser.add_argument('coords', nargs='+', type=float, metavar='LAT LON')
+    args = parser.parse_args(argv)
+    if len(args.coords) % 2:
+        parser.error("give latitude / longitude pairs")
+
+    from main import is_in_par
+    for lat, lon in zip(args.coords[::2], args.coords[1::2]):
+        print(f"{lat:g},{lon:g},{'Inside PAR' if is_in_par(lat, lon) else 'Outside PAR'}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    listing = '\n'.join(f"  {name:12s} {text}" for name, text in
+                        [(name, spec[2]) for name, spec in COMMANDS.items()] + list(LOCAL_COMMANDS.items()))
+    parser = argparse.ArgumentParser(
+        prog='typhoon.py', description="Philippine typhoon data pipeline.",
+        epilog=f"commands:\n{listing}\n\nRun 'typhoon.py <command> --help' for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=list(COMMANDS) + list(LOCAL_COMMANDS), metavar='command',
+                        help="One of the commands below.")
+    # Everything after the command belongs to it (including --help)
+    args = parser.parse_args(argv[:1] if argv and not argv[0].startswith('-') else argv)
+    rest = argv[1:]
+
+    if args.command == 'classify':
+        return classify(rest)
+    if args.command == 'par':
+        return par(rest)
+    module, entry, _ = COMMANDS[args.command]
+    sys.argv = [f"typhoon.py {args.command}", *rest]
+    return getattr(importlib.import_module(module), entry)()
+
+if __name__ == "__main__":
+    main()
@@ -55,8 +55,8 @@ SELECT
     Year,
     StormName,
     PAGASA_Name,
-    MIN(Pressure_hPa) AS Lowest_Pressure,
-    MAX(WindSpeed_kt) AS Max_Wind_Speed
+    MIN(CAST(Pressure_hPa AS DECIMAL(10,2))) AS Lowest_Pressure,
+    MAX(CAST(WindSpeed_kt AS DECIMAL(10,2))) AS Max_Wind_Speed
 FROM ph_typhoon_data_v4
 WHERE In_PAR = 'Inside PAR'
 GROUP BY StormID, Year, StormName, PAGASA_Name
@@ -131,4 +131,16 @@ GROUP BY StormID, StormName, PAGASA_Name, Year
 ORDER BY Hours_Inside_PAR DESC
 LIMIT 10;
 
-
+-- Same question from the exact PAR boundary crossings (SQLite sink only)
+-- ph_typhoon_storm_summary is written by main.py into ph_typhoon_data.db, the
+-- MySQL import has no such table. COUNT(*) * 6 above assumes 6-hourly fixes,
+-- Hours_Inside_PAR here is measured between the entry and exit crossings.
+SELECT 
+    StormName,
+    PAGASA_Name,
+    Year,
+    Hours_Inside_PAR
+FROM ph_typhoon_storm_summary
+WHERE Hours_Inside_PAR > 0
+ORDER BY Hours_Inside_PAR DESC
+LIMIT 10;
@@ -1,22 +1,21 @@
-import csv
+import os
 
-input_file = 'x:\\Programming\\Python\\Japan Typhoons\\ph_typhoon_names_2000_2025.csv'
-output_file = 'x:\\Programming\\Python\\Japan Typhoons\\ph_typhoon_names_2000_2025_fixed.csv'
+from name_merge import PATCH_FILE, merge_name_files
 
-updated_rows = []
-with open(input_file, 'r', newline='', encoding='utf-8') as f:
-    reader = csv.reader(f)
-    header = next(reader)
-    updated_rows.append(header)
-    for row in reader:
-        # Check for Mindulle 2021
-        if row[0] == '2021' and row[1] == 'Mindulle':
-            print("Found Mindulle (2021). Removing row.")
-            continue
-        updated_rows.append(row)
+# --- CONFIGURATION ---
+# Reads the extractor's output and writes the fixed table (no longer in place,
+# so re-running it is harmless)
+INPUT_FILE = 'ph_typhoon_names_2000_2025_extracted.csv'
+OUTPUT_FILE = 'ph_typhoon_names_2000_2025.csv'
 
-with open(input_file, 'w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f)
-    writer.writerows(updated_rows)
+def apply_name_patches(input_file, output_file, patch_file=PATCH_FILE):
+    """
+    The extracted 2000-2025 table with the hand fixes in the patch file
+    applied (the 2021 Mindulle row removal used to be hard-coded here).
+    """
+    return merge_name_files([input_file], output_file, patch_file)
 
-print("Updated file.")
+if __name__ == "__main__":
+    # Setup paths relative to script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    apply_name_patches(INPUT_FILE, OUTPUT_FILE)
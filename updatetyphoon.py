@@ -1,41 +1,25 @@
-import pandas as pd
 import os
 
+from name_mapping import attach_pagasa_names, load_mapping_index
+
+# --- CONFIGURATION ---
+INPUT_FILE = 'bst_all.txt'
+MAPPING_FILE = 'pagasa_mapping_all.csv'
+OUTPUT_FILE = 'ph_typhoon_data_complete.csv'
+
 def load_pagasa_mapping(mapping_file):
-    mapping = {}
-    if not os.path.exists(mapping_file):
-        print(f"Warning: Mapping file {mapping_file} not found. Using empty mapping.")
-        return mapping
-        
-    try:
-        df_map = pd.read_csv(mapping_file)
-        # Ensure we work with strings and handle missing values
-        df_map['International Name'] = df_map['International Name'].fillna('').astype(str).str.strip().str.upper()
-        df_map['PAGASA Name'] = df_map['PAGASA Name'].fillna('').astype(str).str.strip().str.upper()
-        
-        for _, row in df_map.iterrows():
-            year = int(row['Year'])
-            intl_name = row['International Name']
-            pagasa_name = row['PAGASA Name']
-            
-            if intl_name and intl_name != 'N/A':
-                mapping[(year, intl_name)] = pagasa_name
-                
-    except Exception as e:
-        print(f"Error loading mapping file: {e}")
-        
-    return mapping
+    # Shared index (normalized names, overrides merged, cached on disk)
+    return load_mapping_index(mapping_file)
+
+def parse_and_map_typhoons(file_path, mapping_csv=MAPPING_FILE, output_file=OUTPUT_FILE):
+    import pandas as pd
 
-def parse_and_map_typhoons(file_path):
     # Load PAGASA mappings from CSV
-    mapping_csv = os.path.join(os.path.dirname(__file__), 'pagasa_mapping_all.csv')
     mapping = load_pagasa_mapping(mapping_csv)
-    
-    # Add manual fallback for older typhoons not in CSV or special cases
-    manual_mapping = {
-        (1991, 'THELMA'): 'URING'
-    }
-    mapping.update(manual_mapping)
+
+    if not os.path.exists(file_path):
+        print(f"Error: {file_path} not found.")
+        return None
 
     data_rows = []
     current_name, current_id = None, None
@@ -54,7 +38,6 @@ def parse_and_map_typhoons(file_path):
             row = {
                 'StormID': current_id,
                 'StormName': current_name,
-                'PAGASA_Name': mapping.get((year, current_name.upper()), ""),
                 'Timestamp': f"{year}{date_str[2:]}",
                 'Latitude': float(line[15:18]) / 10.0,
                 'Longitude': float(line[19:23]) / 10.0,
@@ -63,7 +46,11 @@ def parse_and_map_typhoons(file_path):
             data_rows.append(row)
     
     df = pd.DataFrame(data_rows)
-    output_file = 'ph_typhoon_data_complete.csv'
+
+    # PAGASA names for all rows in one join on (Year, normalized name)
+    if not df.empty:
+        pagasa = attach_pagasa_names(mapping, df['Timestamp'].str[:4].astype(int), df['StormName'])
+        df.insert(2, 'PAGASA_Name', pd.Series(pagasa).fillna('').str.upper())
     try:
         df.to_csv(output_file, index=False)
         print(f"File successfully created: {output_file}")
@@ -73,4 +60,7 @@ def parse_and_map_typhoons(file_path):
         df.to_csv(output_file_fallback, index=False)
         print(f"Saved to {output_file_fallback} instead.")
 
-parse_and_map_typhoons('bst_all.txt')
\ No newline at end of file
+if __name__ == "__main__":
+    # Setup paths relative to script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parse_and_map_typhoons(INPUT_FILE)
@@ -0,0 +1,188 @@
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# --- CONFIGURATION ---
+# Output of every extractor; Heuristic is True when a name was guessed (a
+# lone name with no "(PAGASA)" part, or a year in its place) rather than read
+NAME_COLUMNS = ['Year', 'International Name', 'PAGASA Name', 'Heuristic']
+MISSING_NAME = 'N/A'
+
+# Files picked up when a folder of season dumps is given
+WIKI_GLOB = '*.txt'
+
+STORM_TYPES = ['Super Typhoon', 'Typhoon', 'Severe Tropical Storm', 'Tropical Storm', 'Tropical Depression']
+
+# A type prefix, or a type on its own (no name at all)
+TYPE_RE = re.compile(r'^(?:' + '|'.join(STORM_TYPES) + r')(?:\s+|$)', re.IGNORECASE)
+# JTWC numbers (06W, 32W/33W) stand in for a name on unnamed depressions
+NUMBER_RE = re.compile(r'^\d+W(?:/\d+W)?$')
+YEAR_RE = re.compile(r'^\d{4}$')
+# The PAGASA name in a link (...#Tropical_Depression_07W_(Elang))
+LINK_NAME_RE = re.compile(r'\(([A-Za-z]+)\)')
+
+# One pass over a line finds everything: the season header ("## 1963" in
+# the 1963-1999 list, "### 2000" in the 2000-2025 one), bracketed storms
+# split into type, name and "(PAGASA)" with an optional link (which may
+# hold one level of parentheses, e.g. ..._Typhoon_Ruby_(1964)), a "(Name)"
+# outside the brackets and an unbracketed "Type Name" after the date
+_TYPES = '|'.join(re.escape(t) for t in STORM_TYPES)
+TOKEN_RE = re.compile(rf"""
+      ^\#{{2,3}}\s+(?P<year>\d{{4}})
+    | \[(?:(?P<type>{_TYPES})\b\s*)?(?P<name>[^\]()]*?)\s*
+        (?:\((?:(?:{_TYPES})\s+)?(?P<inner>[^()\]]*?)\s*\)\s*)?\]
+        (?:\((?P<url>[^()\s]*(?:\([^()\s]*\)[^()\s]*)*)\))?
+    | \((?P<paren>[^()]*)\)
+    | ^•[^:\[]*:\s*(?:(?P<bare_type>{_TYPES})\b\s*)?(?P<bare>[^\[(]*?)\s*(?=\(|$)
+""", re.VERBOSE | re.IGNORECASE)
+
+def clean_name(name):
+    """
+    Storm name without its type ("Typhoon Emong" -> "Emong"); '' if only a type.
+    """
+    return TYPE_RE.sub('', name.strip(), count=1).rstrip()
+
+def resolve_storm(kind, name, inner=None, url=None, paren=None):
+    """
+    (international, PAGASA, heuristic) for one storm token (type, name and
+    "(PAGASA)" as split by TOKEN_RE), the rows the two season lists always
+    gave. The PAGASA name is the one in parentheses inside or right after
+    the brackets. A lone name is a guess:
+      - linked (1963-1999 list): the PAGASA name is the first "(Name)" in
+        the link and the lone name stays in the international column (a
+        guess when both are the same); no such link, no row
+      - unlinked (2000-2025 list): a depression's name (or the bare type)
+        is the PAGASA name, anything else's the international one
+    A year in parentheses is kept as the list has it, flagged. Returns None
+    for an unnamed storm or one known only by its JTWC number.
+    """
+    if 'unnamed' in name.lower():
+        name = ''
+    if inner:
+        return name or MISSING_NAME, inner, bool(YEAR_RE.match(inner))
+    if paren and not YEAR_RE.match(paren.strip()) and paren.strip().lower() != 'unnamed':
+        return name or MISSING_NAME, clean_name(paren) or MISSING_NAME, False
+    if NUMBER_RE.match(name):
+        return None
+
+    if url is not None:
+        linked = LINK_NAME_RE.search(url)
+        if not name or not linked:
+            return None
+        return name, linked.group(1), linked.group(1).lower() == name.lower()
+    name = name or kind or ''
+    if not name:
+        return None
+    if kind and 'depression' in kind.lower():
+        return MISSING_NAME, name, True
+    return name, MISSING_NAME, True
+
+def iter_storm_names(lines):
+    """
+    Yields [Year, International Name, PAGASA Name, Heuristic] for every
+    storm in the lines of a season list (both formats), in order. Lines
+    are read one at a time, so any iterable works (an open file).
+    """
+    year = None
+    for line in lines:
+        line = line.strip()
+        # Only headers and bullets hold tokens
+        if not line or line[0] not in '#•':
+            continue
+
+        # A storm token, optionally followed by its "(PAGASA)" token
+        storm = None
+        for token in TOKEN_RE.finditer(line):
+            header, kind, name, inner, url, paren, bare_kind, bare = token.group(
+                'year', 'type', 'name', 'inner', 'url', 'paren', 'bare_type', 'bare')
+            if header:
+                year = header
+                break
+            if year is None:
+                break
+            if storm is not None:
+                names = resolve_storm(*storm, paren)
+                if names is not None:
+                    yield [year, *names]
+            if name is not None:
+                storm = (kind, name, inner, url)
+            elif bare is not None:
+                storm = (bare_kind, bare, None, None)
+            else:
+                storm = None
+        if storm is not None:
+            names = resolve_storm(*storm)
+            if names is not None:
+                yield [year, *names]
+
+def extract_file(input_file):
+    with open(input_file, 'r', encoding='utf-8') as f:
+        return list(iter_storm_names(f))
+
+def write_names(rows, output_file):
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(NAME_COLUMNS)
+        writer.writerows(rows)
+    guessed = sum(1 for row in rows if row[3])
+    print(f"Extracted {len(rows)} storms ({guessed} with a guessed name) to {output_file}")
+    return rows
+
+def extract_names(input_file, output_file):
+    """
+    Season list -> name table (NAME_COLUMNS). Returns the rows, or None if
+    the input file does not exist.
+    """
+    if not os.path.exists(input_file):
+        print(f"Error: {input_file} not found.")
+        return None
+    return write_names(extract_file(input_file), output_file)
+
+def wiki_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, WIKI_GLOB))))
+        else:
+            files.append(path)
+    return files
+
+def extract_many(input_files, output_file, workers=1):
+    """
+    Several season dumps (each with its own year headers) into one table,
+    in file order. With workers > 1 the files are parsed in a process pool.
+    Returns the rows, or None if a file is missing.
+    """
+    missing = [path for path in input_files if not os.path.exists(path)]
+    if missing:
+        print(f"Error: {', '.join(missing)} not found.")
+        return None
+    if workers > 1 and len(input_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(input_files))) as pool:
+            results = list(pool.map(extract_file, input_files))
+    else:
+        results = [extract_file(path) for path in input_files]
+    print(f"Parsed {len(input_files)} season files.")
+    return write_names([row for rows in results for row in rows], output_file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract storm names from Wikipedia season lists.")
+    parser.add_argument('paths', nargs='+', help=f"Season list files or folders of them ({WIKI_GLOB}).")
+    parser.add_argument('--out', required=True, help="Output CSV.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parse the files in parallel with this many processes (0 = one per CPU).")
+    args = parser.parse_args()
+
+    files = wiki_files(args.paths)
+    if not files:
+        print("Error: no season files found.")
+        sys.exit(1)
+    if extract_many(files, args.out, args.workers or os.cpu_count() or 1) is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
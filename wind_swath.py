@@ -0,0 +1,266 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from rapid_intensification import stamp_to_hours
+
+# --- CONFIGURATION ---
+INPUT_FILE = 'bst_all.txt'
+SWATH_FILE = 'ph_typhoon_wind_swaths.npz'
+EXPOSURE_FILE = 'ph_typhoon_wind_exposure.csv'
+
+# Footprint grid over the Philippines: cell centres every SWATH_GRID_STEP
+# degrees inside these bounds
+SWATH_LAT = (4.0, 22.0)
+SWATH_LON = (115.0, 128.0)
+SWATH_GRID_STEP = 0.1
+
+# Fixes further apart than this are not joined (the area is drawn around
+# each of them only)
+SWATH_MAX_GAP_HOURS = 12
+
+# (segment, cell) distance pairs evaluated per NumPy batch (bounds memory)
+SWATH_BATCH_PAIRS = 1_000_000
+
+# Bearing (degrees from north) of the JMA direction codes 1-8 (NE ... N);
+# 0 (no radius) and 9 (symmetric circle) have no direction
+DIRECTION_BEARINGS = {1: 45, 2: 90, 3: 135, 4: 180, 5: 225, 6: 270, 7: 315, 8: 0}
+
+NM_PER_DEGREE = 60.0
+
+def swath_grid(lat_range=SWATH_LAT, lon_range=SWATH_LON, step=SWATH_GRID_STEP):
+    """
+    Cell-centre latitudes and longitudes of the footprint grid (1-D axes).
+    Cell k of the flattened grid is (lat[k // len(lon)], lon[k % len(lon)]).
+    """
+    n_lat = int(round((lat_range[1] - lat_range[0]) / step))
+    n_lon = int(round((lon_range[1] - lon_range[0]) / step))
+    return (lat_range[0] + (np.arange(n_lat) + 0.5) * step,
+            lon_range[0] + (np.arange(n_lon) + 0.5) * step)
+
+def _radius_coefficients(long_nm, short_nm, direction):
+    """
+    Per-fix wind area as r(u) = c0 + cx * ux + cy * uy, the radius towards
+    the unit vector u (ux east, uy north): the longest radius in its
+    direction, easing (half a cosine) to the shortest one on the opposite
+    side. Missing radii are 0; without a direction (codes 0 / 9 / missing)
+    the area is a circle of the longest radius. Returns (c0, cx, cy).
+    """
+    long_nm = np.nan_to_num(np.asarray(long_nm, dtype=float), nan=0.0)
+    short_nm = np.nan_to_num(np.asarray(short_nm, dtype=float), nan=0.0)
+    direction = np.asarray(direction)
+    bearing = np.full(len(direction), np.nan)
+    for code, degrees in DIRECTION_BEARINGS.items():
+        bearing[direction == code] = np.radians(degrees)
+    symmetric = np.isnan(bearing)
+    short_nm = np.where(symmetric, long_nm, np.minimum(short_nm, long_nm))
+    half_range = (long_nm - short_nm) / 2
+    bearing = np.nan_to_num(bearing)
+    return (long_nm + short_nm) / 2, half_range * np.sin(bearing), half_range * np.cos(bearing)
+
+def track_segments(cols, max_gap=SWATH_MAX_GAP_HOURS):
+    """
+    (start fix, end fix) of every track segment: consecutive fixes of a storm
+    with coordinates, at most max_gap hours apart. A fix that starts no
+    segment (last of its storm, or before a gap) gets a zero-length one, so
+    every fix with coordinates is covered.
+    """
+    idx = cols['storm_index']
+    valid = np.flatnonzero(~np.isnan(cols['lat']) & ~np.isnan(cols['lon']))
+    hours = stamp_to_hours(cols['timestamp'][valid])
+    joined = ((idx[valid][1:] == idx[valid][:-1])
+              & (hours[1:] - hours[:-1] <= max_gap) & (hours[1:] >= hours[:-1]))
+    starts = valid
+    ends = valid.copy()
+    ends[:-1][joined] = valid[1:][joined]
+    return starts, ends
+
+def build_wind_swaths(cols, lat_range=SWATH_LAT, lon_range=SWATH_LON, step=SWATH_GRID_STEP,
+                      batch_pairs=SWATH_BATCH_PAIRS):
+    """
+    30 kt (gale) and 50 kt (storm-force) wind footprints of every storm on
+    the swath grid, from the arrays of parse_jma_columns.
+
+    Along each segment between two fixes the centre moves linearly and the
+    radii are interpolated between the fixes' values. A cell is in the
+    swath if it lies within the interpolated radius (towards the cell) of
+    the nearest point of the segment. Distances use a local flat-earth
+    approximation in nautical miles. All (segment, cell) pairs within each
+    segment's bounding box are evaluated in large NumPy batches.
+
+    Returns {'lat', 'lon' (grid axes), 'storm_index' (storms with wind
+    areas on the grid), 'swath30', 'swath50' (bool, storms x cells)}.
+    """
+    grid_lat, grid_lon = swath_grid(lat_range, lon_range, step)
+    n_lon = len(grid_lon)
+    n_cells = len(grid_lat) * n_lon
+    lat, lon = cols['lat'], cols['lon']
+    long30 = np.nan_to_num(cols['r30_long'])
+    long50 = np.nan_to_num(cols['r50_long'])
+
+    start, end = track_segments(cols)
+    reach50 = np.maximum(long50[start], long50[end])
+    reach = np.maximum(np.maximum(long30[start], long30[end]), reach50)
+    keep = reach > 0
+    start, end, reach, reach50 = start[keep], end[keep], reach[keep], reach50[keep]
+
+    # Bounding box of each segment plus its largest radius, in grid rows/columns
+    cos_lat = np.cos(np.radians((lat[start] + lat[end]) / 2))
+    pad_lat = reach / NM_PER_DEGREE
+    pad_lon = pad_lat / np.maximum(cos_lat, 0.01)
+    row0 = np.ceil((np.minimum(lat[start], lat[end]) - pad_lat - lat_range[0]) / step - 0.5)
+    row1 = np.floor((np.maximum(lat[start], lat[end]) + pad_lat - lat_range[0]) / step - 0.5)
+    col0 = np.ceil((np.minimum(lon[start], lon[end]) - pad_lon - lon_range[0]) / step - 0.5)
+    col1 = np.floor((np.maximum(lon[start], lon[end]) + pad_lon - lon_range[0]) / step - 0.5)
+    row0 = np.maximum(row0, 0).astype(np.int64)
+    row1 = np.minimum(row1, len(grid_lat) - 1).astype(np.int64)
+    col0 = np.maximum(col0, 0).astype(np.int64)
+    col1 = np.minimum(col1, n_lon - 1).astype(np.int64)
+    n_cols = np.maximum(col1 - col0 + 1, 0)
+    size = np.maximum(row1 - row0 + 1, 0) * n_cols
+
+    # Per-segment geometry (nm, x east / y north of the start fix) and the
+    # radius coefficients at both ends, as start value + change over the
+    # segment; float32 halves the memory traffic of the per-pair arrays
+    scale = cos_lat * NM_PER_DEGREE
+    sx = (lon[end] - lon[start]) * scale
+    sy = (lat[end] - lat[start]) * NM_PER_DEGREE
+    length2 = sx * sx + sy * sy
+    seg_geometry = [np.float32(v) for v in (lon[start], lat[start], scale, sx, sy,
+                                            1.0 / np.where(length2 > 0, length2, 1.0))]
+
+    def coefficients(long_key, short_key, dir_key):
+        coef = _radius_coefficients(cols[long_key], cols[short_key], cols[dir_key])
+        return [v for c in coef for v in (np.float32(c[start]), np.float32(c[end] - c[start]))]
+
+    coef30 = coefficients('r30_long', 'r30_short', 'dir30')
+    coef50 = coefficients('r50_long', 'r50_short', 'dir50')
+    grid_lat32, grid_lon32 = np.float32(grid_lat), np.float32(grid_lon)
+
+    def inside(coef, seg, t, dx, dy, distance):
+        # distance < r(t, u) with u = (dx, dy) / distance, multiplied out
+        c0, d0, cx, dcx, cy, dcy = [c[seg] for c in coef]
+        return distance * distance < ((c0 + t * d0) * distance + (cx + t * dcx) * dx + (cy + t * dcy) * dy)
+
+    on_grid = np.flatnonzero(size > 0)
+    # One mask row per storm with a segment near the grid
+    storms, storm_row = np.unique(cols['storm_index'][start[on_grid]], return_inverse=True)
+    row_of = np.zeros(len(start), dtype=np.int64)
+    row_of[on_grid] = storm_row
+    swath30 = np.zeros((len(storms), n_cells), dtype=bool)
+    swath50 = np.zeros((len(storms), n_cells), dtype=bool)
+    # Segments in batches of about batch_pairs (segment, cell) pairs
+    batch_of = (np.cumsum(size[on_grid]) - 1) // batch_pairs
+    for batch in np.split(on_grid, np.flatnonzero(np.diff(batch_of)) + 1):
+        seg = np.repeat(batch, size[batch])
+        offsets = np.cumsum(size[batch]) - size[batch]
+        local = np.arange(len(seg)) - np.repeat(offsets, size[batch])
+        row = row0[seg] + local // n_cols[seg]
+        col = col0[seg] + local % n_cols[seg]
+
+        # Nearest point of the segment to the cell, at fraction t along it
+        x0, y0, sc, ax, ay, inv_length2 = [g[seg] for g in seg_geometry]
+        x = (grid_lon32[col] - x0) * sc
+        y = (grid_lat32[row] - y0) * np.float32(NM_PER_DEGREE)
+        t = np.clip((x * ax + y * ay) * inv_length2, 0, 1)
+        dx = x - t * ax
+        dy = y - t * ay
+        distance = np.hypot(dx, dy)
+        cell = row * n_lon + col
+
+        in30 = inside(coef30, seg, t, dx, dy, distance)
+        # 50 kt only for pairs within reach of a storm-force area
+        near = np.flatnonzero(distance < reach50[seg])
+        in50 = near[inside(coef50, seg[near], t[near], dx[near], dy[near], distance[near])]
+        # Storm-force winds are gale-force winds too, whatever the radii say
+        in30[in50] = True
+        swath50[row_of[seg[in50]], cell[in50]] = True
+        swath30[row_of[seg[in30]], cell[in30]] = True
+
+    hit = swath30.any(axis=1)
+    storms, swath30, swath50 = storms[hit], swath30[hit], swath50[hit]
+
+    return {'lat': grid_lat, 'lon': grid_lon, 'storm_index': storms, 'swath30': swath30, 'swath50': swath50}
+
+def exposure_table(swaths):
+    """
+    Per-cell exposure: number of storms whose 30 kt / 50 kt wind area
+    covered the cell. Cells never reached by gale-force winds are left out.
+    """
+    grid_lat, grid_lon = swaths['lat'], swaths['lon']
+    lat = np.repeat(grid_lat, len(grid_lon))
+    lon = np.tile(grid_lon, len(grid_lat))
+    counts30 = swaths['swath30'].sum(axis=0)
+    counts50 = swaths['swath50'].sum(axis=0)
+    hit = counts30 > 0
+    return pd.DataFrame({
+        'Latitude': np.round(lat[hit], 2),
+        'Longitude': np.round(lon[hit], 2),
+        'Storms_30kt': counts30[hit],
+        'Storms_50kt': counts50[hit],
+    })
+
+def write_wind_swaths(cols, swaths, swath_file=SWATH_FILE):
+    """
+    Per-storm masks as bit-packed rows (one row per storm, one bit per grid
+    cell), with the storm IDs, names, first years and the grid axes.
+    """
+    storms = swaths['storm_index']
+    first_fix = np.searchsorted(cols['storm_index'], storms)
+    np.savez_compressed(
+        swath_file,
+        storm_id=cols['storm_id'][storms].astype(str),
+        storm_name=cols['storm_name'][storms].astype(str),
+        year=cols['year'][first_fix],
+        lat=swaths['lat'],
+        lon=swaths['lon'],
+        swath30=np.packbits(swaths['swath30'], axis=1),
+        swath50=np.packbits(swaths['swath50'], axis=1),
+    )
+    print(f"Wind swaths: {len(storms)} storms with gale-force winds on the grid saved to {swath_file}")
+
+def load_wind_swaths(swath_file=SWATH_FILE):
+    """
+    Reads a swath file back: the arrays of write_wind_swaths with swath30 /
+    swath50 unpacked to bool (storms x cells).
+    """
+    with np.load(swath_file) as data:
+        swaths = {name: data[name] for name in data.files}
+    n_cells = len(swaths['lat']) * len(swaths['lon'])
+    for name in ['swath30', 'swath50']:
+        swaths[name] = np.unpackbits(swaths[name], axis=1, count=n_cells).astype(bool)
+    return swaths
+
+def export_wind_swaths(input_file=INPUT_FILE, swath_file=SWATH_FILE, exposure_file=EXPOSURE_FILE):
+    """
+    Parses the best-track file and writes the per-storm swath masks and the
+    per-cell exposure table. Returns the exposure table (None if no input).
+    """
+    from main import parse_jma_columns
+
+    cols = parse_jma_columns(input_file)
+    if cols is None:
+        return None
+
+    swaths = build_wind_swaths(cols)
+    write_wind_swaths(cols, swaths, swath_file)
+    exposure = exposure_table(swaths)
+    exposure.to_csv(exposure_file, index=False)
+    print(f"Wind exposure: {len(exposure)} grid cells saved to {exposure_file}")
+    return exposure
+
+def main():
+    parser = argparse.ArgumentParser(description="Gale / storm-force wind swaths of every storm over the Philippines.")
+    parser.add_argument('--input', default=INPUT_FILE, help="JMA best-track file.")
+    args = parser.parse_args()
+
+    # Setup paths relative to script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    export_wind_swaths(args.input)
+
+if __name__ == "__main__":
+    main()